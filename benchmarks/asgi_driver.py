@@ -0,0 +1,120 @@
+"""
+Minimal in-process ASGI driver used by the benchmarks, it calls the application
+directly so the timings are not dominated by a test client or a network stack.
+"""
+import time
+import asyncio
+import tracemalloc
+from contextlib import asynccontextmanager
+
+from src.schemas.header_schema import HeaderSchema
+
+
+DEFAULT_HEADERS = HeaderSchema().model_dump(by_alias=True)
+
+
+def make_scope(path, method='GET', headers=None):
+    headers = DEFAULT_HEADERS if headers is None else headers
+
+    return {
+        'type': 'http',
+        'asgi': {'version': '3.0', 'spec_version': '2.3'},
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [
+            (key.lower().encode('latin-1'), value.encode('latin-1'))
+            for key, value in headers.items()
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+
+
+async def call(app, scope, body=b''):
+    """
+    Sends one request to the app and returns the status code and the response body
+    """
+
+    messages = []
+    requested = False
+    completed = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        await completed.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+
+        if message['type'] == 'http.response.body' and not message.get('more_body'):
+            completed.set()
+
+    await app(dict(scope), receive, send)
+
+    status = next(m['status'] for m in messages if m['type'] == 'http.response.start')
+    content = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+
+    return status, content
+
+
+@asynccontextmanager
+async def running(app):
+    """
+    Runs the lifespan of a FastAPI application around the benchmark
+    """
+
+    async with app.router.lifespan_context(app):
+        yield app
+
+
+async def throughput(app, scope, requests_count, warmup=200):
+    for _ in range(warmup):
+        await call(app, scope)
+
+    start = time.perf_counter()
+    for _ in range(requests_count):
+        await call(app, scope)
+    elapsed = time.perf_counter() - start
+
+    return requests_count / elapsed
+
+
+async def latency_percentiles(app, scope, requests_count):
+    latencies = []
+    for _ in range(requests_count):
+        start = time.perf_counter()
+        await call(app, scope)
+        latencies.append(time.perf_counter() - start)
+
+    latencies.sort()
+
+    return latencies[len(latencies) // 2], latencies[int(len(latencies) * 0.99)]
+
+
+async def peak_allocation(app, scope, requests_count):
+    """
+    Average peak of memory allocated while serving a single request
+    """
+
+    total = 0
+
+    tracemalloc.start()
+    for _ in range(requests_count):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        await call(app, scope)
+        total += tracemalloc.get_traced_memory()[1] - current
+    tracemalloc.stop()
+
+    return total / requests_count
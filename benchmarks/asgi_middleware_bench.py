@@ -0,0 +1,39 @@
+"""
+Requests per second on `/` and `/-/healthz` served behind the legacy
+BaseHTTPMiddleware stack and behind the current pure-ASGI middlewares.
+
+    python -m benchmarks.asgi_middleware_bench
+"""
+import asyncio
+import argparse
+
+from src.app import app as current_app
+from src.utils.logger import get_logger
+from benchmarks.legacy import legacy_app
+from benchmarks.asgi_driver import make_scope, running, throughput
+
+
+async def bench(application, path, requests_count):
+    async with running(application):
+        return await throughput(application, make_scope(path), requests_count)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=10000)
+    args = parser.parse_args()
+
+    logger = get_logger()
+    logger.setLevel('INFO')
+
+    for path in ('/', '/-/healthz'):
+        legacy = asyncio.run(bench(legacy_app(logger), path, args.requests))
+        current = asyncio.run(bench(current_app, path, args.requests))
+        print(
+            f'GET {path:<10} legacy {legacy:9.0f} req/s'
+            f'   current {current:9.0f} req/s   x{current / legacy:.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""
+The middlewares and routes as they were before the pure-ASGI rewrite, the
+shared session and the pre-encoded responses, kept to compare the current
+stack against.
+"""
+import time
+import requests
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from src.app import app as current_app
+from src.apis.core.liveness import liveness_handler
+from src.apis.hello_world import hello_world_handler
+from src.lib.mia_platform_client import MiaPlatformAuth
+from src.schemas.message_schema import MessageResponseSchema
+from src.schemas.status_ok_schema import StatusOkResponseSchema
+from src.utils.health import health
+
+
+class LegacyLoggerMiddleware(BaseHTTPMiddleware):
+    """
+    BaseHTTPMiddleware logger middleware
+    """
+
+    def __init__(self, app, logger):
+        super().__init__(app)
+        self.logger = logger
+
+    async def dispatch(self, request, call_next):
+        excluded_paths = [
+            '/-/ready',
+            '/-/healthz',
+            '/-/check-up',
+        ]
+
+        if request.url.path not in excluded_paths:
+            self.logger.debug(f"{request.method} {request.url.path}")
+            start_time = time.time()
+
+        request.state.logger = self.logger
+        response = await call_next(request)
+
+        if request.url.path not in excluded_paths:
+            duration = time.time() - start_time
+            self.logger.debug(
+                f"{request.method} {request.url.path} {response.status_code} {duration:.6f}s"
+            )
+
+        return response
+
+
+class LegacyMiaPlatformClientMiddleware(BaseHTTPMiddleware):
+    """
+    BaseHTTPMiddleware client middleware building a requests.Session per request
+    """
+
+    def __init__(self, app, logger):
+        super().__init__(app)
+        self.logger = logger
+
+    async def dispatch(self, request, call_next):
+        session = requests.Session()
+        session.auth = MiaPlatformAuth(dict(request.headers.items()), self.logger)
+        request.state.mia_platform_client = session
+
+        return await call_next(request)
+
+
+def legacy_app(logger):
+    """
+    The current routes served behind the legacy middleware stack
+    """
+
+    application = FastAPI(lifespan=current_app.router.lifespan_context)
+    application.add_middleware(LegacyLoggerMiddleware, logger=logger)
+    application.add_middleware(LegacyMiaPlatformClientMiddleware, logger=logger)
+    application.router.routes.extend(current_app.router.routes)
+    return application
+
+
+def validated_app():
+    """
+    The hello-world and probe routes returning dicts validated against their
+    response_model, without middlewares: the logger is expected in the scope state
+    """
+
+    application = FastAPI()
+
+    @application.get('/', response_model=MessageResponseSchema)
+    async def hello_world(request: Request):
+        request.state.logger.debug('Test logger from hello world endpoint')
+        return {'message': 'Hello World!'}
+
+    @application.get('/-/healthz', response_model=StatusOkResponseSchema)
+    async def liveness(response: Response):
+        if not health.alive:
+            response.status_code = 503
+        return {'statusOk': health.alive}
+
+    return application
+
+
+def encoded_app():
+    """
+    The current hello-world and probe routers, without middlewares: the logger is
+    expected in the scope state
+    """
+
+    application = FastAPI()
+    application.include_router(hello_world_handler.router)
+    application.include_router(liveness_handler.router)
+
+    return application
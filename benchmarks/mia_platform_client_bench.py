@@ -0,0 +1,74 @@
+"""
+Concurrent-request throughput of MiaPlatformClient and AsyncMiaPlatformClient.
+
+Both clients are called from `async def` coroutines sharing one event loop, as
+FastAPI handlers are, against the MockServer stand-in answering after a fixed
+upstream latency.
+
+    python -m benchmarks.mia_platform_client_bench
+"""
+import time
+import asyncio
+import argparse
+import httpretty
+
+from src.lib.mia_platform_client import MiaPlatformClient
+from src.lib.async_mia_platform_client import AsyncMiaPlatformClient, create_http_client
+from src.utils.logger import get_logger
+from tests.fixtures.mock_server import MockServer
+
+
+URL = 'http://www.dummy-url.com/resources'
+BODY = '[{"message": "Hi :)"}]'
+
+
+async def bench_sync(logger, requests, latency):
+    def slow_body(_request, _uri, headers):
+        time.sleep(latency)
+        return 200, headers, BODY
+
+    server = MockServer()
+    server.enable()
+    server.register_uri(httpretty.GET, URL, body=slow_body)
+
+    async def handler():
+        MiaPlatformClient({}, logger).get(URL)
+
+    try:
+        start = time.perf_counter()
+        await asyncio.gather(*(handler() for _ in range(requests)))
+        return time.perf_counter() - start
+    finally:
+        server.disable()
+
+
+async def bench_async(logger, requests, latency):
+    server = MockServer()
+    server.register_uri(httpretty.GET, URL, body=BODY)
+
+    async with create_http_client(transport=server.transport(latency)) as http_client:
+        async def handler():
+            await AsyncMiaPlatformClient(http_client, {}, logger).get(URL)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(handler() for _ in range(requests)))
+        return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.01)
+    args = parser.parse_args()
+
+    logger = get_logger()
+    logger.setLevel('INFO')
+
+    print(f'{args.requests} concurrent requests, {args.latency * 1000:.0f}ms upstream latency')
+    for name, bench in (('MiaPlatformClient', bench_sync), ('AsyncMiaPlatformClient', bench_async)):
+        elapsed = asyncio.run(bench(logger, args.requests, args.latency))
+        print(f'{name:<24} {elapsed:8.3f}s {args.requests / elapsed:10.1f} req/s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""
+Per-request allocations and latency of the middleware stack.
+
+The legacy stack rebuilds a requests.Session and copies the request headers on
+every request, the current one attaches lightweight views over the shared
+connection pools.
+
+    python -m benchmarks.middleware_load_bench
+"""
+import asyncio
+import argparse
+
+from src.app import app as current_app
+from src.utils.logger import get_logger
+from benchmarks.legacy import legacy_app
+from benchmarks.asgi_driver import make_scope, running, latency_percentiles, peak_allocation
+
+
+async def bench(name, application, path, requests_count):
+    scope = make_scope(path)
+
+    async with running(application):
+        await latency_percentiles(application, scope, 200)
+        p50, p99 = await latency_percentiles(application, scope, requests_count)
+        allocated = await peak_allocation(application, scope, requests_count // 10)
+
+    print(
+        f'  {name:<8} {allocated:10.0f} B/req peak allocated'
+        f'   p50 {p50 * 1e6:8.1f}us   p99 {p99 * 1e6:8.1f}us'
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=5000)
+    args = parser.parse_args()
+
+    logger = get_logger()
+    logger.setLevel('INFO')
+
+    for path in ('/', '/-/healthz'):
+        print(f'GET {path}, {args.requests} requests')
+        for name, application in (('legacy', legacy_app(logger)), ('current', current_app)):
+            asyncio.run(bench(name, application, path, args.requests))
+
+
+if __name__ == '__main__':
+    main()
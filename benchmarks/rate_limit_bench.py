@@ -0,0 +1,84 @@
+"""
+Rate-limit decisions per second of the in-memory GCRA store, on a single hot key
+and spread over many keys, of the rate limiter checking the miauserid and
+miaclienttype headers of a request, and the memory held per key.
+
+    python -m benchmarks.rate_limit_bench
+    python -m benchmarks.rate_limit_bench --keys 1000000
+"""
+import time
+import asyncio
+import argparse
+import tracemalloc
+
+from src.lib.rate_limit import MemoryRateLimitStore, Rate, RateLimiter
+
+
+# High enough that no decision is a rejection, which would skip the update
+RATE = Rate(10 ** 9, 1)
+
+
+def decisions_per_second(store, keys, decisions):
+    decide = store.decide
+    count = len(keys)
+
+    start = time.perf_counter()
+    for index in range(decisions):
+        decide(keys[index % count], RATE)
+
+    return decisions / (time.perf_counter() - start)
+
+
+async def checks_per_second(limiter, requests, decisions):
+    count = len(requests)
+
+    start = time.perf_counter()
+    for index in range(decisions):
+        await limiter.check(requests[index % count])
+
+    return decisions / (time.perf_counter() - start)
+
+
+def bytes_per_key(keys):
+    store = MemoryRateLimitStore(max_keys=len(keys))
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for key in keys:
+        store.decide(key, RATE)
+    held = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+
+    return held / len(store)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--decisions', type=int, default=1000000)
+    parser.add_argument('--keys', type=int, default=100000)
+    args = parser.parse_args()
+
+    keys = [f'miauserid:user-{index}' for index in range(args.keys)]
+
+    hot = decisions_per_second(MemoryRateLimitStore(), keys[:1], args.decisions)
+    spread = decisions_per_second(MemoryRateLimitStore(), keys, args.decisions)
+    print(f'decide, 1 key          {hot:12,.0f} decisions/s')
+    print(f'decide, {args.keys:<8,} keys  {spread:12,.0f} decisions/s')
+
+    limiter = RateLimiter(MemoryRateLimitStore(), {'miauserid': RATE, 'miaclienttype': RATE})
+    requests = [
+        [
+            (b'miauserid', f'user-{index}'.encode()),
+            (b'miausergroups', b'users'),
+            (b'miaclienttype', b'backoffice'),
+        ]
+        for index in range(args.keys)
+    ]
+    checks = asyncio.run(checks_per_second(limiter, requests, args.decisions // 2))
+    print(f'check, 2 headers       {checks:12,.0f} requests/s')
+
+    print(f'memory                 {bytes_per_key(keys):12,.0f} bytes/key, key strings excluded')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,37 @@
+"""
+Requests per second on the hello-world and probe routes when the handlers return
+dicts validated against their response_model, and when they return the bodies
+validated and encoded once at import time. The routes are served without
+middlewares, the probe route is usually answered by the ProbeMiddleware.
+
+    python -m benchmarks.response_model_bench
+"""
+import asyncio
+import argparse
+
+from src.utils.logger import get_logger
+from benchmarks.legacy import encoded_app, validated_app
+from benchmarks.asgi_driver import make_scope, throughput
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=10000)
+    args = parser.parse_args()
+
+    logger = get_logger()
+    logger.setLevel('INFO')
+
+    for path in ('/', '/-/healthz'):
+        scope = {**make_scope(path), 'state': {'logger': logger}}
+
+        validated = asyncio.run(throughput(validated_app(), scope, args.requests))
+        encoded = asyncio.run(throughput(encoded_app(), scope, args.requests))
+        print(
+            f'GET {path:<10} validated {validated:9.0f} req/s'
+            f'   encoded {encoded:9.0f} req/s   x{encoded / validated:.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-request serialization time of the response bodies with the stdlib json
+(JSONResponse) and with orjson (ORJSONResponse, the app default), and decoding
+time of the upstream bodies read by the Mia Platform clients.
+
+    python -m benchmarks.serialization_bench
+"""
+import json
+import time
+import argparse
+import orjson
+from fastapi.responses import JSONResponse, ORJSONResponse
+
+
+PAYLOADS = {
+    'small': {'message': 'Hello World!'},
+    'large': [
+        {
+            '_id': f'{index:024x}',
+            'name': f'record {index}',
+            'price': index * 1.5,
+            'tags': ['a', 'b', 'c'],
+            'active': index % 2 == 0,
+        }
+        for index in range(10000)
+    ],
+}
+
+
+def per_call(function, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        function()
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--iterations', type=int, default=200)
+    args = parser.parse_args()
+
+    for name, payload in PAYLOADS.items():
+        iterations = args.iterations * 100 if name == 'small' else args.iterations
+        body = orjson.dumps(payload)
+
+        encode_json = per_call(lambda payload=payload: JSONResponse(payload), iterations)
+        encode_orjson = per_call(lambda payload=payload: ORJSONResponse(payload), iterations)
+        decode_json = per_call(lambda body=body: json.loads(body), iterations)
+        decode_orjson = per_call(lambda body=body: orjson.loads(body), iterations)
+
+        print(f'{name} payload, {len(body)} bytes')
+        print(
+            f'  encode  JSONResponse {encode_json * 1e6:10.1f}us'
+            f'   ORJSONResponse {encode_orjson * 1e6:10.1f}us'
+            f'   x{encode_json / encode_orjson:.2f}'
+        )
+        print(
+            f'  decode  json.loads   {decode_json * 1e6:10.1f}us'
+            f'   orjson.loads   {decode_orjson * 1e6:10.1f}us'
+            f'   x{decode_json / decode_orjson:.2f}'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+Cold start of the service: the `python -X importtime` totals of `import src.app`,
+with the slowest top-level imports, and the time from launching
+`python -m src.launcher` to the first 200 on /-/healthz.
+
+    python -m benchmarks.startup_bench
+    python -m benchmarks.startup_bench --max-import-ms 1500 --max-first-200-ms 3000
+
+With the --max-* budgets the benchmark exits with an error when the medians
+exceed them, so that a startup regression fails the build.
+"""
+import os
+import sys
+import time
+import socket
+import signal
+import argparse
+import statistics
+import subprocess
+import urllib.error
+import urllib.request
+
+
+MODULE = 'src.app'
+PROBE_PATH = '/-/healthz'
+
+
+def import_times(module):
+    """
+    Returns the cumulative time, in microseconds, of `import <module>` and of
+    each import it runs directly, as reported by `python -X importtime`
+    """
+
+    completed = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    # Nested imports are listed before their parent, two spaces deeper
+    children = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+
+        _, cumulative, name = line.split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+
+        if depth == 1:
+            children[name.strip()] = int(cumulative)
+        elif depth == 0 and name.strip() == module:
+            return int(cumulative), children
+        elif depth == 0:
+            children = {}
+
+    raise RuntimeError(f'{module} is missing from the import times')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def is_up(url):
+    try:
+        with urllib.request.urlopen(url, timeout=1) as response:
+            return response.status == 200
+    except (urllib.error.URLError, ConnectionError):
+        return False
+
+
+def time_to_first_200(timeout):
+    """
+    Launches a single-worker server and returns the seconds until its first 200
+    on the liveness probe
+    """
+
+    port = free_port()
+    env = {
+        **os.environ,
+        'HTTP_PORT': str(port),
+        'SERVER_HOST': '127.0.0.1',
+        'SERVER_WORKERS': '1',
+        'LOG_LEVEL': 'WARNING',
+    }
+    url = f'http://127.0.0.1:{port}{PROBE_PATH}'
+
+    start = time.perf_counter()
+    with subprocess.Popen(
+        [sys.executable, '-m', 'src.launcher'],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL
+    ) as server:
+        try:
+            while not is_up(url):
+                if server.poll() is not None:
+                    raise RuntimeError(f'The server exited with code {server.returncode}')
+                if time.perf_counter() - start > timeout:
+                    raise RuntimeError(f'No 200 on {PROBE_PATH} after {timeout}s')
+                time.sleep(0.005)
+
+            return time.perf_counter() - start
+        finally:
+            server.send_signal(signal.SIGTERM)
+
+
+def check_budget(name, value, budget):
+    if budget is not None and value > budget:
+        print(f'{name} {value:.1f}ms exceeds the budget of {budget:.1f}ms')
+        return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=8)
+    parser.add_argument('--timeout', type=float, default=30)
+    parser.add_argument('--max-import-ms', type=float)
+    parser.add_argument('--max-first-200-ms', type=float)
+    args = parser.parse_args()
+
+    runs = [import_times(MODULE) for _ in range(args.runs)]
+    totals = [total / 1000 for total, _ in runs]
+    import_ms = statistics.median(totals)
+
+    print(f'import {MODULE}: median {import_ms:.1f}ms, min {min(totals):.1f}ms')
+    slowest = sorted(runs[-1][1].items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative in slowest[:args.top]:
+        print(f'  {name:<60} {cumulative / 1000:8.1f}ms')
+
+    first_200 = [time_to_first_200(args.timeout) * 1000 for _ in range(args.runs)]
+    first_200_ms = statistics.median(first_200)
+    print(f'first 200 on {PROBE_PATH}: median {first_200_ms:.1f}ms, min {min(first_200):.1f}ms')
+
+    within_budget = check_budget('import', import_ms, args.max_import_ms)
+    within_budget &= check_budget('first 200', first_200_ms, args.max_first_200_ms)
+    if not within_budget:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
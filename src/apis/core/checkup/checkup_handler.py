@@ -1,6 +1,8 @@
-from fastapi import APIRouter, status
+from fastapi import APIRouter, Request, Response, status
 
-from src.schemas.status_ok_schema import StatusOkResponseSchema
+from src.lib.checkup import checkup_registry
+from src.schemas.checkup_schema import CheckUpResponseSchema
+from src.utils.health import health
 
 
 router = APIRouter()
@@ -8,18 +10,26 @@ router = APIRouter()
 
 @router.get(
     "/-/check-up",
-    response_model=StatusOkResponseSchema,
+    response_model=CheckUpResponseSchema,
     status_code=status.HTTP_200_OK,
     tags=["python-fastapi-template"]
 )
-async def readiness():
+async def readiness(request: Request, response: Response):
     """
     This route can be used as check-up route, to verify if all the
     functionalities of the service are available or not. The purpose of this
     route should be to check the availability of all the dependencies of the
-    service and reply with a check-up of the service. By default, the route will
-    always response with an OK status and the 200 HTTP code as soon as the
-    service is up.
+    service and reply with a check-up of the service. The dependency checks
+    registered on the check-up registry run concurrently and the route responds
+    with the outcome of each of them, with the 503 HTTP code if any of them
+    failed or while the service is flagged as not ready. The result is cached
+    for CHECKUP_CACHE_TTL seconds.
     """
 
-    return {"statusOk": True}
+    status_ok, checks = await checkup_registry.run(request.app)
+    status_ok = status_ok and health.ready
+
+    if not status_ok:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+
+    return {"statusOk": status_ok, "checks": checks}
@@ -1,6 +1,8 @@
 from fastapi import APIRouter, status
 
-from src.schemas.status_ok_schema import StatusOkResponseSchema
+from src.lib.responses import EncodedJSONResponse
+from src.schemas.status_ok_schema import STATUS_OK_BODIES, StatusOkResponseSchema
+from src.utils.health import health
 
 
 router = APIRouter()
@@ -17,7 +19,12 @@ async def liveness():
     This route can be used as a probe for load balancers, status dashboards and
     as a helthinessProbe for Kubernetes. By default, the route will always
     response with an OK status and the 200 HTTP code as soon as the service is
-    up.
+    up, and with the 503 HTTP code once the service is flagged as not alive.
     """
 
-    return {"statusOk": True}
+    status_ok = health.alive
+
+    return EncodedJSONResponse(
+        STATUS_OK_BODIES[status_ok],
+        status_code=status.HTTP_200_OK if status_ok else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
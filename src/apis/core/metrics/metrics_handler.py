@@ -0,0 +1,39 @@
+import asyncio
+from fastapi import APIRouter, status
+from fastapi.responses import PlainTextResponse
+
+from src.lib.metrics import registry, render
+from src.utils.settings import get_settings
+
+
+router = APIRouter()
+
+
+class PrometheusResponse(PlainTextResponse):
+    """
+    Response in the Prometheus text exposition format
+    """
+
+    media_type = 'text/plain; version=0.0.4'
+
+
+@router.get(
+    "/-/metrics",
+    response_class=PrometheusResponse,
+    status_code=status.HTTP_200_OK,
+    tags=["python-fastapi-template"]
+)
+async def metrics():
+    """
+    This route exposes the service metrics in the Prometheus text format: the
+    request count, the in-flight requests, the latency by route template and the
+    latency and status of the upstream calls made by the Mia Platform clients.
+    When METRICS_MULTIPROC_DIR is set, the metrics of all the uvicorn workers are
+    aggregated, their snapshots being read on a thread.
+    """
+
+    directory = get_settings().metrics_multiproc_dir
+    if not directory:
+        return PrometheusResponse(render(registry.collect()))
+
+    return PrometheusResponse(render(await asyncio.to_thread(registry.collect, directory)))
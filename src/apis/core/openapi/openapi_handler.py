@@ -0,0 +1,41 @@
+import orjson
+from fastapi import APIRouter, Request
+
+from src.lib.compression import compressor
+from src.lib.http_cache import CachePolicy
+
+
+OPENAPI_URL = "/documentation/json"
+
+router = APIRouter()
+
+
+def openapi_cache(app):
+    """
+    The caching policy of the OpenAPI document of the app, holding the document
+    generated and encoded on the first request, and compressed once
+    """
+
+    policy = getattr(app.state, 'openapi_cache', None)
+
+    if policy is None:
+        body = orjson.dumps(app.openapi())
+        if compressor is not None:
+            compressor.precompress(body)
+
+        # Revalidated on every use, the document changes with the deployments
+        policy = app.state.openapi_cache = CachePolicy('no-cache', body=body)
+
+    return policy
+
+
+@router.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_document(request: Request):
+    """
+    This route serves the OpenAPI specification of the service, with a strong
+    ETag answering the conditional requests with a 304
+    """
+
+    policy = openapi_cache(request.app)
+
+    return policy.response(policy.body, request)
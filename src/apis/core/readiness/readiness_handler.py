@@ -1,6 +1,8 @@
 from fastapi import APIRouter, status
 
-from src.schemas.status_ok_schema import StatusOkResponseSchema
+from src.lib.responses import EncodedJSONResponse
+from src.schemas.status_ok_schema import STATUS_OK_BODIES, StatusOkResponseSchema
+from src.utils.health import health
 
 
 router = APIRouter()
@@ -16,7 +18,13 @@ async def readiness():
     """
     This route can be used as a readinessProbe for Kubernetes. By default, the
     route will always response with an OK status and the 200 HTTP code as soon
-    as the service is up.
+    as the service is up, and with the 503 HTTP code while the service is
+    flagged as not ready.
     """
 
-    return {"statusOk": True}
+    status_ok = health.ready
+
+    return EncodedJSONResponse(
+        STATUS_OK_BODIES[status_ok],
+        status_code=status.HTTP_200_OK if status_ok else status.HTTP_503_SERVICE_UNAVAILABLE
+    )
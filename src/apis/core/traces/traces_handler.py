@@ -0,0 +1,21 @@
+from fastapi import APIRouter, status
+
+from src.lib.tracing import tracer
+
+
+router = APIRouter()
+
+
+@router.get(
+    "/-/traces",
+    status_code=status.HTTP_200_OK,
+    tags=["python-fastapi-template"]
+)
+async def traces():
+    """
+    This debug route lists the recent slow traces of this worker, the most recent
+    first: the sampled traces whose request took at least TRACING_SLOW_THRESHOLD
+    seconds, each with its spans sorted by start time.
+    """
+
+    return {"traces": tracer.recent_slow_traces()}
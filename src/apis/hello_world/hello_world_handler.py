@@ -1,10 +1,15 @@
 from fastapi import APIRouter, Request, status
 
+from src.lib.http_cache import CachePolicy
+from src.lib.responses import encode_constant
 from src.schemas.message_schema import MessageResponseSchema
 
 
 router = APIRouter()
 
+HELLO_WORLD_BODY = encode_constant(MessageResponseSchema, {"message": "Hello World!"})
+HELLO_WORLD_CACHE = CachePolicy("public, max-age=60", body=HELLO_WORLD_BODY)
+
 
 @router.get(
     "/",
@@ -20,4 +25,4 @@ async def hello_world(request: Request):
     logger = request.state.logger
     logger.debug('Test logger from hello world endpoint')
 
-    return {"message": "Hello World!"}
+    return HELLO_WORLD_CACHE.response(HELLO_WORLD_BODY, request)
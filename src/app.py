@@ -1,25 +1,82 @@
 import os
-import uvicorn
-from dotenv import load_dotenv
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 
+from src.middlewares.admission_middleware import AdmissionMiddleware
+from src.middlewares.compression_middleware import CompressionMiddleware
 from src.middlewares.logger_middleware import LoggerMiddleware
 from src.middlewares.mia_platform_client_middleware import MiaPlatformClientMiddleware
+from src.middlewares.probe_middleware import ProbeMiddleware
+from src.middlewares.rate_limit_middleware import RateLimitMiddleware
+from src.middlewares.metrics_middleware import MetricsMiddleware
+from src.middlewares.request_context_middleware import RequestContextMiddleware
 
 from src.apis.core.liveness import liveness_handler
 from src.apis.core.readiness import readiness_handler
 from src.apis.core.checkup import checkup_handler
+from src.apis.core.metrics import metrics_handler
+from src.apis.core.traces import traces_handler
+from src.apis.core.openapi import openapi_handler
 from src.apis.hello_world import hello_world_handler
 
+from src.lib.compression import compressor
+from src.lib.metrics import registry, flush_periodically
+from src.lib.tracing import tracer
 from src.utils.logger import get_logger
+from src.utils.settings import get_settings
 
 
-load_dotenv('default.env')
+@asynccontextmanager
+async def lifespan(application):
+    """
+    Opens the app-wide HTTP connection pools on startup and closes them on shutdown,
+    and shares the metrics of this worker when running with several workers
+    """
 
+    # pylint: disable=C0415
+    # The clients, requests and httpx are loaded on startup, not by `import src.app`
+    from src.lib.blocking_pool import blocking_pool
+    from src.lib.mia_platform_client import close_shared_session
+    from src.lib.async_mia_platform_client import create_http_client
+
+    settings = get_settings()
+    metrics_flush = None
+
+    if settings.metrics_multiproc_dir:
+        os.makedirs(settings.metrics_multiproc_dir, exist_ok=True)
+        metrics_flush = asyncio.create_task(flush_periodically(
+            registry,
+            settings.metrics_multiproc_dir,
+            settings.metrics_flush_interval
+        ))
+
+    application.state.http_client = create_http_client()
+    yield
+    await application.state.http_client.aclose()
+    blocking_pool.shutdown()
+    close_shared_session()
+    if compressor is not None:
+        compressor.shutdown()
+    tracer.shutdown()
+
+    if metrics_flush is not None:
+        metrics_flush.cancel()
+        with suppress(asyncio.CancelledError):
+            await metrics_flush
+
+
+# Routes needing the stdlib json semantics, e.g. NaN values, opt out with
+# `response_class=JSONResponse`
+# The OpenAPI document is served at /documentation/json by the openapi handler,
+# generated once and pre-encoded
 app = FastAPI(
-    openapi_url="/documentation/json",
+    openapi_url=None,
     docs_url=None,
-    redoc_url=None
+    redoc_url=None,
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 logger = get_logger()
@@ -27,19 +84,31 @@ logger = get_logger()
 # Middlewares
 app.add_middleware(LoggerMiddleware, logger=logger)
 app.add_middleware(MiaPlatformClientMiddleware, logger=logger)
+# Sheds the requests over the concurrency limits before the clients are built
+app.add_middleware(AdmissionMiddleware)
+# Rejects the requests of the noisy users before they take an admission slot
+app.add_middleware(RateLimitMiddleware)
+# Inside the metrics one, so the request latency includes the compression
+app.add_middleware(CompressionMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(RequestContextMiddleware)
+# Outermost: probes are answered before reaching the other middlewares
+app.add_middleware(ProbeMiddleware)
 
 # Core
 app.include_router(liveness_handler.router)
 app.include_router(readiness_handler.router)
 app.include_router(checkup_handler.router)
+app.include_router(metrics_handler.router)
+# The slow traces carry the request attributes, only served when asked for
+if get_settings().tracing_debug_route_enabled:
+    app.include_router(traces_handler.router)
+app.include_router(openapi_handler.router)
 
 # Hello World
 app.include_router(hello_world_handler.router)
 
 
 if __name__ == '__main__':
-    uvicorn.run(
-        app,
-        host='0.0.0.0',
-        port=int(os.environ.get('HTTP_PORT', 3000))
-    )
+    from src.launcher import main as launch  # pylint: disable=C0415
+    launch()
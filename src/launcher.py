@@ -0,0 +1,191 @@
+"""
+Production entrypoint of the service, configured by the SERVER_* and HTTP_PORT
+env variables:
+
+    python -m src.launcher
+"""
+import os
+import signal
+import socket
+import asyncio
+import importlib.util
+import multiprocessing
+import uvicorn
+from uvicorn.supervisors import Multiprocess
+
+from src.utils.logger import get_logger
+from src.utils.settings import get_settings
+
+
+APP = 'src.app:app'
+
+# The implementation of each option, and the one used when it is not installed
+IMPLEMENTATIONS = {
+    'loop': {'uvloop': ('uvloop', 'asyncio')},
+    'http': {'httptools': ('httptools', 'h11')},
+}
+
+
+class GracefulServer(uvicorn.Server):
+    """
+    A uvicorn server waiting at most `shutdown_timeout` seconds for the open
+    connections and tasks on shutdown, then shutting the application down anyway.
+    The uvicorn version in use waits for them forever.
+    """
+
+    def __init__(self, config, shutdown_timeout=None):
+        super().__init__(config)
+        self.shutdown_timeout = shutdown_timeout
+        self.timed_out = False
+
+    def _time_out(self):
+        if not self.force_exit:
+            self.timed_out = True
+            self.force_exit = True
+
+    async def shutdown(self, sockets=None):
+        timer = None
+        if self.shutdown_timeout:
+            timer = asyncio.get_running_loop().call_later(self.shutdown_timeout, self._time_out)
+
+        await super().shutdown(sockets=sockets)
+
+        if timer is not None:
+            timer.cancel()
+
+        # Forced by the timeout, not by a second signal: the lifespan still runs
+        if self.timed_out:
+            get_logger().warning(
+                f'Graceful shutdown timed out after {self.shutdown_timeout}s,'
+                ' closing the open connections'
+            )
+            await self.lifespan.shutdown()
+
+
+def resolve(option, value):
+    """
+    Returns the requested loop or http implementation, or its fallback when the
+    package providing it is not installed
+    """
+
+    package, fallback = IMPLEMENTATIONS[option].get(value, (None, value))
+
+    if package is not None and importlib.util.find_spec(package) is None:
+        get_logger().warning(f'{package} is not installed, using {fallback} as {option}')
+        return fallback
+
+    return value
+
+
+def server_options(settings):
+    """
+    The uvicorn options derived from the settings
+    """
+
+    return {
+        'host': settings.server_host,
+        'port': settings.http_port,
+        'loop': resolve('loop', settings.server_loop),
+        'http': resolve('http', settings.server_http),
+        'backlog': settings.server_backlog,
+        'timeout_keep_alive': settings.server_keep_alive_timeout,
+        'limit_concurrency': settings.server_limit_concurrency or None,
+        'workers': settings.server_workers,
+    }
+
+
+def create_server(options, shutdown_timeout):
+    return GracefulServer(uvicorn.Config(APP, **options), shutdown_timeout)
+
+
+def bind_reuse_port(host, port, backlog):
+    """
+    Binds a listening socket with SO_REUSEPORT, every worker binds its own socket
+    on the same port and the kernel balances the connections among them
+    """
+
+    sock = socket.socket(socket.AF_INET6 if ':' in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+
+    return sock
+
+
+def run_reuse_port_worker(options, shutdown_timeout):
+    # Signals reach the workers only through the supervisor, a Ctrl+C sent to
+    # the whole process group would otherwise count twice and force the exit
+    os.setpgid(0, 0)
+
+    sock = bind_reuse_port(options['host'], options['port'], options['backlog'])
+    create_server(options, shutdown_timeout).run(sockets=[sock])
+
+
+def supervise(options, shutdown_timeout):
+    """
+    Runs the SO_REUSEPORT workers, restarting the ones exiting unexpectedly, until
+    a SIGINT or a SIGTERM is forwarded to them
+    """
+
+    context = multiprocessing.get_context('spawn')
+    stopping = []
+
+    def start_worker():
+        worker = context.Process(target=run_reuse_port_worker, args=(options, shutdown_timeout))
+        worker.start()
+        return worker
+
+    def stop(signum, _frame):
+        stopping.append(signum)
+        for worker in workers:
+            if worker.is_alive():
+                os.kill(worker.pid, signum)
+
+    workers = [start_worker() for _ in range(options['workers'])]
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while not stopping:
+        for index, worker in enumerate(workers):
+            worker.join(timeout=0.5 / len(workers))
+            if worker.exitcode is not None and not stopping:
+                get_logger().error(
+                    f'Worker {worker.pid} exited with code {worker.exitcode}, restarting it'
+                )
+                workers[index] = start_worker()
+
+    for worker in workers:
+        worker.join()
+
+
+def main():
+    settings = get_settings()
+    options = server_options(settings)
+    shutdown_timeout = settings.server_graceful_shutdown_timeout
+
+    get_logger().info(
+        'Starting the server: '
+        + ' '.join(f'{key}={value}' for key, value in options.items())
+        + f' reuse_port={settings.server_reuse_port}'
+        + f' graceful_shutdown_timeout={shutdown_timeout}'
+    )
+
+    if options['workers'] > 1 and not settings.metrics_multiproc_dir:
+        get_logger().warning(
+            'METRICS_MULTIPROC_DIR is not set, /-/metrics only reports the worker serving it'
+        )
+
+    if options['workers'] == 1:
+        create_server(options, shutdown_timeout).run()
+    elif settings.server_reuse_port and hasattr(socket, 'SO_REUSEPORT'):
+        supervise(options, shutdown_timeout)
+    else:
+        server = create_server(options, shutdown_timeout)
+        sock = server.config.bind_socket()
+        Multiprocess(server.config, target=server.run, sockets=[sock]).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+import time
+import asyncio
+from collections import deque
+from starlette.routing import compile_path
+
+from src.lib.metrics import ADMISSION_LIMIT, ADMISSION_REJECTED
+from src.utils.settings import get_settings
+
+
+GLOBAL_LIMITER = '<global>'
+
+
+class AdmissionRejected(Exception):
+    """
+    Raised when a request is shed: the wait queue of a limiter is full (`queue_full`)
+    or the request waited for a slot until its deadline (`timeout`)
+    """
+
+    def __init__(self, limiter, reason):
+        super().__init__(f'Request rejected by the {limiter} limiter: {reason}')
+        self.limiter = limiter
+        self.reason = reason
+
+
+class AIMDLimit:
+    """
+    A concurrency limit adapting to the observed latency, additive increase and
+    multiplicative decrease: a request slower than `latency_target` shrinks the
+    limit by `decrease_factor`, a fast one grows it by one while at least half
+    of it is in use. Requests started before the last decrease were admitted under
+    the old limit, so they do not shrink it again.
+
+    Args:
+        initial (int): The starting limit, also the upper bound of the limit.
+        min_limit (int): The lower bound of the limit.
+        latency_target (float): The latency, in seconds, above which the limit shrinks.
+        decrease_factor (float): The factor the limit is multiplied by when it shrinks.
+    """
+
+    def __init__(self, initial, min_limit, latency_target, decrease_factor=0.9):
+        self.value = initial
+        self.max_limit = initial
+        self.min_limit = min(min_limit, initial)
+        self.latency_target = latency_target
+        self.decrease_factor = decrease_factor
+        self._decreased_at = float('-inf')
+
+    def update(self, latency, started_at, in_flight):
+        if latency > self.latency_target:
+            if started_at >= self._decreased_at:
+                self.value = max(self.min_limit, int(self.value * self.decrease_factor))
+                self._decreased_at = time.monotonic()
+        elif in_flight * 2 >= self.value:
+            self.value = min(self.max_limit, self.value + 1)
+
+        return self.value
+
+
+class ConcurrencyLimiter:
+    """
+    Admits at most `limit` concurrent requests, the others wait in a FIFO queue of
+    at most `max_queue` requests until a slot is released or their deadline passes.
+
+    Args:
+        name (str): The name of the limiter, the route template or GLOBAL_LIMITER.
+        limit (int): The maximum number of concurrent requests.
+        max_queue (int): The maximum number of waiting requests.
+        adaptive (AIMDLimit): When given, it replaces the fixed limit.
+    """
+
+    def __init__(self, name, limit, max_queue, adaptive=None):
+        self.name = name
+        self.limit = limit
+        self.max_queue = max_queue
+        self.adaptive = adaptive
+        self.in_flight = 0
+        self.waiters = deque()
+        ADMISSION_LIMIT.set((name,), self.capacity)
+
+    @property
+    def capacity(self):
+        return self.adaptive.value if self.adaptive is not None else self.limit
+
+    async def acquire(self, deadline):
+        """
+        Takes a slot, waiting for it at most until the `deadline` of the event loop clock
+        """
+
+        if self.in_flight < self.capacity and not self.waiters:
+            self.in_flight += 1
+            return
+
+        if len(self.waiters) >= self.max_queue:
+            raise AdmissionRejected(self.name, 'queue_full')
+
+        loop = asyncio.get_running_loop()
+        timeout = deadline - loop.time()
+        if timeout <= 0:
+            raise AdmissionRejected(self.name, 'timeout')
+
+        waiter = loop.create_future()
+        self.waiters.append(waiter)
+
+        try:
+            done, _ = await asyncio.wait((waiter,), timeout=timeout)
+        except BaseException:
+            self._abandon(waiter)
+            raise
+
+        if not done:
+            self._abandon(waiter)
+            raise AdmissionRejected(self.name, 'timeout')
+
+    def release(self, latency=None, started_at=None):
+        """
+        Frees a slot, handing it to the first waiting request. The latency of the
+        request, and the monotonic time it started at, adapt the limit.
+        """
+
+        if self.adaptive is not None and latency is not None:
+            previous = self.adaptive.value
+            if self.adaptive.update(latency, started_at, self.in_flight) != previous:
+                ADMISSION_LIMIT.set((self.name,), self.adaptive.value)
+
+        self.in_flight -= 1
+        self._wake()
+
+    def _wake(self):
+        while self.waiters and self.in_flight < self.capacity:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                self.in_flight += 1
+                waiter.set_result(None)
+
+    def _abandon(self, waiter):
+        if waiter.done() and not waiter.cancelled():
+            # The slot was handed over while the request was giving up
+            self.release()
+            return
+
+        waiter.cancel()
+        self.waiters.remove(waiter)
+
+
+class AdmissionController:
+    """
+    Admits the requests through the limiter of their route, if any, and through
+    the global limiter, within `queue_timeout` seconds overall.
+
+    Args:
+        global_limiter (ConcurrencyLimiter): The limiter of every request, optional.
+        route_limiters (dict): The limiters of the route templates, e.g. "/items/{id}".
+        queue_timeout (float): How long a request can wait for its slots, in seconds.
+        retry_after (int): The Retry-After of the rejected requests, in seconds.
+    """
+
+    def __init__(self, global_limiter, route_limiters, queue_timeout, retry_after):
+        self.global_limiter = global_limiter
+        self.route_limiters = [
+            (compile_path(template)[0], limiter) for template, limiter in route_limiters.items()
+        ]
+        self.queue_timeout = queue_timeout
+        self.retry_after = retry_after
+
+    def limiters(self, path):
+        """
+        The limiters of a path, the one of its route first
+        """
+
+        limiters = []
+
+        for regex, limiter in self.route_limiters:
+            if regex.match(path):
+                limiters.append(limiter)
+                break
+
+        if self.global_limiter is not None:
+            limiters.append(self.global_limiter)
+
+        return limiters
+
+    async def admit(self, limiters):
+        """
+        Takes a slot of every limiter, or none of them when the request is rejected
+        """
+
+        deadline = asyncio.get_running_loop().time() + self.queue_timeout
+        acquired = []
+
+        try:
+            for limiter in limiters:
+                await limiter.acquire(deadline)
+                acquired.append(limiter)
+        except AdmissionRejected as error:
+            ADMISSION_REJECTED.inc((error.limiter, error.reason))
+            for limiter in acquired:
+                limiter.release()
+            raise
+        except BaseException:
+            for limiter in acquired:
+                limiter.release()
+            raise
+
+
+def parse_route_limits(value):
+    """
+    Parses ADMISSION_ROUTE_LIMITS, e.g. "/items/{item_id}=10,/reports=2", into a
+    dict of route templates and limits
+    """
+
+    limits = {}
+
+    for entry in (value or '').split(','):
+        template, _, limit = entry.strip().rpartition('=')
+        if template:
+            limits[template.strip()] = int(limit)
+
+    return limits
+
+
+def create_admission_controller():
+    """
+    Returns the process-wide admission controller, or None when ADMISSION_ENABLED is off
+    """
+
+    settings = get_settings()
+
+    if not settings.admission_enabled:
+        return None
+
+    def limiter(name, limit):
+        adaptive = AIMDLimit(
+            limit,
+            settings.admission_min_concurrency,
+            settings.admission_latency_target,
+            settings.admission_decrease_factor
+        ) if settings.admission_adaptive else None
+
+        return ConcurrencyLimiter(name, limit, settings.admission_max_queue, adaptive)
+
+    return AdmissionController(
+        limiter(GLOBAL_LIMITER, settings.admission_max_concurrency)
+        if settings.admission_max_concurrency else None,
+        {
+            template: limiter(template, limit)
+            for template, limit in parse_route_limits(settings.admission_route_limits).items()
+        },
+        settings.admission_queue_timeout,
+        settings.admission_retry_after
+    )
+
+
+admission_controller = create_admission_controller()
@@ -0,0 +1,398 @@
+import time
+import asyncio
+from collections import deque
+from functools import cached_property
+from http.cookiejar import CookieJar
+import httpx
+import orjson
+
+from src.lib.bulk import BulkResult, batches, batch_results, is_bulk_unsupported
+from src.lib.exceptions import (
+    MiaPlatformClientError,
+    MiaPlatformConnectionError,
+    MiaPlatformTimeoutError
+)
+from src.lib.mia_platform_client import (
+    BaseMiaPlatformClient,
+    MiaPlatformAuth,
+    context_headers,
+    no_cookies_policy
+)
+from src.utils.settings import get_settings
+
+
+def create_http_client(**kwargs):
+    """
+    Creates the app-wide HTTP client shared by every AsyncMiaPlatformClient.
+
+    The connection pool limits and the keep-alive expiry are read from the
+    settings, any extra keyword argument is forwarded to httpx.AsyncClient. Its
+    cookie jar stores no cookie, the client serves every user.
+    """
+
+    settings = get_settings()
+    limits = httpx.Limits(
+        max_connections=settings.http_client_max_connections,
+        max_keepalive_connections=settings.http_client_max_keepalive_connections,
+        keepalive_expiry=settings.http_client_keepalive_expiry
+    )
+
+    return httpx.AsyncClient(limits=limits, cookies=CookieJar(no_cookies_policy()), **kwargs)
+
+
+class AsyncMiaPlatformResponse(httpx.Response):
+    """
+    The responses of AsyncMiaPlatformClient, whose JSON body is decoded with orjson
+    """
+
+    def json(self, **kwargs):
+        if not kwargs:
+            try:
+                return orjson.loads(self.content)
+            except orjson.JSONDecodeError:
+                pass
+
+        return super().json(**kwargs)
+
+
+class AsyncMiaPlatformClient(BaseMiaPlatformClient):
+    """
+    Provides a non-blocking interface to make HTTP requests within a Mia Platform
+    application cluster, on top of a shared httpx.AsyncClient. The proxied headers
+    are extracted on the first request.
+
+    Args:
+        http_client (httpx.AsyncClient): The app-wide client that owns the connection pool.
+        headers: A dictionary or an ASGI header list containing the headers to be used
+            for authentication.
+        logger: A logger object.
+        policy (ClientPolicy): Timeouts and retries of the requests, unless overridden
+            by the `policy` argument of a single call.
+        cache (ResponseCache): The cache of the `get`, `get_by_id` and `count` responses,
+            reads are not cached by default.
+        single_flight (AsyncSingleFlight): The group sharing one upstream call among the
+            identical concurrent reads of the tasks, reads are not coalesced by default.
+    """
+
+    response_class = AsyncMiaPlatformResponse
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        http_client,
+        headers,
+        logger,
+        policy=None,
+        cache=None,
+        single_flight=None
+    ):
+        super().__init__(headers, logger, policy, cache, single_flight)
+        self.http_client = http_client
+
+    @cached_property
+    def headers_to_proxy(self):
+        return MiaPlatformAuth(self.headers, self.logger).headers_to_proxy
+
+    def _outgoing_headers(self, headers):
+        """
+        The headers of a call, with the proxied ones and the context headers
+        """
+
+        return {**(headers or {}), **self.headers_to_proxy, **context_headers()}
+
+    async def _request(self, operation, method, url, **kwargs):
+        with self._span(operation, method, url) as span:
+            response = await self._send(operation, method, url, **kwargs)
+            span.set('http.status_code', response.status_code)
+
+            return response
+
+    # pylint: disable=R0913
+    async def _send(
+        self,
+        operation,
+        method,
+        url,
+        policy=None,
+        revalidating=False,
+        stream=False,
+        **kwargs
+    ):
+        policy = policy or self.policy
+        kwargs.setdefault('timeout', httpx.Timeout(
+            policy.read_timeout,
+            connect=policy.connect_timeout
+        ))
+        headers = self._outgoing_headers(kwargs.pop('headers', None))
+        self._log_start(operation, method, url)
+
+        attempt = 0
+        while True:
+            breaker = self._acquire_breaker(operation, method, url)
+            start_time = time.perf_counter()
+
+            try:
+                response = await self.http_client.send(
+                    self.http_client.build_request(method, url, headers=headers, **kwargs),
+                    stream=stream
+                )
+            except httpx.TimeoutException as error:
+                failure = self._transport_failure(
+                    MiaPlatformTimeoutError, operation, method, url, breaker, error
+                )
+            except httpx.TransportError as error:
+                failure = self._transport_failure(
+                    MiaPlatformConnectionError, operation, method, url, breaker, error
+                )
+            except Exception:
+                # Any other error, e.g. an undecodable or truncated body, is a failure
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled, the request has no outcome
+                breaker.record_abort()
+                raise
+            else:
+                failure = self._response_failure(
+                    operation, method, url, breaker, response, start_time, revalidating
+                )
+                if failure is None:
+                    return response
+                if stream:
+                    await response.aread()
+
+            if not self._can_retry(policy, method, attempt, failure):
+                raise failure
+
+            await asyncio.sleep(policy.backoff(attempt))
+            attempt += 1
+
+    async def _read(self, operation, url, resource, **kwargs):
+        key = self._read_key(url, kwargs, self.headers_to_proxy)
+        if key is None:
+            return await self._request(operation, 'GET', url, **kwargs)
+
+        entry = None
+        if self.cache is not None:
+            entry = self._cached_entry(operation, key, kwargs)
+            if entry is not None and entry.is_fresh():
+                return entry.response
+
+        if self.single_flight is None:
+            return await self._fetch(operation, url, resource, key, entry, kwargs)
+
+        response, shared = await self.single_flight.run(
+            key,
+            lambda: self._fetch(operation, url, resource, key, entry, kwargs),
+            resource
+        )
+        self._record_coalescing(operation, shared)
+
+        return response
+
+    # pylint: disable=R0913
+    async def _fetch(self, operation, url, resource, key, entry, kwargs):
+        response = await self._request(
+            operation, 'GET', url, revalidating=entry is not None, **kwargs
+        )
+
+        if self.cache is None:
+            return response
+
+        return self._cache_response(operation, key, resource, entry, response)
+
+    async def _write(self, operation, method, url, resource, **kwargs):
+        try:
+            return await self._request(operation, method, url, **kwargs)
+        finally:
+            self._invalidate(resource)
+
+    async def get(self, url, **kwargs):
+        return await self._read('GET', url, url, **kwargs)
+
+    async def get_by_id(self, url, _id, **kwargs):
+        return await self._read('GET BY ID', f'{url}/{_id}', url, **kwargs)
+
+    async def count(self, url, **kwargs):
+        return await self._read('COUNT', f'{url}/count', url, **kwargs)
+
+    async def post(self, url, data=None, **kwargs):
+        return await self._write('POST', 'POST', url, url, data=data, **kwargs)
+
+    async def put(self, url, data=None, **kwargs):
+        return await self._write('PUT', 'PUT', url, url, data=data, **kwargs)
+
+    async def patch(self, url, _id, data=None, **kwargs):
+        return await self._write('PATCH', 'PATCH', f'{url}/{_id}', url, data=data, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self._write('DELETE', 'DELETE', url, url, **kwargs)
+
+    async def delete_by_id(self, url, _id, **kwargs):
+        return await self._write('DELETE BY ID', 'DELETE', f'{url}/{_id}', url, **kwargs)
+
+    async def stream(self, url, method='GET', **kwargs):
+        """
+        Sends a request without reading the response body, which is then read in
+        chunks, e.g. with `response.aiter_bytes()`. The caller must close the response.
+        """
+
+        return await self._request('STREAM', method, url, stream=True, **kwargs)
+
+    # pylint: disable=R0913
+    async def iter_all(
+        self,
+        url,
+        page_size=None,
+        prefetch=1,
+        use_count=False,
+        params=None,
+        **kwargs
+    ):
+        """
+        Yields the records of a collection page by page, with the `_skip` and `_limit`
+        query parameters, while the next `prefetch` pages are fetched in the background.
+        At most `prefetch + 1` pages are held in memory, the one being consumed
+        included.
+
+        Without `use_count` the iteration ends at the first page shorter than
+        `page_size`, with it the collection is counted first so that exactly the
+        pages holding records are fetched, `prefetch` of them concurrently.
+        """
+
+        page_size = page_size or get_settings().iter_page_size
+        params = dict(params or {})
+
+        total_pages = None
+        if use_count:
+            total = (await self.count(url, params=params, **kwargs)).json()
+            total_pages = -(-total // page_size)
+
+        def fetch(page):
+            return asyncio.ensure_future(self.get(
+                url,
+                params={**params, '_skip': page * page_size, '_limit': page_size},
+                **kwargs
+            ))
+
+        pending = deque()
+        next_page = 0
+
+        try:
+            while True:
+                # The page to consume next and the `prefetch` ones after it
+                while len(pending) <= prefetch \
+                        and (total_pages is None or next_page < total_pages):
+                    pending.append(fetch(next_page))
+                    next_page += 1
+
+                if not pending:
+                    return
+
+                records = (await pending.popleft()).json()
+                for record in records:
+                    yield record
+
+                if total_pages is None and len(records) < page_size:
+                    return
+
+                # The consumed page is released before the next one is decoded
+                del records
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def bulk_post(self, url, records, batch_size=None, concurrency=None, **kwargs):
+        """
+        Creates the records through the bulk endpoint of the collection, `batch_size`
+        records per request and at most `concurrency` requests at a time.
+        Returns a BulkResult per record, in the same order.
+        """
+
+        return await self._bulk(
+            records,
+            lambda batch: self._write(
+                'BULK POST', 'POST', f'{url}/bulk', url, json=batch, **kwargs
+            ),
+            lambda record: self.post(url, json=record, **kwargs),
+            batch_size,
+            concurrency
+        )
+
+    async def bulk_patch(self, url, updates, batch_size=None, concurrency=None, **kwargs):
+        """
+        Applies the (_id, update) pairs through the bulk endpoint of the collection,
+        `batch_size` updates per request and at most `concurrency` requests at a time.
+        Returns a BulkResult per pair, in the same order.
+        """
+
+        return await self._bulk(
+            updates,
+            lambda batch: self._write(
+                'BULK PATCH', 'PATCH', f'{url}/bulk', url,
+                json=[{'filter': {'_id': _id}, 'update': update} for _id, update in batch],
+                **kwargs
+            ),
+            lambda pair: self.patch(url, pair[0], json=pair[1], **kwargs),
+            batch_size,
+            concurrency
+        )
+
+    async def bulk_delete(self, url, ids, concurrency=None, **kwargs):
+        """
+        Deletes the records with the given ids, at most `concurrency` requests at a time.
+        Returns a BulkResult per id, in the same order.
+        """
+
+        return await self._bulk(
+            ids,
+            None,
+            lambda _id: self.delete_by_id(url, _id, **kwargs),
+            concurrency=concurrency
+        )
+
+    # pylint: disable=R0913
+    async def _bulk(self, items, send_batch, send_item, batch_size=None, concurrency=None):
+        """
+        Sends the items in batches through `send_batch`, concurrently. When the first
+        batch finds no bulk endpoint, or there is no `send_batch`, every item is sent
+        on its own through `send_item`.
+        """
+
+        item_batches = batches(items, batch_size)
+        semaphore = asyncio.Semaphore(concurrency or get_settings().bulk_concurrency)
+
+        async def bounded(function, *args):
+            async with semaphore:
+                return await function(*args)
+
+        if send_batch is not None and item_batches:
+            first = await self._send_batch(send_batch, item_batches[0], probe=True)
+
+            if first is not None:
+                rest = await asyncio.gather(*[
+                    bounded(self._send_batch, send_batch, batch) for batch in item_batches[1:]
+                ])
+                return first + [result for results in rest for result in results]
+
+        return list(await asyncio.gather(*[
+            bounded(self._send_item, send_item, item)
+            for batch in item_batches for item in batch
+        ]))
+
+    @staticmethod
+    async def _send_batch(send_batch, batch, probe=False):
+        try:
+            return batch_results(batch, response=await send_batch(batch))
+        except MiaPlatformClientError as error:
+            if probe and is_bulk_unsupported(error):
+                return None
+            return batch_results(batch, error=error)
+
+    @staticmethod
+    async def _send_item(send_item, item):
+        try:
+            return BulkResult(item, response=await send_item(item))
+        except MiaPlatformClientError as error:
+            return BulkResult(item, error=error)
@@ -0,0 +1,111 @@
+import time
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+
+from src.lib.metrics import (
+    BLOCKING_POOL_BUSY,
+    BLOCKING_POOL_QUEUED,
+    BLOCKING_POOL_QUEUE_WAIT,
+    BLOCKING_POOL_THREADS
+)
+from src.utils.settings import get_settings
+
+
+class BlockingPool:
+    """
+    A bounded thread pool running blocking calls for the event loop. It is separate
+    from the anyio one serving `run_in_threadpool` and the sync handlers, so slow
+    upstream calls cannot take all of its threads.
+
+    The calls run with the context of the caller, the request context and the current
+    span included. The threads are started on demand and stopped by `shutdown`.
+
+    Args:
+        name (str): The name of the pool, labelling its metrics and threads.
+        max_workers (int): The number of threads.
+    """
+
+    def __init__(self, name, max_workers):
+        self.name = name
+        self.max_workers = max_workers
+        self.executor = None
+        self.queued = 0
+        self.busy = 0
+        self.labels = (name,)
+        # The counters are updated by the event loop and by the threads
+        self._lock = threading.Lock()
+
+        BLOCKING_POOL_THREADS.set(self.labels, max_workers)
+        self._report()
+
+    async def run(self, function, *args, **kwargs):
+        """
+        Runs `function(*args, **kwargs)` on a thread of the pool and returns its result.
+        A call cancelled while queued never runs.
+        """
+
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix=self.name)
+
+        with self._lock:
+            self.queued += 1
+            self._report()
+
+        future = self.executor.submit(
+            self._call,
+            copy_context(),
+            partial(function, *args, **kwargs),
+            time.perf_counter()
+        )
+        future.add_done_callback(self._forget_cancelled)
+
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        """
+        Stops the threads once their calls are done and drops the queued calls,
+        the next call starts the pool again
+        """
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def _call(self, context, function, submitted_at):
+        with self._lock:
+            self.queued -= 1
+            self.busy += 1
+            BLOCKING_POOL_QUEUE_WAIT.observe(self.labels, time.perf_counter() - submitted_at)
+            self._report()
+
+        try:
+            return context.run(function)
+        finally:
+            with self._lock:
+                self.busy -= 1
+                self._report()
+
+    def _forget_cancelled(self, future):
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+                self._report()
+
+    def _report(self):
+        BLOCKING_POOL_QUEUED.set(self.labels, self.queued)
+        BLOCKING_POOL_BUSY.set(self.labels, self.busy)
+
+
+def create_blocking_pool():
+    """
+    Returns the process-wide pool of the blocking upstream calls, BLOCKING_POOL_SIZE
+    threads large
+    """
+
+    return BlockingPool('mia_platform_client', get_settings().blocking_pool_size)
+
+
+blocking_pool = create_blocking_pool()
@@ -0,0 +1,55 @@
+from itertools import islice
+
+from src.lib.exceptions import MiaPlatformHTTPError
+from src.utils.settings import get_settings
+
+
+# Status codes of a CRUD service without the bulk endpoints
+BULK_UNSUPPORTED_STATUS_CODES = frozenset((404, 405))
+
+
+class BulkResult:
+    """
+    The outcome of one item of a bulk operation.
+
+    Args:
+        item: The record, the (_id, update) pair or the _id sent upstream.
+        response: The upstream response covering the item, shared by the whole
+            batch when the bulk endpoint was used.
+        error (MiaPlatformClientError): The error the item failed with, if any.
+    """
+
+    __slots__ = ('item', 'response', 'error')
+
+    def __init__(self, item, response=None, error=None):
+        self.item = item
+        self.response = response
+        self.error = error
+
+    @property
+    def succeeded(self):
+        return self.error is None
+
+    def __repr__(self):
+        outcome = f'error={self.error!r}' if self.error else f'response={self.response!r}'
+        return f'BulkResult(item={self.item!r}, {outcome})'
+
+
+def batches(items, batch_size=None):
+    """
+    Splits an iterable in lists of `batch_size` items, BULK_BATCH_SIZE by default
+    """
+
+    batch_size = batch_size or get_settings().bulk_batch_size
+    iterator = iter(items)
+
+    return list(iter(lambda: list(islice(iterator, batch_size)), []))
+
+
+def batch_results(batch, response=None, error=None):
+    return [BulkResult(item, response, error) for item in batch]
+
+
+def is_bulk_unsupported(error):
+    return isinstance(error, MiaPlatformHTTPError) \
+        and error.status_code in BULK_UNSUPPORTED_STATUS_CODES
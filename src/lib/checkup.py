@@ -0,0 +1,123 @@
+import time
+import asyncio
+
+from src.lib.resilience import ClientPolicy
+from src.utils.logger import get_logger
+from src.utils.settings import get_settings
+
+
+def http_check(url, **kwargs):
+    """
+    Builds a check that GETs the given URL through the Mia Platform client,
+    any 2xx response means the dependency is available. The dependency is probed
+    with a single attempt, the check-up has its own timeout and cache.
+    """
+
+    async def check(app):
+        # pylint: disable=C0415
+        from src.lib.async_mia_platform_client import AsyncMiaPlatformClient
+
+        client = AsyncMiaPlatformClient(
+            app.state.http_client,
+            {},
+            get_logger(),
+            policy=ClientPolicy(retries=0)
+        )
+        await client.get(url, **kwargs)
+
+    return check
+
+
+def tcp_check(host, port):
+    """
+    Builds a check that opens, and immediately closes, a TCP connection.
+    """
+
+    async def check(_app):
+        _, writer = await asyncio.open_connection(host, port)
+        writer.close()
+        await writer.wait_closed()
+
+    return check
+
+
+class CheckUpRegistry:
+    """
+    Collects the dependency checks run by the /-/check-up route.
+
+    Checks are async callables receiving the FastAPI application, a check fails
+    by raising or by running longer than its timeout. All the checks run
+    concurrently and the aggregated result is cached for `ttl` seconds, so
+    frequent probes do not turn into upstream load.
+
+    Args:
+        ttl (float): How long, in seconds, the aggregated result is cached.
+        timeout (float): The default per-check timeout, in seconds.
+    """
+
+    def __init__(self, ttl, timeout):
+        self.ttl = ttl
+        self.timeout = timeout
+        self.checks = {}
+        self._result = None
+        self._expires_at = 0
+        self._lock = asyncio.Lock()
+
+    def register(self, name, check, timeout=None):
+        self.checks[name] = (check, timeout or self.timeout)
+        self.invalidate()
+
+    def unregister(self, name):
+        self.checks.pop(name, None)
+        self.invalidate()
+
+    def invalidate(self):
+        self._result = None
+        self._expires_at = 0
+
+    async def run(self, app):
+        """
+        Returns the cached result, running the checks again once it is expired.
+
+        The result is a tuple of the overall status and the per-dependency breakdown.
+        """
+
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return self._result
+
+        async with self._lock:
+            if self._result is None or time.monotonic() >= self._expires_at:
+                names = list(self.checks)
+                outcomes = await asyncio.gather(*(
+                    self._run_check(app, *self.checks[name]) for name in names
+                ))
+                checks = dict(zip(names, outcomes))
+
+                self._result = (all(check['statusOk'] for check in outcomes), checks)
+                self._expires_at = time.monotonic() + self.ttl
+
+        return self._result
+
+    @staticmethod
+    async def _run_check(app, check, timeout):
+        start = time.perf_counter()
+        error = None
+
+        try:
+            await asyncio.wait_for(check(app), timeout)
+        except asyncio.TimeoutError:
+            error = f'Timed out after {timeout}s'
+        except Exception as exception:  # pylint: disable=W0703
+            error = str(exception) or type(exception).__name__
+
+        return {
+            'statusOk': error is None,
+            'durationMs': round((time.perf_counter() - start) * 1000, 3),
+            'error': error,
+        }
+
+
+checkup_registry = CheckUpRegistry(
+    ttl=get_settings().checkup_cache_ttl,
+    timeout=get_settings().checkup_timeout
+)
@@ -0,0 +1,217 @@
+import gzip
+import zlib
+from functools import lru_cache, partial
+
+from src.lib.blocking_pool import BlockingPool
+from src.utils.settings import get_settings
+
+try:
+    import brotli
+except ImportError:
+    # Brotli is optional, without it the responses are only gzipped
+    brotli = None
+
+
+COMPRESSIBLE_MEDIA_TYPES = frozenset((
+    b'application/json',
+    b'application/x-ndjson',
+    b'application/javascript',
+    b'application/xml',
+    b'image/svg+xml',
+))
+
+# gzip wrapper around the deflate stream, for zlib.compressobj
+GZIP_WBITS = 31
+
+
+def is_compressible(content_type):
+    """
+    Whether a Content-Type header value names a textual media type worth compressing
+    """
+
+    media_type = content_type.split(b';', 1)[0].strip().lower()
+
+    return media_type in COMPRESSIBLE_MEDIA_TYPES \
+        or media_type.startswith(b'text/') \
+        or media_type.endswith((b'+json', b'+xml'))
+
+
+def _quality(params):
+    for param in params.split(';'):
+        name, _, value = param.partition('=')
+        if name.strip() == 'q':
+            try:
+                return float(value)
+            except ValueError:
+                return 0.0
+
+    return 1.0
+
+
+@lru_cache(maxsize=256)
+def negotiate(accept_encoding, encodings):
+    """
+    Returns the encoding of `encodings`, in order of preference, with the highest
+    quality in an Accept-Encoding header value, None when none is accepted
+    """
+
+    qualities = {}
+    for entry in accept_encoding.lower().split(','):
+        name, _, params = entry.partition(';')
+        qualities[name.strip()] = _quality(params)
+
+    best, best_quality = None, 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+
+    return best
+
+
+class StreamCompressor:
+    """
+    Compresses a body sent in chunks, every chunk is flushed so the client can
+    decode it as soon as it arrives
+    """
+
+    def __init__(self, encoding, gzip_level, brotli_quality):
+        if encoding == 'br':
+            self.compressor = brotli.Compressor(quality=brotli_quality)
+            self.compress_chunk = self.compressor.process
+            self.flush = self.compressor.flush
+            self.finish = self.compressor.finish
+        else:
+            self.compressor = zlib.compressobj(gzip_level, zlib.DEFLATED, GZIP_WBITS)
+            self.compress_chunk = self.compressor.compress
+            self.flush = partial(self.compressor.flush, zlib.Z_SYNC_FLUSH)
+            self.finish = self.compressor.flush
+
+    def compress(self, chunk, last=False):
+        compressed = self.compress_chunk(chunk)
+
+        return compressed + (self.finish() if last else self.flush())
+
+
+class Compressor:  # pylint: disable=R0902
+    """
+    Compresses the response bodies with the available encodings, brotli when the
+    brotli package is installed, then gzip.
+
+    Constant bodies are compressed once, by `precompress`, and served from memory.
+
+    Args:
+        minimum_size (int): The size in bytes under which bodies are sent as they are.
+        gzip_level (int): The gzip compression level, from 1 to 9.
+        brotli_quality (int): The brotli quality, from 0 to 11.
+        offload_size (int): The size in bytes from which bodies and chunks are
+            compressed on the threads of `pool`, not on the event loop.
+        pool (BlockingPool): The threads compressing the large bodies, without one
+            every body is compressed on the event loop.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        minimum_size=500,
+        gzip_level=6,
+        brotli_quality=4,
+        offload_size=64 * 1024,
+        pool=None
+    ):
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.offload_size = offload_size
+        self.pool = pool
+
+        self.codecs = {}
+        if brotli is not None:
+            self.codecs['br'] = partial(brotli.compress, quality=brotli_quality)
+        self.codecs['gzip'] = partial(gzip.compress, compresslevel=gzip_level, mtime=0)
+        self.encodings = tuple(self.codecs)
+
+        self.constants = {}
+        self.largest_constant = 0
+
+    def negotiate(self, headers):
+        """
+        The encoding accepted by the client of an ASGI header list, None for identity
+        """
+
+        for key, value in headers:
+            if key == b'accept-encoding':
+                return negotiate(value.decode('latin-1'), self.encodings)
+
+        return None
+
+    def compress(self, body, encoding):
+        return self.codecs[encoding](body)
+
+    async def compress_async(self, body, encoding):
+        """
+        Compresses the body, on a thread of the pool when it is large
+        """
+
+        if self.pool is not None and len(body) >= self.offload_size:
+            return await self.pool.run(self.compress, body, encoding)
+
+        return self.compress(body, encoding)
+
+    def stream(self, encoding):
+        return StreamCompressor(encoding, self.gzip_level, self.brotli_quality)
+
+    def precompress(self, body):
+        """
+        Compresses a constant body once with every encoding, when it is large enough
+        to be compressed and gets smaller. Meant to be called at import time.
+        """
+
+        if len(body) < self.minimum_size or body in self.constants:
+            return body
+
+        variants = {encoding: self.compress(body, encoding) for encoding in self.encodings}
+        self.constants[body] = {
+            encoding: compressed
+            for encoding, compressed in variants.items()
+            if len(compressed) < len(body)
+        }
+        self.largest_constant = max(self.largest_constant, len(body))
+
+        return body
+
+    def variants(self, body):
+        """
+        The pre-compressed versions of a body by encoding, empty unless it is a constant
+        """
+
+        if len(body) > self.largest_constant:
+            return {}
+
+        return self.constants.get(body, {})
+
+    def shutdown(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+def create_compressor():
+    """
+    Returns the process-wide compressor, or None when COMPRESSION_ENABLED is off
+    """
+
+    settings = get_settings()
+
+    if not settings.compression_enabled:
+        return None
+
+    return Compressor(
+        settings.compression_minimum_size,
+        settings.compression_gzip_level,
+        settings.compression_brotli_quality,
+        settings.compression_offload_size,
+        BlockingPool('compression', settings.compression_threads)
+    )
+
+
+compressor = create_compressor()
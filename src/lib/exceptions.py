@@ -0,0 +1,42 @@
+class MiaPlatformClientError(Exception):
+    """
+    Base class of the errors raised by the Mia Platform clients.
+
+    Args:
+        message (str): The error message.
+        url (str): The URL of the upstream request.
+        status_code (int): The status code of the upstream response, if any.
+    """
+
+    def __init__(self, message, url, status_code=None):
+        super().__init__(message)
+        self.url = url
+        self.status_code = status_code
+
+
+class MiaPlatformHTTPError(MiaPlatformClientError):
+    """
+    The upstream service responded with a non-2xx status code
+    """
+
+    def __init__(self, message, url, status_code, response):
+        super().__init__(message, url, status_code)
+        self.response = response
+
+
+class MiaPlatformTimeoutError(MiaPlatformClientError):
+    """
+    The upstream service did not accept the connection or did not respond in time
+    """
+
+
+class MiaPlatformConnectionError(MiaPlatformClientError):
+    """
+    The connection to the upstream service failed
+    """
+
+
+class CircuitOpenError(MiaPlatformClientError):
+    """
+    The request was not sent because the circuit breaker of the upstream host is open
+    """
@@ -0,0 +1,134 @@
+import hashlib
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import HTTPException, Request
+from fastapi.responses import Response
+
+from src.lib.responses import EncodedJSONResponse
+
+
+CONDITIONAL_METHODS = frozenset(('GET', 'HEAD'))
+
+
+def strong_etag(body):
+    """
+    A strong ETag of a body, the quoted hex digest of its content
+    """
+
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Whether an If-None-Match header value matches an ETag, with the weak
+    comparison the header calls for
+    """
+
+    if if_none_match.strip() == '*':
+        return True
+
+    opaque_tag = etag.removeprefix('W/')
+
+    return any(
+        candidate.strip().removeprefix('W/') == opaque_tag
+        for candidate in if_none_match.split(',')
+    )
+
+
+def is_not_modified(headers, etag=None, last_modified=None):
+    """
+    Whether the conditional headers of a request match the current representation.
+    If-Modified-Since is only evaluated without an If-None-Match header.
+
+    Args:
+        headers: The request headers.
+        etag (str): The ETag of the representation, if known.
+        last_modified (float): The POSIX timestamp of its last change, if known.
+    """
+
+    if_none_match = headers.get('if-none-match')
+    if if_none_match is not None:
+        return etag is not None and etag_matches(if_none_match, etag)
+
+    if_modified_since = headers.get('if-modified-since')
+    if if_modified_since is None or last_modified is None:
+        return False
+
+    try:
+        since = parsedate_to_datetime(if_modified_since).timestamp()
+    except (TypeError, ValueError):
+        return False
+
+    # The HTTP dates have a resolution of one second
+    return int(last_modified) <= since
+
+
+class CachePolicy:
+    """
+    The HTTP caching policy of a route: its Cache-Control, Last-Modified and, for a
+    constant body, its strong ETag, computed once.
+
+    The handler returns its body through `response`, which answers the conditional
+    GET and HEAD requests matching it with a 304:
+
+        HELLO_WORLD_CACHE = CachePolicy('public, max-age=60', body=HELLO_WORLD_BODY)
+
+        @router.get('/')
+        async def hello_world(request: Request):
+            return HELLO_WORLD_CACHE.response(HELLO_WORLD_BODY, request)
+
+    Used as a route dependency, it answers them before the handler runs, which only
+    pays off when the handler does more than return a constant body.
+
+    Args:
+        cache_control (str): The Cache-Control header value.
+        body (bytes): The constant body of the route, if any.
+        last_modified (float): The POSIX timestamp of the last change of the body, if known.
+    """
+
+    def __init__(self, cache_control='no-cache', body=None, last_modified=None):
+        self.cache_control = cache_control
+        self.body = body
+        self.last_modified = last_modified
+        self.etag = strong_etag(body) if body is not None else None
+        self.headers = self.validators(self.etag)
+
+    def validators(self, etag=None):
+        """
+        The caching headers of a representation with the given ETag
+        """
+
+        headers = {'cache-control': self.cache_control}
+
+        if etag is not None:
+            headers['etag'] = etag
+        if self.last_modified is not None:
+            headers['last-modified'] = formatdate(self.last_modified, usegmt=True)
+
+        return headers
+
+    async def __call__(self, request: Request):
+        if (
+            request.method in CONDITIONAL_METHODS
+            and (self.etag is not None or self.last_modified is not None)
+            and is_not_modified(request.headers, self.etag, self.last_modified)
+        ):
+            raise HTTPException(status_code=304, headers=self.headers)
+
+    def response(self, body, request=None, response_class=EncodedJSONResponse, status_code=200):
+        """
+        Returns an encoded body with the caching headers. The ETag of the constant body
+        is the precomputed one, any other body is hashed and, given the request,
+        answered with a 304 when the client already holds it.
+        """
+
+        if body is self.body:
+            headers = self.headers
+        else:
+            headers = self.validators(strong_etag(body))
+
+        if request is not None \
+                and request.method in CONDITIONAL_METHODS \
+                and is_not_modified(request.headers, headers.get('etag'), self.last_modified):
+            return Response(status_code=304, headers=headers)
+
+        return response_class(body, status_code=status_code, headers=headers)
@@ -0,0 +1,361 @@
+import os
+import glob
+import asyncio
+import threading
+from bisect import bisect_left
+import orjson
+
+from src.utils.logger import get_logger
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+class Metric:
+    """
+    A metric family, holding one sample per combination of label values.
+
+    Samples live in plain per-process dicts, updated under a lock per metric as the
+    sync clients record them from several threads. Every uvicorn worker owns its
+    registry, and the workers are aggregated at scrape time.
+    """
+
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.samples = {}
+        self._lock = threading.Lock()
+
+    def snapshot(self):
+        with self._lock:
+            samples = [
+                [list(labels), self._copy_value(value)] for labels, value in self.samples.items()
+            ]
+
+        return {
+            'kind': self.kind,
+            'help': self.documentation,
+            'labelnames': list(self.labelnames),
+            'samples': samples,
+        }
+
+    @staticmethod
+    def _copy_value(value):
+        return value
+
+
+class Counter(Metric):
+    """
+    A monotonically increasing value
+    """
+
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self.samples[labels] = self.samples.get(labels, 0) + amount
+
+
+class Gauge(Metric):
+    """
+    A value that can go up and down
+    """
+
+    kind = 'gauge'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self.samples[labels] = self.samples.get(labels, 0) + amount
+
+    def dec(self, labels=(), amount=1):
+        with self._lock:
+            self.samples[labels] = self.samples.get(labels, 0) - amount
+
+    def set(self, labels=(), value=0):
+        with self._lock:
+            self.samples[labels] = value
+
+
+class Histogram(Metric):
+    """
+    Counts observations in buckets, each sample is a list holding the
+    non-cumulative bucket counts followed by the sum of the observations
+    """
+
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, labels=(), value=0):
+        index = bisect_left(self.buckets, value)
+
+        with self._lock:
+            sample = self.samples.get(labels)
+            if sample is None:
+                sample = self.samples[labels] = [0] * (len(self.buckets) + 2)
+
+            sample[index] += 1
+            sample[-1] += value
+
+    def snapshot(self):
+        return {**super().snapshot(), 'buckets': list(self.buckets)}
+
+    @staticmethod
+    def _copy_value(value):
+        # The bucket counts keep changing after the snapshot
+        return list(value)
+
+
+class MetricsRegistry:
+    """
+    Collects the metrics of the process and renders them in the Prometheus text format.
+
+    When uvicorn runs several workers, each worker periodically writes its snapshot
+    in a shared directory and the scraped worker merges all of them.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+
+    def _register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self):
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+    def write_snapshot(self, directory, snapshot=None):
+        """
+        Atomically writes the snapshot of this process in the given directory. A
+        failed write is logged, the other workers keep the previous snapshot.
+        """
+
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        temporary_path = f'{path}.tmp'
+
+        try:
+            with open(temporary_path, 'wb') as snapshot_file:
+                snapshot_file.write(orjson.dumps(snapshot or self.snapshot()))
+            os.replace(temporary_path, path)
+        except OSError as error:
+            get_logger().error(f'Could not write the metrics snapshot to {directory}: {error}')
+
+    def collect(self, directory=None):
+        """
+        Returns the snapshot of this process, merged with the ones of the other
+        workers when a multiprocess directory is given
+        """
+
+        if not directory:
+            return self.snapshot()
+
+        snapshot = self.snapshot()
+        self.write_snapshot(directory, snapshot)
+
+        snapshots = [(snapshot, True)]
+        for path in glob.glob(os.path.join(directory, '*.json')):
+            pid = int(os.path.basename(path).split('.')[0])
+            if pid == os.getpid():
+                continue
+
+            try:
+                with open(path, 'rb') as snapshot_file:
+                    snapshots.append((orjson.loads(snapshot_file.read()), is_alive(pid)))
+            except (OSError, orjson.JSONDecodeError):
+                continue
+
+        return merge_snapshots(snapshots)
+
+
+async def flush_periodically(metrics_registry, directory, interval):
+    """
+    Writes the snapshot of this process every `interval` seconds, so that the
+    worker serving a scrape sees recent metrics from the other workers. The
+    snapshots are written on a thread, not on the event loop.
+    """
+
+    try:
+        while True:
+            await asyncio.to_thread(metrics_registry.write_snapshot, directory)
+            await asyncio.sleep(interval)
+    finally:
+        metrics_registry.write_snapshot(directory)
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+
+    return True
+
+
+def merge_snapshots(snapshots):
+    """
+    Sums the samples of several snapshots, the gauges of dead workers are skipped
+    """
+
+    merged = {}
+
+    for snapshot, alive in snapshots:
+        for name, family in snapshot.items():
+            if family['kind'] == 'gauge' and not alive:
+                continue
+
+            target = merged.setdefault(name, {**family, 'samples': {}})
+            for labels, value in family['samples']:
+                key = tuple(labels)
+                if family['kind'] == 'histogram':
+                    current = target['samples'].get(key)
+                    target['samples'][key] = value if current is None \
+                        else [a + b for a, b in zip(current, value)]
+                else:
+                    target['samples'][key] = target['samples'].get(key, 0) + value
+
+    for family in merged.values():
+        family['samples'] = [[list(labels), value] for labels, value in family['samples'].items()]
+
+    return merged
+
+
+def _format_labels(names, values, extra=''):
+    pairs = [
+        f'{name}="{escape_label_value(value)}"'
+        for name, value in zip(names, values)
+    ]
+    if extra:
+        pairs.append(extra)
+
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def escape_label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshot):
+    """
+    Renders a snapshot in the Prometheus text exposition format
+    """
+
+    lines = []
+
+    for name, family in snapshot.items():
+        lines.append(f'# HELP {name} {family["help"]}')
+        lines.append(f'# TYPE {name} {family["kind"]}')
+        names = family['labelnames']
+
+        for labels, value in family['samples']:
+            if family['kind'] != 'histogram':
+                lines.append(f'{name}{_format_labels(names, labels)} {_format_value(value)}')
+                continue
+
+            cumulative = 0
+            for bound, count in zip([*family['buckets'], float('inf')], value[:-1]):
+                cumulative += count
+                bound_label = f'le="{_format_value(float(bound))}"'
+                lines.append(
+                    f'{name}_bucket{_format_labels(names, labels, bound_label)} {cumulative}'
+                )
+            lines.append(f'{name}_sum{_format_labels(names, labels)} {_format_value(value[-1])}')
+            lines.append(f'{name}_count{_format_labels(names, labels)} {cumulative}')
+
+    return '\n'.join(lines) + '\n'
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    'http_requests_total',
+    'Total number of HTTP requests served',
+    ('method', 'route', 'status')
+)
+HTTP_REQUESTS_IN_FLIGHT = registry.gauge(
+    'http_requests_in_flight',
+    'Number of HTTP requests being served'
+)
+HTTP_REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds',
+    'Latency of the HTTP requests, by route template',
+    ('method', 'route')
+)
+UPSTREAM_REQUESTS = registry.counter(
+    'mia_platform_client_requests_total',
+    'Total number of upstream requests made by the Mia Platform clients',
+    ('client', 'operation', 'status')
+)
+UPSTREAM_REQUEST_DURATION = registry.histogram(
+    'mia_platform_client_request_duration_seconds',
+    'Latency of the upstream requests made by the Mia Platform clients',
+    ('client', 'operation')
+)
+RESPONSE_CACHE_LOOKUPS = registry.counter(
+    'mia_platform_client_cache_lookups_total',
+    'Cached reads of the Mia Platform clients, by result (hit, revalidated or miss)',
+    ('client', 'operation', 'result')
+)
+COALESCED_READS = registry.counter(
+    'mia_platform_client_coalesced_reads_total',
+    'Reads of the Mia Platform clients that were sent upstream or shared an identical'
+    ' in-flight call, the coalescing ratio is shared / (sent + shared)',
+    ('client', 'operation', 'result')
+)
+ADMISSION_REJECTED = registry.counter(
+    'http_requests_rejected_total',
+    'Requests shed by the admission control, by limiter and reason (queue_full or timeout)',
+    ('limiter', 'reason')
+)
+ADMISSION_LIMIT = registry.gauge(
+    'http_concurrency_limit',
+    'Current concurrency limit of the admission control, by limiter',
+    ('limiter',)
+)
+RATE_LIMITED = registry.counter(
+    'http_requests_rate_limited_total',
+    'Requests answered with a 429 by the rate limiter, by the header whose rate they exceeded',
+    ('header',)
+)
+BLOCKING_POOL_THREADS = registry.gauge(
+    'blocking_pool_threads',
+    'Size of the thread pools running the blocking calls, by pool',
+    ('pool',)
+)
+BLOCKING_POOL_BUSY = registry.gauge(
+    'blocking_pool_busy_threads',
+    'Threads running a blocking call, by pool: the saturation is busy / threads',
+    ('pool',)
+)
+BLOCKING_POOL_QUEUED = registry.gauge(
+    'blocking_pool_queued_calls',
+    'Blocking calls waiting for a free thread, by pool',
+    ('pool',)
+)
+BLOCKING_POOL_QUEUE_WAIT = registry.histogram(
+    'blocking_pool_queue_wait_seconds',
+    'Time the blocking calls waited for a free thread, by pool',
+    ('pool',)
+)
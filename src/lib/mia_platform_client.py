@@ -1,170 +1,631 @@
-import os
+import time
+import logging
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from http.cookiejar import DefaultCookiePolicy
+from functools import cached_property, lru_cache, partial
+import orjson
 import requests
 
+from src.lib.blocking_pool import blocking_pool
+from src.lib.bulk import BulkResult, batches, batch_results, is_bulk_unsupported
+from src.lib.exceptions import (
+    CircuitOpenError,
+    MiaPlatformClientError,
+    MiaPlatformConnectionError,
+    MiaPlatformHTTPError,
+    MiaPlatformTimeoutError
+)
+from src.lib.metrics import (
+    UPSTREAM_REQUESTS,
+    UPSTREAM_REQUEST_DURATION,
+    RESPONSE_CACHE_LOOKUPS,
+    COALESCED_READS
+)
+from src.lib.response_cache import freeze
+from src.lib.resilience import RETRYABLE_STATUS_CODES, ClientPolicy, circuit_breakers
+from src.lib.tracing import TRACEPARENT_HEADER, current_traceparent, tracer
+from src.utils.request_context import REQUEST_ID_HEADER, bind_request_context, get_request_id
+from src.utils.settings import get_settings
+
+
+def no_cookies_policy():
+    """
+    The cookie policy of the shared HTTP clients, storing no cookie: they serve
+    every user, so a cookie set by the upstream for one must not reach the others
+    """
+
+    return DefaultCookiePolicy(allowed_domains=[])
+
+
+@lru_cache(maxsize=None)
+def get_shared_session():
+    """
+    Returns the process-wide requests.Session, creating it on first use.
+
+    The session owns the connection pool shared by every MiaPlatformClient, so
+    connections and TLS sessions to the upstream services are reused across requests.
+    Its cookie jar stores no cookie, the session serves every user.
+    """
+
+    adapter = requests.adapters.HTTPAdapter(
+        pool_maxsize=get_settings().http_client_max_keepalive_connections
+    )
+
+    session = requests.Session()
+    session.cookies.set_policy(no_cookies_policy())
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+    return session
+
+
+def close_shared_session():
+    if get_shared_session.cache_info().currsize:
+        get_shared_session().close()
+        get_shared_session.cache_clear()
+
+
+def context_headers():
+    """
+    The headers correlating an upstream call with the request being served: its id
+    and the traceparent of the current span
+    """
+
+    headers = {}
+
+    request_id = get_request_id()
+    if request_id is not None:
+        headers[REQUEST_ID_HEADER] = request_id
+
+    traceparent = current_traceparent()
+    if traceparent is not None:
+        headers[TRACEPARENT_HEADER] = traceparent
+
+    return headers
+
+
+class MiaPlatformResponse(requests.Response):
+    """
+    The responses of MiaPlatformClient, whose JSON body is decoded with orjson
+    """
+
+    def json(self, **kwargs):
+        if not kwargs:
+            try:
+                return orjson.loads(self.content)
+            except orjson.JSONDecodeError:
+                pass
+
+        return super().json(**kwargs)
+
 
 class MiaPlatformAuth(requests.auth.AuthBase):
     """
     Attaches HTTP headers to the given request object for Mia Platform authentication.
+
+    Only the headers listed in the HEADER_KEYS_TO_PROXY setting are kept, they are
+    extracted with a single pass over the incoming headers. The id of the request
+    being served and the trace context, if any, are sent as x-request-id and traceparent.
         
     Args:
-        headers (dict): A dictionary containing the headers to be attached to the request.
+        headers: A dictionary or an ASGI header list containing the headers to be
+            attached to the request.
         logger: A logger object.
     """
 
     def __init__(self, headers, logger):
+        settings = get_settings()
         self.headers_to_proxy = {}
 
-        header_keys_to_proxy = os.environ.get(
-            'HEADER_KEYS_TO_PROXY'
-        ).split(',')
-
-        for header_key in header_keys_to_proxy:
-            try:
-                self.headers_to_proxy[header_key] = headers[header_key]
-            except KeyError:
-                logger.debug(
-                    f'The parameter "{header_key}" is missing from the request headers'
-                )
+        if isinstance(headers, Mapping):
+            keys_to_proxy = settings.proxied_header_keys
+            for key, value in headers.items():
+                key = key.lower()
+                if key in keys_to_proxy and key not in self.headers_to_proxy:
+                    self.headers_to_proxy[key] = value
+        else:
+            raw_keys_to_proxy = settings.proxied_raw_header_keys
+            for raw_key, raw_value in headers:
+                key = raw_keys_to_proxy.get(raw_key)
+                if key is not None and key not in self.headers_to_proxy:
+                    self.headers_to_proxy[key] = raw_value.decode('latin-1')
+
+        if logger.isEnabledFor(logging.DEBUG):
+            for header_key in settings.proxied_header_keys:
+                if header_key not in self.headers_to_proxy:
+                    logger.debug(
+                        f'The parameter "{header_key}" is missing from the request headers'
+                    )
 
     def __call__(self, request):
         for key, value in self.headers_to_proxy.items():
             request.headers[key] = value
 
+        request.headers.update(context_headers())
+
         return request
 
 
-class MiaPlatformClient():
+class BaseMiaPlatformClient():
     """
-    Provides a simple interface to make HTTP requests within a Mia Platform application cluster.
+    Logging, metrics, circuit breaking and error handling shared by the Mia Platform clients.
 
     Args:
-        headers (dict): A dictionary containing the headers to be used for authentication.
+        headers: A dictionary or an ASGI header list containing the headers to be used
+            for authentication.
         logger: A logger object.
+        policy (ClientPolicy): Timeouts and retries of the requests, unless overridden
+            by the `policy` argument of a single call.
+        cache (ResponseCache): The cache of the `get`, `get_by_id` and `count` responses,
+            reads are not cached by default.
+        single_flight: The group sharing one upstream call among the identical
+            concurrent reads, reads are not coalesced by default.
     """
 
-    def __init__(self, headers, logger):
-        self.session = requests.Session()
-        self.session.auth = MiaPlatformAuth(headers, logger)
-        self.logger = logger
+    # The class of the responses, decoding their JSON body with orjson
+    response_class = MiaPlatformResponse
 
-    def get(self, url, **kwargs):
-        self.logger.debug(f'Start - MiaPlatformClient GET {url}')
+    # Reads with other arguments, e.g. a streamed body, are neither cached nor coalesced
+    CACHEABLE_ARGUMENTS = frozenset(('params', 'headers', 'policy', 'timeout'))
 
-        response = self.session.get(url, **kwargs)
+    # pylint: disable=R0913
+    def __init__(self, headers, logger, policy=None, cache=None, single_flight=None):
+        self.headers = headers
+        self.logger = logger
+        self.policy = policy or ClientPolicy()
+        self.cache = cache
+        self.single_flight = single_flight
+
+    def _read_key(self, url, kwargs, headers_to_proxy):
+        """
+        Returns the key identifying a read in the cache and in the single-flight group,
+        None when it must be sent as is. The proxied identity headers are part of the
+        key, so user-scoped data is never shared between callers, the request id is not.
+        So is the response class, the sync and async clients share the cache.
+        """
+
+        if self.cache is None and self.single_flight is None:
+            return None
+        if not self.CACHEABLE_ARGUMENTS.issuperset(kwargs):
+            return None
+
+        return (
+            self.response_class,
+            url,
+            freeze(kwargs.get('params')),
+            freeze(kwargs.get('headers')),
+            freeze({
+                key: value for key, value in headers_to_proxy.items()
+                if key != REQUEST_ID_HEADER
+            })
+        )
+
+    def _cached_entry(self, operation, key, kwargs):
+        """
+        Returns the cached entry of a read, adding the validators to the request
+        headers when the entry is stale
+        """
+
+        entry = self.cache.get(key)
+
+        if entry is not None and not entry.is_fresh():
+            kwargs['headers'] = {**(kwargs.get('headers') or {}), **entry.validators}
+        elif entry is not None:
+            RESPONSE_CACHE_LOOKUPS.inc((type(self).__name__, operation, 'hit'))
+
+        return entry
+
+    # pylint: disable=R0913
+    def _cache_response(self, operation, key, resource, entry, response):
+        if entry is not None and response.status_code == 304:
+            RESPONSE_CACHE_LOOKUPS.inc((type(self).__name__, operation, 'revalidated'))
+            self.cache.revalidated(entry, response.headers)
+            return entry.response
+
+        RESPONSE_CACHE_LOOKUPS.inc((type(self).__name__, operation, 'miss'))
+        self.cache.store(key, resource, response)
 
-        if (response.status_code < 200 or response.status_code >= 300):
-            message = f"Error - MiaPlatformClient GET {url}" \
-                f" respond with status code {response.status_code}"
-            self.logger.error(message)
-            raise Exception(message)
+        return response
 
-        self.logger.debug(f'End - MiaPlatformClient GET {url}')
+    def _record_coalescing(self, operation, shared):
+        COALESCED_READS.inc((type(self).__name__, operation, 'shared' if shared else 'sent'))
 
-        return response
+    def _invalidate(self, resource):
+        """
+        Drops the cached reads of a written resource, and detaches its in-flight reads
+        so that the reads issued after the write do not get the data from before it
+        """
 
-    def get_by_id(self, url, _id, **kwargs):
-        self.logger.debug(f'Start - MiaPlatformClient GET BY ID {url}/{_id}')
+        if self.cache is not None:
+            self.cache.invalidate(resource)
+        if self.single_flight is not None:
+            self.single_flight.forget(resource)
 
-        response = self.session.get(f'{url}/{_id}', **kwargs)
+    def _span(self, operation, method, url):
+        return tracer.span(
+            f'{type(self).__name__} {operation}',
+            **{'http.method': method, 'http.url': url}
+        )
 
-        if (response.status_code < 200 or response.status_code >= 300):
-            message = f"Error - MiaPlatformClient GET BY ID {url}/{_id}" \
+    def _log_start(self, operation, method, url):
+        self.logger.debug(
+            f'Start - {type(self).__name__} {operation} {url}',
+            extra={'method': method, 'url': url}
+        )
+
+    def _acquire_breaker(self, operation, method, url):
+        breaker = circuit_breakers.get(url)
+
+        if not breaker.allow_request():
+            message = f"Error - {type(self).__name__} {operation} {url}" \
+                " not sent, the circuit breaker is open"
+            self.logger.error(message, extra={'method': method, 'url': url})
+            UPSTREAM_REQUESTS.inc((type(self).__name__, operation, 'circuit_open'))
+            raise CircuitOpenError(message, url)
+
+        return breaker
+
+    # pylint: disable=R0913
+    def _transport_failure(self, error_class, operation, method, url, breaker, error):
+        breaker.record_failure()
+        UPSTREAM_REQUESTS.inc((type(self).__name__, operation, 'error'))
+
+        message = f"Error - {type(self).__name__} {operation} {url} failed: {error}"
+        self.logger.error(message, extra={'method': method, 'url': url})
+
+        return error_class(message, url)
+
+    # pylint: disable=R0913
+    def _response_failure(
+        self,
+        operation,
+        method,
+        url,
+        breaker,
+        response,
+        start_time,
+        revalidating=False
+    ):
+        """
+        Records the outcome of a response, returning the error to raise for a non-2xx one.
+        A 304 is expected when revalidating a cached response.
+        """
+
+        response.__class__ = self.response_class
+
+        name = type(self).__name__
+        fields = {
+            'method': method,
+            'url': url,
+            'status': response.status_code,
+            'duration': time.perf_counter() - start_time
+        }
+        UPSTREAM_REQUESTS.inc((name, operation, str(response.status_code)))
+        UPSTREAM_REQUEST_DURATION.observe((name, operation), fields['duration'])
+
+        if response.status_code >= 500:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+        not_modified = revalidating and response.status_code == 304
+        if (response.status_code < 200 or response.status_code >= 300) and not not_modified:
+            message = f"Error - {name} {operation} {url}" \
                 f" respond with status code {response.status_code}"
-            self.logger.error(message)
-            raise Exception(message)
+            self.logger.error(message, extra=fields)
+            return MiaPlatformHTTPError(message, url, response.status_code, response)
 
-        self.logger.debug(f'End - MiaPlatformClient GET BY ID {url}/{_id}')
+        self.logger.debug(f'End - {name} {operation} {url}', extra=fields)
 
-        return response
+        return None
 
-    def count(self, url, **kwargs):
-        self.logger.debug(f'Start - MiaPlatformClient COUNT {url}')
+    @staticmethod
+    def _can_retry(policy, method, attempt, error):
+        retryable = error.status_code is None or error.status_code in RETRYABLE_STATUS_CODES
+        return retryable and policy.can_retry(method, attempt)
 
-        response = self.session.get(f'{url}/count', **kwargs)
 
-        if (response.status_code < 200 or response.status_code >= 300):
-            message = f"Error - MiaPlatformClient COUNT {url}/count" \
-                f" respond with status code {response.status_code}"
-            self.logger.error(message)
-            raise Exception(message)
+class MiaPlatformClient(BaseMiaPlatformClient):
+    """
+    Provides a simple interface to make HTTP requests within a Mia Platform application cluster.
 
-        self.logger.debug(f'End - MiaPlatformClient GET BY ID {url}')
+    Every instance is a lightweight view over the process-wide session returned by
+    get_shared_session, the proxied headers are extracted on the first request.
 
-        return response
+    Args:
+        headers: A dictionary or an ASGI header list containing the headers to be used
+            for authentication.
+        logger: A logger object.
+        session (requests.Session): The session to send requests with, the shared one by default.
+        policy (ClientPolicy): Timeouts and retries of the requests, unless overridden
+            by the `policy` argument of a single call.
+        cache (ResponseCache): The cache of the `get`, `get_by_id` and `count` responses,
+            reads are not cached by default.
+        single_flight (SingleFlight): The group sharing one upstream call among the
+            identical concurrent reads of the threads, reads are not coalesced by default.
+    """
 
-    def post(self, url, data=None, **kwargs):
-        self.logger.debug(f'Start - MiaPlatformClient POST {url}')
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        headers,
+        logger,
+        session=None,
+        policy=None,
+        cache=None,
+        single_flight=None
+    ):
+        super().__init__(headers, logger, policy, cache, single_flight)
+        self.session = session or get_shared_session()
+
+    @cached_property
+    def auth(self):
+        return MiaPlatformAuth(self.headers, self.logger)
+
+    @cached_property
+    def offloaded(self):
+        """
+        The awaitable verbs of this client, run on the process-wide blocking pool
+        """
+
+        return OffloadedMiaPlatformClient(self, blocking_pool)
+
+    def _request(self, operation, method, url, **kwargs):
+        with self._span(operation, method, url) as span:
+            response = self._send(operation, method, url, **kwargs)
+            span.set('http.status_code', response.status_code)
+
+            return response
+
+    def _send(self, operation, method, url, policy=None, revalidating=False, **kwargs):
+        policy = policy or self.policy
+        kwargs.setdefault('timeout', (policy.connect_timeout, policy.read_timeout))
+        self._log_start(operation, method, url)
+
+        attempt = 0
+        while True:
+            breaker = self._acquire_breaker(operation, method, url)
+            start_time = time.perf_counter()
 
-        response = self.session.post(url, data, **kwargs)
+            try:
+                response = self.session.request(method, url, auth=self.auth, **kwargs)
+            except requests.Timeout as error:
+                failure = self._transport_failure(
+                    MiaPlatformTimeoutError, operation, method, url, breaker, error
+                )
+            except requests.ConnectionError as error:
+                failure = self._transport_failure(
+                    MiaPlatformConnectionError, operation, method, url, breaker, error
+                )
+            except Exception:
+                # Any other error, e.g. an undecodable or truncated body, is a failure
+                breaker.record_failure()
+                raise
+            except BaseException:
+                # Cancelled, the request has no outcome
+                breaker.record_abort()
+                raise
+            else:
+                failure = self._response_failure(
+                    operation, method, url, breaker, response, start_time, revalidating
+                )
+                if failure is None:
+                    return response
 
-        if (response.status_code < 200 or response.status_code >= 300):
-            message = f"Error - MiaPlatformClient POST {url}" \
-                f" respond with status code {response.status_code}"
-            self.logger.error(message)
-            raise Exception(message)
+            if not self._can_retry(policy, method, attempt, failure):
+                raise failure
+
+            time.sleep(policy.backoff(attempt))
+            attempt += 1
+
+    def _read(self, operation, url, resource, **kwargs):
+        key = self._read_key(url, kwargs, self.auth.headers_to_proxy)
+        if key is None:
+            return self._request(operation, 'GET', url, **kwargs)
 
-        self.logger.debug(f'End - MiaPlatformClient POST {url}')
+        entry = None
+        if self.cache is not None:
+            entry = self._cached_entry(operation, key, kwargs)
+            if entry is not None and entry.is_fresh():
+                return entry.response
+
+        if self.single_flight is None:
+            return self._fetch(operation, url, resource, key, entry, kwargs)
+
+        response, shared = self.single_flight.run(
+            key,
+            lambda: self._fetch(operation, url, resource, key, entry, kwargs),
+            resource
+        )
+        self._record_coalescing(operation, shared)
 
         return response
 
-    def put(self, url, data=None, **kwargs):
-        self.logger.debug(f'Start - MiaPlatformClient PUT {url}')
+    # pylint: disable=R0913
+    def _fetch(self, operation, url, resource, key, entry, kwargs):
+        response = self._request(
+            operation, 'GET', url, revalidating=entry is not None, **kwargs
+        )
 
-        response = self.session.put(url, data, **kwargs)
+        if self.cache is None:
+            return response
 
-        if (response.status_code < 200 or response.status_code >= 300):
-            message = f"Error - MiaPlatformClient PUT {url}" \
-                f" respond with status code {response.status_code}"
-            self.logger.error(message)
-            raise Exception(message)
+        return self._cache_response(operation, key, resource, entry, response)
 
-        self.logger.debug(f'End - MiaPlatformClient PUT {url}')
+    def _write(self, operation, method, url, resource, **kwargs):
+        try:
+            return self._request(operation, method, url, **kwargs)
+        finally:
+            self._invalidate(resource)
 
-        return response
+    def get(self, url, **kwargs):
+        return self._read('GET', url, url, **kwargs)
 
-    def patch(self, url, _id, data=None, **kwargs):
-        self.logger.debug(f'Start - MiaPlatformClient PATCH {url}/{_id}')
+    def get_by_id(self, url, _id, **kwargs):
+        return self._read('GET BY ID', f'{url}/{_id}', url, **kwargs)
 
-        response = self.session.patch(f'{url}/{_id}', data, **kwargs)
+    def count(self, url, **kwargs):
+        return self._read('COUNT', f'{url}/count', url, **kwargs)
 
-        if (response.status_code < 200 or response.status_code >= 300):
-            message = f"Error - MiaPlatformClient PATCH {url}/{_id}" \
-                f" respond with status code {response.status_code}"
-            self.logger.error(message)
-            raise Exception(message)
+    def post(self, url, data=None, **kwargs):
+        return self._write('POST', 'POST', url, url, data=data, **kwargs)
 
-        self.logger.debug(f'End - MiaPlatformClient PATCH {url}/{_id}')
+    def put(self, url, data=None, **kwargs):
+        return self._write('PUT', 'PUT', url, url, data=data, **kwargs)
 
-        return response
+    def patch(self, url, _id, data=None, **kwargs):
+        return self._write('PATCH', 'PATCH', f'{url}/{_id}', url, data=data, **kwargs)
 
     def delete(self, url, **kwargs):
-        self.logger.debug(f'Start - MiaPlatformClient DELETE {url}')
+        return self._write('DELETE', 'DELETE', url, url, **kwargs)
 
-        response = self.session.delete(url, **kwargs)
+    def delete_by_id(self, url, _id, **kwargs):
+        return self._write('DELETE BY ID', 'DELETE', f'{url}/{_id}', url, **kwargs)
+
+    def bulk_post(self, url, records, batch_size=None, concurrency=None, **kwargs):
+        """
+        Creates the records through the bulk endpoint of the collection, `batch_size`
+        records per request and at most `concurrency` requests at a time.
+        Returns a BulkResult per record, in the same order.
+        """
+
+        return self._bulk(
+            records,
+            lambda batch: self._write(
+                'BULK POST', 'POST', f'{url}/bulk', url, json=batch, **kwargs
+            ),
+            lambda record: self.post(url, json=record, **kwargs),
+            batch_size,
+            concurrency
+        )
+
+    def bulk_patch(self, url, updates, batch_size=None, concurrency=None, **kwargs):
+        """
+        Applies the (_id, update) pairs through the bulk endpoint of the collection,
+        `batch_size` updates per request and at most `concurrency` requests at a time.
+        Returns a BulkResult per pair, in the same order.
+        """
+
+        return self._bulk(
+            updates,
+            lambda batch: self._write(
+                'BULK PATCH', 'PATCH', f'{url}/bulk', url,
+                json=[{'filter': {'_id': _id}, 'update': update} for _id, update in batch],
+                **kwargs
+            ),
+            lambda pair: self.patch(url, pair[0], json=pair[1], **kwargs),
+            batch_size,
+            concurrency
+        )
+
+    def bulk_delete(self, url, ids, concurrency=None, **kwargs):
+        """
+        Deletes the records with the given ids, at most `concurrency` requests at a time.
+        Returns a BulkResult per id, in the same order.
+        """
+
+        return self._bulk(
+            ids,
+            None,
+            lambda _id: self.delete_by_id(url, _id, **kwargs),
+            concurrency=concurrency
+        )
+
+    # pylint: disable=R0913
+    def _bulk(self, items, send_batch, send_item, batch_size=None, concurrency=None):
+        """
+        Sends the items in batches through `send_batch`, in parallel threads. When the
+        first batch finds no bulk endpoint, or there is no `send_batch`, every item is
+        sent on its own through `send_item`. The threads send with the request context
+        of the caller.
+        """
+
+        item_batches = batches(items, batch_size)
+        concurrency = concurrency or get_settings().bulk_concurrency
+
+        if send_batch is not None and item_batches:
+            first = self._send_batch(send_batch, item_batches[0], probe=True)
+
+            if first is not None:
+                with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                    rest = executor.map(
+                        bind_request_context(partial(self._send_batch, send_batch)),
+                        item_batches[1:]
+                    )
+                    return first + [result for results in rest for result in results]
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            return list(executor.map(
+                bind_request_context(partial(self._send_item, send_item)),
+                [item for batch in item_batches for item in batch]
+            ))
+
+    @staticmethod
+    def _send_batch(send_batch, batch, probe=False):
+        try:
+            return batch_results(batch, response=send_batch(batch))
+        except MiaPlatformClientError as error:
+            if probe and is_bulk_unsupported(error):
+                return None
+            return batch_results(batch, error=error)
+
+    @staticmethod
+    def _send_item(send_item, item):
+        try:
+            return BulkResult(item, response=send_item(item))
+        except MiaPlatformClientError as error:
+            return BulkResult(item, error=error)
+
+
+class OffloadedMiaPlatformClient:
+    """
+    Awaitable wrappers of the verbs of a MiaPlatformClient, for the `async def`
+    handlers: every call runs on a thread of a BlockingPool instead of blocking
+    the event loop.
 
-        if (response.status_code < 200 or response.status_code >= 300):
-            message = f"Error - MiaPlatformClient DELETE {url}" \
-                f" respond with status code {response.status_code}"
-            self.logger.error(message)
-            raise Exception(message)
+    Args:
+        client (MiaPlatformClient): The client making the calls.
+        pool (BlockingPool): The threads running them.
+    """
 
-        self.logger.debug(f'End - MiaPlatformClient DELETE {url}')
+    def __init__(self, client, pool):
+        self.client = client
+        self.pool = pool
 
-        return response
+    async def get(self, url, **kwargs):
+        return await self.pool.run(self.client.get, url, **kwargs)
 
-    def delete_by_id(self, url, _id, **kwargs):
-        self.logger.debug(
-            f'Start - MiaPlatformClient DELETE BY ID {url}/{_id}')
+    async def get_by_id(self, url, _id, **kwargs):
+        return await self.pool.run(self.client.get_by_id, url, _id, **kwargs)
 
-        response = self.session.delete(f'{url}/{_id}', **kwargs)
+    async def count(self, url, **kwargs):
+        return await self.pool.run(self.client.count, url, **kwargs)
 
-        if (response.status_code < 200 or response.status_code >= 300):
-            message = f"Error - MiaPlatformClient DELETE BY ID {url}/{_id}" \
-                f" respond with status code {response.status_code}"
-            self.logger.error(message)
-            raise Exception(message)
+    async def post(self, url, data=None, **kwargs):
+        return await self.pool.run(self.client.post, url, data, **kwargs)
 
-        self.logger.debug(
-            f'End - MiaPlatformClient DELETE BY ID {url}/{_id}')
+    async def put(self, url, data=None, **kwargs):
+        return await self.pool.run(self.client.put, url, data, **kwargs)
 
-        return response
+    async def patch(self, url, _id, data=None, **kwargs):
+        return await self.pool.run(self.client.patch, url, _id, data, **kwargs)
+
+    async def delete(self, url, **kwargs):
+        return await self.pool.run(self.client.delete, url, **kwargs)
+
+    async def delete_by_id(self, url, _id, **kwargs):
+        return await self.pool.run(self.client.delete_by_id, url, _id, **kwargs)
+
+    async def bulk_post(self, url, records, batch_size=None, concurrency=None, **kwargs):
+        return await self.pool.run(
+            self.client.bulk_post, url, records, batch_size, concurrency, **kwargs
+        )
+
+    async def bulk_patch(self, url, updates, batch_size=None, concurrency=None, **kwargs):
+        return await self.pool.run(
+            self.client.bulk_patch, url, updates, batch_size, concurrency, **kwargs
+        )
+
+    async def bulk_delete(self, url, ids, concurrency=None, **kwargs):
+        return await self.pool.run(self.client.bulk_delete, url, ids, concurrency, **kwargs)
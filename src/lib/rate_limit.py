@@ -0,0 +1,274 @@
+import abc
+import math
+import time
+
+from src.utils.settings import get_settings
+
+
+PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+
+# Absorbs the rounding of the emission intervals summed in the arrival times
+TOLERANCE = 1e-9
+
+
+class Rate:
+    """
+    A rate of `limit` requests per `period` seconds, spent in bursts of at most
+    `burst` requests, `limit` by default
+    """
+
+    __slots__ = ('limit', 'period', 'burst', 'emission_interval', 'burst_window')
+
+    def __init__(self, limit, period, burst=None):
+        self.limit = limit
+        self.period = period
+        self.burst = burst or limit
+        # GCRA: one request is allowed every emission interval, `burst` at once
+        self.emission_interval = period / limit
+        self.burst_window = self.emission_interval * self.burst
+
+    def __repr__(self):
+        return f'Rate({self.limit}/{self.period}s, burst={self.burst})'
+
+
+def parse_rate(value):
+    """
+    Parses a rate like "100/second", "20/minute", "1000/hour" or "10000/day"
+    """
+
+    limit, _, period = value.strip().partition('/')
+
+    try:
+        return Rate(int(limit), PERIODS[period.strip()])
+    except (KeyError, ValueError) as error:
+        raise ValueError(f'Invalid rate "{value}"') from error
+
+
+def parse_rate_limits(value):
+    """
+    Parses RATE_LIMITS, e.g. "miauserid=100/second,miaclienttype=1000/second", into
+    a dict of lower-cased header names and rates
+    """
+
+    limits = {}
+
+    for entry in (value or '').split(','):
+        header, _, rate = entry.strip().partition('=')
+        if header:
+            limits[header.strip().lower()] = parse_rate(rate)
+
+    return limits
+
+
+class RateLimitDecision:
+    """
+    The outcome of a rate-limited request.
+
+    Args:
+        allowed (bool): Whether the request is within the rate.
+        remaining (int): How many more requests are allowed right now.
+        retry_after (float): The seconds until the next request is allowed, 0 when allowed.
+    """
+
+    __slots__ = ('allowed', 'remaining', 'retry_after')
+
+    def __init__(self, allowed, remaining, retry_after):
+        self.allowed = allowed
+        self.remaining = remaining
+        self.retry_after = retry_after
+
+    def __repr__(self):
+        return f'RateLimitDecision(allowed={self.allowed}, remaining={self.remaining},' \
+            f' retry_after={self.retry_after:.3f})'
+
+
+class RateLimitStore(abc.ABC):
+    """
+    Keeps the state of the rate-limited keys and decides whether a request is
+    within its rates. A store shared by the workers, e.g. backed by Redis, takes
+    the decision atomically on the shared state.
+    """
+
+    @abc.abstractmethod
+    async def allow(self, limits):
+        """
+        Decides on the `(key, rate)` pairs of a request at once: returns the index and
+        the decision of the first rate it exceeds without charging any bucket, None
+        after charging all of them
+        """
+
+
+class MemoryRateLimitStore(RateLimitStore):
+    """
+    An in-process GCRA store. The whole state of a key is a single float in a dict,
+    its theoretical arrival time: the time at which its bucket is full again.
+
+    A key idle for longer than the burst window of its rate is indistinguishable
+    from a new one, so the keys live in two generations of at least the longest
+    burst window each: a key used again is moved to the current generation, and
+    the previous generation, holding only idle keys, is dropped as a whole.
+    A generation also rotates once it holds half of `max_keys` keys, so the store
+    keeps at most `max_keys` keys and only forgets, before they are idle, the keys
+    not used during the last `max_keys / 2` new keys.
+
+    The store is not thread-safe, it is used by the event loop of its worker.
+
+    Args:
+        max_keys (int): The maximum number of keys kept.
+        clock: The monotonic clock, in seconds.
+    """
+
+    def __init__(self, max_keys=1_000_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.timer = clock
+        self.arrivals = {}
+        self.previous = {}
+        # The span of a generation, the longest burst window seen
+        self.window = 0.0
+        self.rotated_at = self.timer()
+
+    def __len__(self):
+        return len(self.arrivals) + len(self.previous)
+
+    def decide(self, key, rate):
+        """
+        The decision on a single key, charging its bucket when the request is allowed
+        """
+
+        now = self.timer()
+        self._advance(now, rate)
+
+        next_arrival, wait = self._next_arrival(key, rate, now)
+        if wait > TOLERANCE:
+            return RateLimitDecision(False, 0, wait)
+
+        self.arrivals[key] = next_arrival
+
+        return RateLimitDecision(
+            True,
+            int((rate.burst_window - (next_arrival - now)) / rate.emission_interval + TOLERANCE),
+            0.0
+        )
+
+    def decide_all(self, limits):
+        """
+        The decision on several keys, see `RateLimitStore.allow`
+        """
+
+        now = self.timer()
+        for _, rate in limits:
+            self._advance(now, rate)
+
+        charges = []
+        for index, (key, rate) in enumerate(limits):
+            next_arrival, wait = self._next_arrival(key, rate, now)
+            if wait > TOLERANCE:
+                return index, RateLimitDecision(False, 0, wait)
+            charges.append((key, next_arrival))
+
+        for key, next_arrival in charges:
+            self.arrivals[key] = next_arrival
+
+        return None
+
+    async def allow(self, limits):
+        return self.decide_all(limits)
+
+    def _advance(self, now, rate):
+        if rate.burst_window > self.window:
+            self.window = rate.burst_window
+        if now - self.rotated_at >= self.window or len(self.arrivals) >= self.max_keys // 2:
+            self._rotate(now)
+
+    def _next_arrival(self, key, rate, now):
+        """
+        The arrival time of the key once charged and how long the request must wait
+        for it, moving the key to the current generation
+        """
+
+        arrival = self.arrivals.get(key)
+        if arrival is None:
+            arrival = self.previous.pop(key, now)
+            self.arrivals[key] = arrival
+
+        next_arrival = max(arrival, now) + rate.emission_interval
+
+        return next_arrival, next_arrival - now - rate.burst_window
+
+    def _rotate(self, now):
+        self.previous = self.arrivals
+        self.arrivals = {}
+        self.rotated_at = now
+
+
+class RateLimiter:
+    """
+    Rate-limits the requests by the value of some of their headers, e.g. per user on
+    miauserid and per client type on miaclienttype: every header has its own rate,
+    and every header value its own bucket. Requests without the header are not limited.
+
+    Args:
+        store (RateLimitStore): Where the state of the buckets is kept.
+        rates (dict): The rates by lower-cased header name.
+    """
+
+    def __init__(self, store, rates):
+        self.store = store
+        self.rates = rates
+        self.raw_headers = {header.encode('latin-1'): header for header in rates}
+
+    def keys(self, headers):
+        """
+        The header names and values of an ASGI header list subject to a rate
+        """
+
+        keys = {}
+
+        for raw_key, raw_value in headers:
+            header = self.raw_headers.get(raw_key)
+            if header is not None and header not in keys:
+                keys[header] = raw_value.decode('latin-1')
+
+        return keys
+
+    async def check(self, headers):
+        """
+        Returns the header and the decision of the first rate the request exceeds,
+        None when it is within all of them. The buckets are only charged when the
+        request is within all of its rates.
+        """
+
+        keys = self.keys(headers)
+        if not keys:
+            return None
+
+        exceeded = await self.store.allow([
+            (f'{header}:{value}', self.rates[header]) for header, value in keys.items()
+        ])
+        if exceeded is None:
+            return None
+
+        index, decision = exceeded
+
+        return list(keys)[index], decision
+
+
+def retry_after_header(decision):
+    return str(max(1, math.ceil(decision.retry_after)))
+
+
+def create_rate_limiter():
+    """
+    Returns the process-wide rate limiter, or None when RATE_LIMIT_ENABLED is off
+    """
+
+    settings = get_settings()
+    rates = parse_rate_limits(settings.rate_limits)
+
+    if not settings.rate_limit_enabled or not rates:
+        return None
+
+    return RateLimiter(MemoryRateLimitStore(settings.rate_limit_max_keys), rates)
+
+
+rate_limiter = create_rate_limiter()
@@ -0,0 +1,145 @@
+import time
+import random
+import threading
+from urllib.parse import urlsplit
+
+from src.utils.settings import get_settings
+
+
+IDEMPOTENT_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'))
+RETRYABLE_STATUS_CODES = frozenset((429, 502, 503, 504))
+
+
+class ClientPolicy:
+    """
+    Timeouts and retries applied to the upstream requests of a Mia Platform client.
+
+    Only idempotent verbs are retried, on connection errors, timeouts and on the
+    retryable status codes, waiting a jittered exponential backoff between attempts.
+
+    Args:
+        connect_timeout (float): Seconds allowed to establish a connection.
+        read_timeout (float): Seconds allowed between two bytes of the response.
+        retries (int): How many times a failed idempotent request is retried.
+        backoff_factor (float): Base of the exponential backoff, in seconds.
+        max_backoff (float): Upper bound of a single backoff, in seconds.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        connect_timeout=None,
+        read_timeout=None,
+        retries=None,
+        backoff_factor=None,
+        max_backoff=None
+    ):
+        settings = get_settings()
+
+        self.connect_timeout = settings.upstream_connect_timeout \
+            if connect_timeout is None else connect_timeout
+        self.read_timeout = settings.upstream_read_timeout \
+            if read_timeout is None else read_timeout
+        self.retries = settings.upstream_retries if retries is None else retries
+        self.backoff_factor = settings.upstream_backoff_factor \
+            if backoff_factor is None else backoff_factor
+        self.max_backoff = settings.upstream_max_backoff if max_backoff is None else max_backoff
+
+    def can_retry(self, method, attempt):
+        return method in IDEMPOTENT_METHODS and attempt < self.retries
+
+    def backoff(self, attempt):
+        """
+        Full-jitter backoff before the retry following the given attempt
+        """
+
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * 2 ** attempt))
+
+
+class CircuitBreaker:
+    """
+    Fails fast while an upstream host is unhealthy.
+
+    The circuit opens after `failure_threshold` consecutive failures; once
+    `recovery_timeout` seconds have passed a single trial request is let through
+    (half-open), and its outcome closes or opens the circuit again. A trial ending
+    without an outcome, e.g. cancelled, lets the next request try again.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold, recovery_timeout):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            if self.state == self.OPEN \
+                    and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                return True
+
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_abort(self):
+        """
+        Ends a request interrupted before its outcome was known
+        """
+
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                # Still past the recovery timeout, the next request is the new trial
+                self.state = self.OPEN
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+
+class CircuitBreakerRegistry:
+    """
+    Holds one circuit breaker per upstream host, shared by every client of the process
+    """
+
+    def __init__(self):
+        self.breakers = {}
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        host = urlsplit(url).netloc
+        breaker = self.breakers.get(host)
+
+        if breaker is None:
+            settings = get_settings()
+            with self._lock:
+                breaker = self.breakers.setdefault(host, CircuitBreaker(
+                    settings.circuit_breaker_failure_threshold,
+                    settings.circuit_breaker_recovery_timeout
+                ))
+
+        return breaker
+
+    def reset(self):
+        with self._lock:
+            self.breakers.clear()
+
+
+circuit_breakers = CircuitBreakerRegistry()
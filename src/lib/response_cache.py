@@ -0,0 +1,172 @@
+import time
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+from src.utils.settings import get_settings
+
+
+def parse_cache_control(value):
+    """
+    Parses a Cache-Control header into a dict of lower-cased directives,
+    directives without a value map to True
+    """
+
+    directives = {}
+
+    for directive in (value or '').split(','):
+        name, _, argument = directive.strip().partition('=')
+        if name:
+            directives[name.lower()] = argument.strip('"') or True
+
+    return directives
+
+
+def freeze(value):
+    """
+    Turns request params or headers into a hashable, order-independent cache key part
+    """
+
+    if value is None:
+        return ()
+    if isinstance(value, Mapping):
+        return tuple(sorted((str(key).lower(), str(item)) for key, item in value.items()))
+    if isinstance(value, (str, bytes)):
+        return value
+
+    return tuple(sorted((str(key), str(item)) for key, item in value))
+
+
+class CacheEntry:
+    """
+    A cached upstream response, with the validators used to revalidate it once stale
+    """
+
+    __slots__ = ('response', 'resource', 'expires_at', 'etag', 'last_modified')
+
+    def __init__(self, response, resource, expires_at):
+        self.response = response
+        self.resource = resource
+        self.expires_at = expires_at
+        self.etag = response.headers.get('etag')
+        self.last_modified = response.headers.get('last-modified')
+
+    def is_fresh(self):
+        return time.monotonic() < self.expires_at
+
+    @property
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers['if-none-match'] = self.etag
+        if self.last_modified:
+            headers['if-modified-since'] = self.last_modified
+
+        return headers
+
+
+class ResponseCache:
+    """
+    An in-process, size-bounded LRU cache of the upstream read responses.
+
+    Entries live `ttl` seconds unless the upstream Cache-Control header says
+    otherwise: `no-store` responses are never cached, `no-cache` ones are always
+    revalidated and `max-age` sets the lifetime of the entry. Stale entries with
+    an ETag or a Last-Modified header are revalidated with a conditional request.
+
+    Entries are indexed by resource path, the collection URL, so that a write
+    drops every cached read of that collection.
+
+    Args:
+        max_entries (int): How many responses are kept before evicting the least recently used.
+        ttl (float): The default lifetime of an entry, in seconds.
+    """
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.resources = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+
+            return entry
+
+    def store(self, key, resource, response):
+        directives = parse_cache_control(response.headers.get('cache-control'))
+        if 'no-store' in directives:
+            return
+
+        entry = CacheEntry(response, resource, time.monotonic() + self._lifetime(directives))
+        if not entry.is_fresh() and not entry.validators:
+            return
+
+        with self._lock:
+            self._discard(key)
+            self.entries[key] = entry
+            self.resources.setdefault(resource, set()).add(key)
+
+            while len(self.entries) > self.max_entries:
+                self._discard(next(iter(self.entries)))
+
+    def revalidated(self, entry, headers):
+        """
+        Extends the lifetime of an entry the upstream service answered 304 for
+        """
+
+        directives = parse_cache_control(headers.get('cache-control'))
+        entry.expires_at = time.monotonic() + self._lifetime(directives)
+
+    def invalidate(self, resource):
+        with self._lock:
+            for key in self.resources.pop(resource, ()):
+                self.entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.resources.clear()
+
+    def _lifetime(self, directives):
+        if 'no-cache' in directives:
+            return 0
+
+        try:
+            return float(directives['max-age'])
+        except (KeyError, ValueError):
+            return self.ttl
+
+    def _discard(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+
+        keys = self.resources.get(entry.resource)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.resources[entry.resource]
+
+
+def create_response_cache():
+    """
+    Returns the process-wide response cache, or None when RESPONSE_CACHE_ENABLED is off
+    """
+
+    settings = get_settings()
+
+    if not settings.response_cache_enabled:
+        return None
+
+    return ResponseCache(settings.response_cache_max_entries, settings.response_cache_ttl)
+
+
+response_cache = create_response_cache()
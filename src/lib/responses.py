@@ -0,0 +1,51 @@
+from fastapi.responses import Response
+
+from src.lib.compression import compressor
+
+
+class EncodedJSONResponse(Response):
+    """
+    A JSON response whose body is already encoded.
+
+    FastAPI returns a Response as it is, so a handler returning one skips the
+    validation against its `response_model` and the serialization it would run
+    on a returned dict, while the `response_model` still documents the route in
+    the OpenAPI specification. Only return bodies already validated, e.g. with
+    encode_model or encode_constant.
+    """
+
+    media_type = 'application/json'
+
+    def render(self, content):
+        return content
+
+
+def encode_model(instance):
+    """
+    Encodes an already validated model instance, using the field aliases
+    """
+
+    return instance.model_dump_json(by_alias=True).encode()
+
+
+def encode_constant(model, content):
+    """
+    Validates a constant body against its response model, returning it encoded.
+    Meant to be called once, at import time: the body is also compressed once, so the
+    CompressionMiddleware serves it without compressing it per request.
+    """
+
+    body = encode_model(model.model_validate(content))
+
+    if compressor is not None:
+        compressor.precompress(body)
+
+    return body
+
+
+def model_response(instance, status_code=200, headers=None):
+    """
+    Returns a validated model instance without validating and copying it again
+    """
+
+    return EncodedJSONResponse(encode_model(instance), status_code=status_code, headers=headers)
@@ -0,0 +1,151 @@
+import asyncio
+import threading
+
+from src.utils.settings import get_settings
+
+
+class _Call:
+    """
+    An in-flight call of a SingleFlight group, awaited by the threads sharing it
+    """
+
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Calls:
+    """
+    The in-flight calls of a single-flight group by key, indexed by resource so that
+    a write detaches the calls reading the resource it changed
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.resources = {}
+
+    def __len__(self):
+        return len(self.calls)
+
+    def _add(self, key, call, resource):
+        self.calls[key] = call
+        if resource is not None:
+            self.resources.setdefault(resource, set()).add(key)
+
+    def _discard(self, key, call, resource):
+        # A detached call was already replaced or removed
+        if self.calls.get(key) is not call:
+            return
+
+        del self.calls[key]
+        keys = self.resources.get(resource)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.resources[resource]
+
+    def _forget(self, resource):
+        for key in self.resources.pop(resource, ()):
+            self.calls.pop(key, None)
+
+
+class SingleFlight(_Calls):
+    """
+    Shares one execution of a function among the threads calling it concurrently
+    with the same key: the first caller runs it, the others wait for its outcome.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._lock = threading.Lock()
+
+    def run(self, key, function, resource=None):
+        """
+        Returns the result of `function` and whether it was shared with another caller
+        """
+
+        with self._lock:
+            call = self.calls.get(key)
+            shared = call is not None
+            if not shared:
+                call = _Call()
+                self._add(key, call, resource)
+
+        if shared:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            # Even an interruption of the caller, the waiters have no result
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                self._discard(key, call, resource)
+            call.done.set()
+
+        return call.result, False
+
+    def forget(self, resource):
+        """
+        Detaches the in-flight calls of a resource: their callers still share them,
+        the calls started afterwards do not
+        """
+
+        with self._lock:
+            self._forget(resource)
+
+
+class AsyncSingleFlight(_Calls):
+    """
+    Shares one execution of a coroutine among the tasks awaiting it concurrently
+    with the same key.
+
+    The coroutine runs in its own task, so a caller being cancelled, e.g. because
+    its client disconnected, does not cancel the call shared with the others.
+    """
+
+    async def run(self, key, coroutine_function, resource=None):
+        """
+        Returns the result of the coroutine and whether it was shared with another caller
+        """
+
+        task = self.calls.get(key)
+        shared = task is not None
+
+        if not shared:
+            task = asyncio.ensure_future(coroutine_function())
+            self._add(key, task, resource)
+            task.add_done_callback(lambda _: self._discard(key, task, resource))
+
+        return await asyncio.shield(task), shared
+
+    def forget(self, resource):
+        """
+        Detaches the in-flight calls of a resource: their callers still share them,
+        the calls started afterwards do not
+        """
+
+        self._forget(resource)
+
+
+def create_single_flights():
+    """
+    Returns the process-wide single-flight groups of the sync and async clients,
+    or None when REQUEST_COALESCING_ENABLED is off
+    """
+
+    if not get_settings().request_coalescing_enabled:
+        return None, None
+
+    return SingleFlight(), AsyncSingleFlight()
+
+
+single_flight, async_single_flight = create_single_flights()
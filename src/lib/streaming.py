@@ -0,0 +1,83 @@
+import orjson
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+
+NDJSON_MEDIA_TYPE = 'application/x-ndjson'
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+
+def _transform_lines(lines, transform):
+    """
+    Transforms NDJSON lines into a single chunk, the records mapped to None are dropped
+    """
+
+    records = (transform(orjson.loads(line)) for line in lines if line.strip())
+
+    return b''.join(orjson.dumps(record) + b'\n' for record in records if record is not None)
+
+
+async def transform_ndjson(chunks, transform):
+    """
+    Applies `transform` to every record of an NDJSON byte stream, emitting one
+    chunk per input chunk, so that only a chunk of records is held in memory
+    """
+
+    remainder = b''
+
+    async for chunk in chunks:
+        lines = (remainder + chunk).split(b'\n')
+        remainder = lines.pop()
+
+        output = _transform_lines(lines, transform)
+        if output:
+            yield output
+
+    output = _transform_lines([remainder], transform)
+    if output:
+        yield output
+
+
+async def _close_after(chunks, response):
+    try:
+        async for chunk in chunks:
+            yield chunk
+    finally:
+        await response.aclose()
+
+
+# pylint: disable=R0913
+async def stream_proxy(
+    client,
+    url,
+    method='GET',
+    transform=None,
+    chunk_size=DEFAULT_CHUNK_SIZE,
+    media_type=None,
+    **kwargs
+):
+    """
+    Proxies an upstream response as a StreamingResponse, read in chunks of
+    `chunk_size` bytes through the given AsyncMiaPlatformClient, so the memory use
+    does not depend on the size of the payload.
+
+    With `transform` the upstream body is read as NDJSON and every record is
+    replaced by `transform(record)`, or dropped when it returns None.
+
+    Upstream errors are raised before the response starts, as MiaPlatformClientError.
+    """
+
+    response = await client.stream(url, method=method, **kwargs)
+    chunks = response.aiter_bytes(chunk_size)
+
+    if transform is not None:
+        chunks = transform_ndjson(chunks, transform)
+        media_type = media_type or NDJSON_MEDIA_TYPE
+
+    return StreamingResponse(
+        _close_after(chunks, response),
+        status_code=response.status_code,
+        media_type=media_type or response.headers.get('content-type'),
+        # Closes the upstream response also when the client disconnects before the body
+        background=BackgroundTask(response.aclose)
+    )
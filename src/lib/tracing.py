@@ -0,0 +1,372 @@
+import abc
+import time
+import queue
+import random
+import threading
+from collections import deque
+from contextvars import ContextVar
+import orjson
+
+from src.utils.settings import get_settings
+
+
+TRACEPARENT_HEADER = 'traceparent'
+RAW_TRACEPARENT_HEADER = TRACEPARENT_HEADER.encode('latin-1')
+
+_HEX_DIGITS = frozenset('0123456789abcdef')
+_INVALID_TRACE_ID = '0' * 32
+_INVALID_SPAN_ID = '0' * 16
+
+_current_span = ContextVar('current_span', default=None)
+
+
+def _is_hex(value, length):
+    return len(value) == length and _HEX_DIGITS.issuperset(value)
+
+
+def parse_traceparent(value):
+    """
+    Returns the trace id, the parent span id and the sampled flag of a W3C
+    traceparent header, None when it is missing or invalid
+    """
+
+    parts = (value or '').strip().split('-')
+    if len(parts) < 4:
+        return None
+
+    version, trace_id, span_id, flags = parts[:4]
+    if not _is_hex(version, 2) or version == 'ff' or (version == '00' and len(parts) != 4):
+        return None
+    if not _is_hex(trace_id, 32) or trace_id == _INVALID_TRACE_ID:
+        return None
+    if not _is_hex(span_id, 16) or span_id == _INVALID_SPAN_ID or not _is_hex(flags, 2):
+        return None
+
+    return trace_id, span_id, bool(int(flags, 16) & 1)
+
+
+def format_traceparent(trace_id, span_id, sampled):
+    return f'00-{trace_id}-{span_id}-{"01" if sampled else "00"}'
+
+
+def new_trace_id():
+    return f'{random.getrandbits(128) or 1:032x}'
+
+
+def new_span_id():
+    return f'{random.getrandbits(64) or 1:016x}'
+
+
+class Span:  # pylint: disable=R0902
+    """
+    A timed operation of a trace, used as a context manager: while it is open it is
+    the current span of the task or thread, the parent of the spans opened inside it.
+
+    Only sampled spans are recorded, the others just carry the trace context to the
+    upstream calls.
+    """
+
+    __slots__ = (
+        'tracer', 'name', 'trace_id', 'span_id', 'parent_id', 'sampled', 'attributes',
+        'start_time', 'end_time', 'error', 'is_root', 'spans', '_start_counter', '_token'
+    )
+
+    # pylint: disable=R0913,W0621
+    def __init__(self, tracer, name, trace_id, parent_id, sampled, spans, attributes, is_root):
+        self.tracer = tracer
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = new_span_id()
+        self.parent_id = parent_id
+        self.sampled = sampled
+        self.attributes = attributes
+        self.start_time = None
+        self.end_time = None
+        self.error = None
+        self.is_root = is_root
+        # The finished spans of the trace, shared with the root span
+        self.spans = spans
+        self._start_counter = None
+        self._token = None
+
+    @property
+    def duration(self):
+        return (self.end_time - self.start_time) / 1e9
+
+    @property
+    def traceparent(self):
+        return format_traceparent(self.trace_id, self.span_id, self.sampled)
+
+    def set(self, key, value):
+        if self.sampled:
+            self.attributes[key] = value
+
+    def __enter__(self):
+        self.start_time = time.time_ns()
+        self._start_counter = time.perf_counter_ns()
+        self._token = _current_span.set(self)
+        return self
+
+    def __exit__(self, error_type, error, _traceback):
+        self.end_time = self.start_time + time.perf_counter_ns() - self._start_counter
+        _current_span.reset(self._token)
+
+        if error is not None:
+            self.error = f'{error_type.__name__}: {error}'
+
+        if self.sampled:
+            self.tracer.end(self)
+
+    def to_dict(self):
+        return {
+            'traceId': self.trace_id,
+            'spanId': self.span_id,
+            'parentSpanId': self.parent_id,
+            'name': self.name,
+            'startTimeUnixNano': self.start_time,
+            'endTimeUnixNano': self.end_time,
+            'duration': self.duration,
+            'status': 'error' if self.error else 'ok',
+            'error': self.error,
+            'attributes': self.attributes,
+        }
+
+
+class _NoopSpan:
+    """
+    The span returned by a disabled tracer
+    """
+
+    trace_id = span_id = traceparent = None
+    sampled = False
+
+    def set(self, key, value):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, _traceback):
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class SpanExporter(abc.ABC):
+    """
+    Receives the spans of every sampled trace once its root span ends
+    """
+
+    @abc.abstractmethod
+    def export(self, spans):
+        """
+        Exports the spans of a trace, called by the task or thread ending the root
+        span: the slow work belongs on a thread of the exporter
+        """
+
+    def shutdown(self):
+        pass
+
+
+class FileSpanExporter(SpanExporter):
+    """
+    Appends the spans to a file, one JSON object per line.
+
+    The traces are queued for a background thread serializing and writing them, so
+    no file I/O runs on the event loop, and are dropped while `queue_size` of them
+    are waiting. The thread opens the file on the first export after a shutdown.
+    """
+
+    def __init__(self, path, queue_size=1000):
+        self.path = path
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.dropped = 0
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def export(self, spans):
+        if self._thread is None:
+            self._start()
+
+        try:
+            self.queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._write,
+                    name='span-exporter',
+                    daemon=True
+                )
+                self._thread.start()
+
+    def _write(self):
+        with open(self.path, 'ab') as file:
+            while True:
+                traces = [self.queue.get()]
+                # One write for all the traces queued meanwhile
+                while traces[-1] is not None and not self.queue.empty():
+                    traces.append(self.queue.get_nowait())
+
+                file.write(b''.join(
+                    orjson.dumps(span.to_dict()) + b'\n'
+                    for spans in traces if spans is not None
+                    for span in spans
+                ))
+                file.flush()
+
+                if traces[-1] is None:
+                    return
+
+    def shutdown(self):
+        """
+        Writes the queued traces, then stops the thread and closes the file
+        """
+
+        with self._lock:
+            thread, self._thread = self._thread, None
+
+        if thread is not None:
+            self.queue.put(None)
+            thread.join()
+
+
+class Tracer:
+    """
+    Creates the spans of the traces, deciding whether a trace is sampled when its
+    root span starts: the traces continuing an incoming traceparent follow its
+    sampled flag, the new ones are sampled with probability `sample_rate`.
+
+    The sampled traces are sent to the exporter, and the ones whose root span took
+    at least `slow_threshold` seconds are kept in a ring buffer of `slow_traces`
+    traces.
+
+    Args:
+        enabled (bool): When off, spans are no-ops and no trace context is propagated.
+        sample_rate (float): The fraction of the new traces that are recorded.
+        slow_threshold (float): The duration, in seconds, of the slow traces.
+        slow_traces (int): How many recent slow traces are kept.
+        exporter (SpanExporter): Where the sampled traces are sent, none by default.
+    """
+
+    # pylint: disable=R0913
+    def __init__(
+        self,
+        enabled=True,
+        sample_rate=0.0,
+        slow_threshold=1.0,
+        slow_traces=50,
+        exporter=None
+    ):
+        self.enabled = enabled
+        self.sample_rate = sample_rate
+        self.slow_threshold = slow_threshold
+        self.slow_traces = deque(maxlen=slow_traces)
+        self.exporter = exporter
+
+    def start_trace(self, name, traceparent=None, **attributes):
+        """
+        Returns the root span of the request, continuing the trace of the incoming
+        traceparent header when it is valid
+        """
+
+        if not self.enabled:
+            return NOOP_SPAN
+
+        parent = parse_traceparent(traceparent)
+        if parent is None:
+            trace_id, parent_id = new_trace_id(), None
+            sampled = random.random() < self.sample_rate
+        else:
+            trace_id, parent_id, sampled = parent
+
+        spans = [] if sampled else None
+
+        return Span(self, name, trace_id, parent_id, sampled, spans, attributes, is_root=True)
+
+    def span(self, name, **attributes):
+        """
+        Returns a span child of the current one, or the root span of a new trace
+        outside of a trace:
+
+            with tracer.span('pricing', items=len(items)):
+                ...
+        """
+
+        parent = _current_span.get()
+        if parent is None:
+            return self.start_trace(name, **attributes)
+
+        return Span(
+            self,
+            name,
+            parent.trace_id,
+            parent.span_id,
+            parent.sampled,
+            parent.spans,
+            attributes,
+            is_root=False
+        )
+
+    def end(self, span):
+        span.spans.append(span)
+        if not span.is_root:
+            return
+
+        trace = span.spans
+        if span.duration >= self.slow_threshold:
+            self.slow_traces.append(trace)
+        if self.exporter is not None:
+            self.exporter.export(trace)
+
+    def recent_slow_traces(self):
+        """
+        The slow traces, the most recent first, each as a list of spans sorted by start time
+        """
+
+        return [
+            [item.to_dict() for item in sorted(trace, key=lambda item: item.start_time)]
+            for trace in reversed(self.slow_traces)
+        ]
+
+    def shutdown(self):
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def get_current_span():
+    return _current_span.get()
+
+
+def current_traceparent():
+    """
+    The traceparent header value of the current span, None outside of a trace
+    """
+
+    span = _current_span.get()
+
+    return None if span is None else span.traceparent
+
+
+def create_tracer():
+    """
+    Returns the process-wide tracer configured by the TRACING_* settings
+    """
+
+    settings = get_settings()
+
+    return Tracer(
+        enabled=settings.tracing_enabled,
+        sample_rate=settings.tracing_sample_rate,
+        slow_threshold=settings.tracing_slow_threshold,
+        slow_traces=settings.tracing_slow_traces,
+        exporter=FileSpanExporter(settings.tracing_export_file)
+        if settings.tracing_export_file else None
+    )
+
+
+tracer = create_tracer()
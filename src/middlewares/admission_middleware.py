@@ -0,0 +1,62 @@
+import time
+import orjson
+
+from src.lib.admission import AdmissionRejected, admission_controller as default_controller
+
+
+# The probe and operational routes are never shed
+EXEMPT_PATH_PREFIX = '/-/'
+
+REJECTED_BODY = orjson.dumps({'message': 'The service is overloaded, retry later'})
+
+
+class AdmissionMiddleware:
+    """
+    Middleware shedding the requests exceeding the concurrency limits: they wait
+    in a bounded queue for a slot, and are answered with a 503 and a Retry-After
+    header once the queue is full or their wait reaches the deadline. The latency
+    of the admitted requests adapts the limits, when adaptive.
+    """
+
+    def __init__(self, app, controller=default_controller):
+        self.app = app
+        self.controller = controller
+
+        if controller is not None:
+            self.rejected_headers = (
+                (b'content-length', str(len(REJECTED_BODY)).encode()),
+                (b'content-type', b'application/json'),
+                (b'retry-after', str(controller.retry_after).encode()),
+            )
+
+    async def __call__(self, scope, receive, send):
+        if (
+            self.controller is None
+            or scope['type'] != 'http'
+            or scope['path'].startswith(EXEMPT_PATH_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        limiters = self.controller.limiters(scope['path'])
+
+        try:
+            await self.controller.admit(limiters)
+        except AdmissionRejected:
+            # A new message per rejection, the outer middlewares may change it
+            await send({
+                'type': 'http.response.start',
+                'status': 503,
+                'headers': list(self.rejected_headers),
+            })
+            await send({'type': 'http.response.body', 'body': REJECTED_BODY})
+            return
+
+        # The service time, without the wait in the queue, adapts the limits
+        started_at = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            latency = time.monotonic() - started_at
+            for limiter in limiters:
+                limiter.release(latency, started_at)
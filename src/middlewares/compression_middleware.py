@@ -0,0 +1,211 @@
+from src.lib.compression import compressor as default_compressor, is_compressible
+
+
+# Not compressed: no body, or a body the client asked for a part of
+UNCOMPRESSED_STATUS_CODES = frozenset((204, 206, 304))
+
+
+def encoded_etag(etag, encoding):
+    """
+    The strong ETag of a body compressed with `encoding`, e.g. "abc-gzip" for "abc",
+    since the compressed bytes differ from the ones the ETag names. Weak ETags
+    are kept as they are.
+    """
+
+    if etag.startswith(b'W/') or not etag.endswith(b'"'):
+        return etag
+
+    return etag[:-1] + b'-' + encoding.encode('latin-1') + b'"'
+
+
+def decoded_if_none_match(value, encoding):
+    """
+    Returns an If-None-Match header value with the ETags of the bodies compressed
+    with `encoding` turned back into the ETags the application knows, and whether
+    there was any
+    """
+
+    suffix = b'-' + encoding.encode('latin-1') + b'"'
+    decoded = False
+    candidates = []
+
+    for candidate in value.split(b','):
+        candidate = candidate.strip()
+        if candidate.endswith(suffix) and not candidate.startswith(b'W/'):
+            candidate = candidate[:-len(suffix)] + b'"'
+            decoded = True
+        candidates.append(candidate)
+
+    return b', '.join(candidates), decoded
+
+
+def compressed_headers(headers, encoding, content_length=None):
+    """
+    The headers of a response compressed with `encoding`, with the Content-Length of
+    the compressed body when it is sent at once, Accept-Encoding in its Vary and the
+    strong ETag of the compressed body
+    """
+
+    compressed = [(b'content-encoding', encoding.encode('latin-1'))]
+    vary = None
+
+    for key, value in headers:
+        if key == b'content-length':
+            continue
+        if key == b'vary':
+            vary = value
+            continue
+        if key == b'etag':
+            value = encoded_etag(value, encoding)
+        compressed.append((key, value))
+
+    if vary is None:
+        vary = b'Accept-Encoding'
+    elif b'accept-encoding' not in vary.lower():
+        vary = vary + b', Accept-Encoding'
+    compressed.append((b'vary', vary))
+
+    if content_length is not None:
+        compressed.append((b'content-length', str(content_length).encode()))
+
+    return compressed
+
+
+def can_compress(message):
+    """
+    Whether the response started by an http.response.start message can be compressed
+    """
+
+    if message['status'] in UNCOMPRESSED_STATUS_CODES:
+        return False
+
+    compressible = False
+    for key, value in message.get('headers', ()):
+        if key in (b'content-encoding', b'content-range'):
+            return False
+        if key == b'content-type':
+            compressible = is_compressible(value)
+
+    return compressible
+
+
+class CompressingSender:
+    """
+    Compresses the body of a response on its way to `send`. A body sent at once is
+    compressed when it is at least the minimum size, a streamed one chunk by chunk.
+    The 304 answering the ETag of a compressed body carries that same ETag.
+    """
+
+    def __init__(self, send, compressor, encoding, revalidating=False):
+        self.send = send
+        self.compressor = compressor
+        self.encoding = encoding
+        self.revalidating = revalidating
+        self.start = None
+        self.stream = None
+        self.passthrough = False
+
+    async def __call__(self, message):
+        if self.passthrough or message['type'] not in ('http.response.start', 'http.response.body'):
+            await self.send(message)
+            return
+
+        if message['type'] == 'http.response.start':
+            if can_compress(message):
+                # Held until the first body message tells whether the body is streamed
+                self.start = message
+            elif message['status'] == 304 and self.revalidating:
+                self.passthrough = True
+                await self.send({
+                    **message,
+                    'headers': [
+                        (key, encoded_etag(value, self.encoding) if key == b'etag' else value)
+                        for key, value in message.get('headers', ())
+                    ]
+                })
+            else:
+                self.passthrough = True
+                await self.send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if self.stream is None:
+            if not more_body:
+                await self._send_whole(body)
+                return
+
+            self.stream = self.compressor.stream(self.encoding)
+            await self.send({
+                **self.start,
+                'headers': compressed_headers(self.start.get('headers', ()), self.encoding)
+            })
+
+        if self.compressor.pool is not None and len(body) >= self.compressor.offload_size:
+            chunk = await self.compressor.pool.run(self.stream.compress, body, not more_body)
+        else:
+            chunk = self.stream.compress(body, not more_body)
+
+        await self.send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+
+    async def _send_whole(self, body):
+        compressed = None
+
+        if len(body) >= self.compressor.minimum_size:
+            compressed = self.compressor.variants(body).get(self.encoding) \
+                or await self.compressor.compress_async(body, self.encoding)
+
+        if compressed is None or len(compressed) >= len(body):
+            await self.send(self.start)
+            await self.send({'type': 'http.response.body', 'body': body})
+            return
+
+        await self.send({
+            **self.start,
+            'headers': compressed_headers(
+                self.start.get('headers', ()),
+                self.encoding,
+                len(compressed)
+            )
+        })
+        await self.send({'type': 'http.response.body', 'body': compressed})
+
+
+class CompressionMiddleware:
+    """
+    Middleware compressing the textual responses with the encoding negotiated
+    through the Accept-Encoding header, brotli or gzip. Constant bodies are served
+    pre-compressed, large bodies are compressed off the event loop.
+    """
+
+    def __init__(self, app, compressor=default_compressor):
+        self.app = app
+        self.compressor = compressor
+
+    async def __call__(self, scope, receive, send):
+        if self.compressor is None or scope['type'] != 'http' or scope['method'] == 'HEAD':
+            await self.app(scope, receive, send)
+            return
+
+        encoding = self.compressor.negotiate(scope['headers'])
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        # The application compares the ETags of its uncompressed bodies
+        revalidating = False
+        for index, (key, value) in enumerate(scope['headers']):
+            if key == b'if-none-match':
+                value, revalidating = decoded_if_none_match(value, encoding)
+                if revalidating:
+                    headers = list(scope['headers'])
+                    headers[index] = (key, value)
+                    scope = {**scope, 'headers': headers}
+                break
+
+        await self.app(
+            scope,
+            receive,
+            CompressingSender(send, self.compressor, encoding, revalidating)
+        )
@@ -1,34 +1,76 @@
 import time
-from starlette.middleware.base import BaseHTTPMiddleware
+import logging
 
+from src.lib.tracing import RAW_TRACEPARENT_HEADER, tracer
 
-class LoggerMiddleware(BaseHTTPMiddleware):
+
+EXCLUDED_PATHS = frozenset((
+    '/-/ready',
+    '/-/healthz',
+    '/-/check-up',
+    '/-/metrics',
+    '/-/traces',
+))
+
+
+def get_traceparent(scope):
+    for key, value in scope['headers']:
+        if key == RAW_TRACEPARENT_HEADER:
+            return value.decode('latin-1')
+
+    return None
+
+
+class LoggerMiddleware:
     """
-    Middleware to add the logger to the request and logs request info
+    Middleware to add the logger to the request, logs request info and opens the
+    root span of the request trace
     """
 
     def __init__(self, app, logger):
-        super().__init__(app)
+        self.app = app
         self.logger = logger
 
-    async def dispatch(self, request, call_next):
-        excluded_paths = [
-            '/-/ready',
-            '/-/healthz',
-            '/-/check-up',
-        ]
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        scope.setdefault('state', {})['logger'] = self.logger
 
-        if request.url.path not in excluded_paths:
-            self.logger.debug(f"{request.method} {request.url.path}")
-            start_time = time.time()
+        path = scope['path']
+        if path in EXCLUDED_PATHS:
+            await self.app(scope, receive, send)
+            return
 
-        request.state.logger = self.logger
-        response = await call_next(request)
+        method = scope['method']
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        fields = {'method': method, 'path': path}
+        if debug:
+            self.logger.debug(f"{method} {path}", extra=fields)
 
-        if request.url.path not in excluded_paths:
-            duration = time.time() - start_time
+        start_time = time.perf_counter()
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+
+            await send(message)
+
+        with tracer.start_trace(
+            f'{method} {path}',
+            get_traceparent(scope),
+            **{'http.method': method, 'http.target': path}
+        ) as span:
+            await self.app(scope, receive, send_wrapper)
+            span.set('http.status_code', status_code)
+
+        if debug:
+            duration = time.perf_counter() - start_time
             self.logger.debug(
-                f"{request.method} {request.url.path} {response.status_code} {duration:.6f}s"
+                f"{method} {path} {status_code} {duration:.6f}s",
+                extra={**fields, 'status': status_code, 'duration': duration}
             )
-
-        return response
@@ -0,0 +1,46 @@
+import time
+
+from src.lib.metrics import HTTP_REQUESTS, HTTP_REQUESTS_IN_FLIGHT, HTTP_REQUEST_DURATION
+
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class MetricsMiddleware:
+    """
+    Middleware to record the request count, the in-flight requests and the
+    request latency by route template
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start_time = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+
+            await send(message)
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+
+            # The router stores the matched route in the scope
+            route = scope.get('route')
+            route = route.path if route is not None else UNMATCHED_ROUTE
+            method = scope['method']
+
+            HTTP_REQUESTS.inc((method, route, str(status_code)))
+            HTTP_REQUEST_DURATION.observe((method, route), time.perf_counter() - start_time)
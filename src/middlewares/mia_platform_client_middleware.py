@@ -1,22 +1,44 @@
-from starlette.middleware.base import BaseHTTPMiddleware
+from src.lib.response_cache import response_cache
+from src.lib.single_flight import single_flight, async_single_flight
 
-from src.lib.mia_platform_client import MiaPlatformClient
 
-
-class MiaPlatformClientMiddleware(BaseHTTPMiddleware):
+class MiaPlatformClientMiddleware:
     """
-    Middleware to add the logger to the request
+    Middleware to add the Mia Platform clients to the request
     """
 
     def __init__(self, app, logger):
-        super().__init__(app)
+        # pylint: disable=C0415
+        # Starlette builds the middlewares on the first ASGI call, the lifespan
+        # startup, so importing the app does not load the clients, requests and httpx
+        from src.lib.mia_platform_client import MiaPlatformClient
+        from src.lib.async_mia_platform_client import AsyncMiaPlatformClient
+
+        self.app = app
         self.logger = logger
+        self.client_class = MiaPlatformClient
+        self.async_client_class = AsyncMiaPlatformClient
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
 
-    async def dispatch(self, request, call_next):
-        request.state.mia_platform_client = MiaPlatformClient(
-            dict(request.headers.items()),
-            self.logger
+        headers = scope['headers']
+        state = scope.setdefault('state', {})
+
+        state['mia_platform_client'] = self.client_class(
+            headers,
+            self.logger,
+            cache=response_cache,
+            single_flight=single_flight
+        )
+        state['async_mia_platform_client'] = self.async_client_class(
+            scope['app'].state.http_client,
+            headers,
+            self.logger,
+            cache=response_cache,
+            single_flight=async_single_flight
         )
 
-        response = await call_next(request)
-        return response
+        await self.app(scope, receive, send)
@@ -0,0 +1,49 @@
+from src.schemas.status_ok_schema import STATUS_OK_BODIES
+from src.utils.health import health as default_health
+
+
+def _probe_messages(status_ok):
+    body = STATUS_OK_BODIES[status_ok]
+    start = {
+        'type': 'http.response.start',
+        'status': 200 if status_ok else 503,
+        'headers': [
+            (b'content-length', str(len(body)).encode()),
+            (b'content-type', b'application/json'),
+        ],
+    }
+
+    return start, {'type': 'http.response.body', 'body': body}, {'type': 'http.response.body'}
+
+
+PROBE_MESSAGES = {
+    True: _probe_messages(True),
+    False: _probe_messages(False),
+}
+
+
+class ProbeMiddleware:
+    """
+    Outermost middleware answering the Kubernetes probe routes with pre-serialized
+    bodies, so probes never reach the other middlewares nor the router. The
+    dependency-aware /-/check-up route is served by its handler.
+    """
+
+    def __init__(self, app, health=default_health):
+        self.app = app
+        self.probes = {
+            '/-/healthz': lambda: health.alive,
+            '/-/ready': lambda: health.ready,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['method'] in ('GET', 'HEAD'):
+            probe = self.probes.get(scope['path'])
+
+            if probe is not None:
+                start, body, empty_body = PROBE_MESSAGES[probe()]
+                await send(start)
+                await send(body if scope['method'] == 'GET' else empty_body)
+                return
+
+        await self.app(scope, receive, send)
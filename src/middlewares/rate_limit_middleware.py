@@ -0,0 +1,49 @@
+import orjson
+
+from src.lib.metrics import RATE_LIMITED
+from src.lib.rate_limit import rate_limiter as default_rate_limiter, retry_after_header
+
+
+# The probe and operational routes are never rate-limited
+EXEMPT_PATH_PREFIX = '/-/'
+
+RATE_LIMITED_BODY = orjson.dumps({'message': 'Too many requests, retry later'})
+
+
+class RateLimitMiddleware:
+    """
+    Middleware answering with a 429 and a Retry-After header the requests exceeding
+    the rate of one of their rate-limited headers, e.g. miauserid or miaclienttype
+    """
+
+    def __init__(self, app, rate_limiter=default_rate_limiter):
+        self.app = app
+        self.rate_limiter = rate_limiter
+
+    async def __call__(self, scope, receive, send):
+        if (
+            self.rate_limiter is None
+            or scope['type'] != 'http'
+            or scope['path'].startswith(EXEMPT_PATH_PREFIX)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        exceeded = await self.rate_limiter.check(scope['headers'])
+        if exceeded is None:
+            await self.app(scope, receive, send)
+            return
+
+        header, decision = exceeded
+        RATE_LIMITED.inc((header,))
+
+        await send({
+            'type': 'http.response.start',
+            'status': 429,
+            'headers': [
+                (b'content-length', str(len(RATE_LIMITED_BODY)).encode()),
+                (b'content-type', b'application/json'),
+                (b'retry-after', retry_after_header(decision).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': RATE_LIMITED_BODY})
@@ -0,0 +1,46 @@
+from src.utils.request_context import (
+    RAW_REQUEST_ID_HEADER,
+    RequestContext,
+    new_request_id,
+    request_id_from_headers,
+    reset_request_context,
+    set_request_context
+)
+
+
+class RequestContextMiddleware:
+    """
+    Middleware setting the request context: the request id is taken from the
+    x-request-id header, or generated when missing, and returned in the
+    x-request-id header of the response
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        request_id = request_id_from_headers(scope['headers']) or new_request_id()
+        raw_request_id = request_id.encode('latin-1')
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                # A new message: the inner middlewares may send the same one every time
+                message = {
+                    **message,
+                    'headers': [
+                        *message.get('headers', ()),
+                        (RAW_REQUEST_ID_HEADER, raw_request_id)
+                    ]
+                }
+
+            await send(message)
+
+        token = set_request_context(RequestContext(request_id))
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            reset_request_context(token)
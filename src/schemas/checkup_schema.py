@@ -0,0 +1,21 @@
+from typing import Dict, Optional
+from pydantic import BaseModel
+
+
+class DependencyCheckSchema(BaseModel):
+    """
+    The Dependency Check schema describe the outcome of a single dependency check
+    """
+
+    statusOk: bool
+    durationMs: float
+    error: Optional[str] = None
+
+
+class CheckUpResponseSchema(BaseModel):
+    """
+    The Check Up Response scheme describe the response of the check-up endpoint
+    """
+
+    statusOk: bool
+    checks: Dict[str, DependencyCheckSchema]
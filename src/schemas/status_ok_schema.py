@@ -1,5 +1,7 @@
 from pydantic import BaseModel
 
+from src.lib.responses import encode_constant
+
 
 class StatusOkResponseSchema(BaseModel):
     """
@@ -7,3 +9,10 @@ class StatusOkResponseSchema(BaseModel):
     """
 
     statusOk: bool
+
+
+# The bodies of the status routes, validated and encoded once
+STATUS_OK_BODIES = {
+    status_ok: encode_constant(StatusOkResponseSchema, {'statusOk': status_ok})
+    for status_ok in (True, False)
+}
@@ -0,0 +1,20 @@
+class HealthState:
+    """
+    The liveness and readiness of the service, reported by the probe routes.
+
+    Application code can flip them at runtime, e.g. to stop receiving traffic
+    while draining or warming up.
+    """
+
+    def __init__(self):
+        self.alive = True
+        self.ready = True
+
+    def set_alive(self, alive):
+        self.alive = alive
+
+    def set_ready(self, ready):
+        self.ready = ready
+
+
+health = HealthState()
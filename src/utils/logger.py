@@ -1,29 +1,152 @@
-import os
 import sys
+import queue
+import atexit
+import random
 import logging
-from dotenv import load_dotenv
+from logging.handlers import QueueHandler, QueueListener
+import orjson
 
+from src.utils.request_context import get_request_id
+from src.utils.settings import get_settings
 
-load_dotenv('default.env')
 
+STRUCTURED_FIELDS = ('request_id', 'method', 'path', 'url', 'status', 'duration')
+OVERFLOW_POLICIES = ('drop', 'sample', 'block')
 
-def get_logger(logger_name='mialogger'):
-    logging.basicConfig(
-        stream=sys.stdout,
-        level=os.environ.get('LOG_LEVEL', logging.DEBUG),
-    )
 
-    # Clear any existing handlers
-    for handler in logging.root.handlers[:]:
-        logging.root.removeHandler(handler)
+class JsonFormatter(logging.Formatter):
+    """
+    Serializes log records as single-line JSON objects, including the structured
+    fields passed through the `extra` argument of the logging calls
+    """
+
+    def format(self, record):
+        entry = {
+            'time': record.created,
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+
+        for field in STRUCTURED_FIELDS:
+            value = record.__dict__.get(field)
+            if value is not None:
+                entry[field] = value
+
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+
+        return orjson.dumps(entry, default=str).decode()
+
+
+class RequestContextFilter(logging.Filter):
+    """
+    Adds the id of the request being served to the records without one, it runs
+    in the thread logging the record, where the request context is set
+    """
+
+    def filter(self, record):
+        if record.__dict__.get('request_id') is None:
+            request_id = get_request_id()
+            if request_id is not None:
+                record.request_id = request_id
+
+        return True
+
+
+class StdoutHandler(logging.Handler):
+    """
+    Writes records to the current sys.stdout, looked up on every record
+    """
+
+    def emit(self, record):
+        try:
+            stream = sys.stdout
+            stream.write(self.format(record) + '\n')
+            stream.flush()
+        except Exception:  # pylint: disable=W0703
+            self.handleError(record)
+
+
+class OverflowQueueHandler(QueueHandler):
+    """
+    Enqueues records for the background listener, so that formatting and stdout
+    I/O never run on the event loop.
+
+    When the queue is full the record is handled according to the overflow policy:
+    `drop` discards it, `sample` keeps a `sample_rate` fraction of the overflowing
+    records by evicting the oldest queued ones, `block` waits for free space.
 
-    # Add a new handler with a filter
-    handler = logging.StreamHandler(sys.stdout)
-    handler.addFilter(lambda record: record.name.startswith(logger_name))
+    Args:
+        log_queue (queue.Queue): The bounded queue shared with the listener.
+        policy (str): The overflow policy.
+        sample_rate (float): The fraction of overflowing records kept by the sample policy.
+    """
 
-    logging.root.addHandler(handler)
+    def __init__(self, log_queue, policy='drop', sample_rate=0.1):
+        if policy not in OVERFLOW_POLICIES:
+            raise ValueError(f'Unknown log overflow policy "{policy}"')
 
+        super().__init__(log_queue)
+        self.policy = policy
+        self.sample_rate = sample_rate
+        self.dropped = 0
+
+    def prepare(self, record):
+        # Only merge the arguments into the message, the listener does the rest
+        record.msg = record.getMessage()
+        record.args = None
+
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.policy == 'block':
+            self.queue.put(record)
+            return
+
+        if self.policy == 'sample' and random.random() < self.sample_rate:
+            try:
+                self.queue.get_nowait()
+                self.queue.put_nowait(record)
+            except (queue.Empty, queue.Full):
+                pass
+
+        self.dropped += 1
+
+
+def get_logger(logger_name='mialogger'):
     logger = logging.getLogger(logger_name)
-    logger.propagate = False
+
+    if not logger.handlers:
+        settings = get_settings()
+
+        log_queue = queue.Queue(maxsize=settings.log_queue_size)
+        logger.addHandler(OverflowQueueHandler(
+            log_queue,
+            policy=settings.log_overflow_policy,
+            sample_rate=settings.log_sample_rate
+        ))
+        logger.addFilter(RequestContextFilter())
+        logger.setLevel(settings.log_level)
+        logger.propagate = False
+
+        handler = StdoutHandler()
+        handler.setFormatter(JsonFormatter())
+
+        listener = QueueListener(log_queue, handler)
+        listener.start()
+        atexit.register(listener.stop)
 
     return logger
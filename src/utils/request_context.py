@@ -0,0 +1,88 @@
+import uuid
+from contextvars import ContextVar, copy_context
+
+
+REQUEST_ID_HEADER = 'x-request-id'
+RAW_REQUEST_ID_HEADER = REQUEST_ID_HEADER.encode('latin-1')
+
+# Longer or non-printable incoming ids are replaced, they end up in every log record
+MAX_REQUEST_ID_LENGTH = 128
+
+
+class RequestContext:
+    """
+    The state of the request being served, set by the RequestContextMiddleware and
+    read by the logger and the Mia Platform clients of the same task or thread.
+
+    Args:
+        request_id (str): The id correlating the logs and the upstream calls of the request.
+    """
+
+    __slots__ = ('request_id',)
+
+    def __init__(self, request_id):
+        self.request_id = request_id
+
+
+_request_context = ContextVar('request_context', default=None)
+
+
+def get_request_context():
+    """
+    Returns the context of the request being served, None outside of a request
+    """
+
+    return _request_context.get()
+
+
+def get_request_id():
+    context = _request_context.get()
+
+    return None if context is None else context.request_id
+
+
+def set_request_context(context):
+    """
+    Sets the context of the current task, returns the token resetting it
+    """
+
+    return _request_context.set(context)
+
+
+def reset_request_context(token):
+    _request_context.reset(token)
+
+
+def new_request_id():
+    return uuid.uuid4().hex
+
+
+def request_id_from_headers(headers):
+    """
+    Returns the request id sent in an ASGI header list, None when it is missing or invalid
+    """
+
+    for key, value in headers:
+        if key == RAW_REQUEST_ID_HEADER:
+            request_id = value.decode('latin-1')
+            if 0 < len(request_id) <= MAX_REQUEST_ID_LENGTH and request_id.isprintable():
+                return request_id
+            return None
+
+    return None
+
+
+def bind_request_context(function):
+    """
+    Returns `function` running with the current context, the request context and
+    the current span included, in whatever thread calls it. Threads started by a
+    handler, unlike the anyio worker threads, do not inherit the context of the request.
+    """
+
+    context = copy_context()
+
+    # Every call runs in its own copy, a context cannot be entered by two threads at once
+    def bound(*args, **kwargs):
+        return context.copy().run(function, *args, **kwargs)
+
+    return bound
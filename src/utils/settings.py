@@ -0,0 +1,102 @@
+from functools import cached_property, lru_cache
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class Settings(BaseSettings):
+    """
+    The service configuration, read once from the environment and the default.env file.
+    """
+
+    model_config = SettingsConfigDict(
+        env_file='default.env',
+        extra='ignore',
+        frozen=True
+    )
+
+    log_level: str = 'DEBUG'
+    log_queue_size: int = 10000
+    log_overflow_policy: str = 'drop'
+    log_sample_rate: float = 0.1
+    http_port: int = 3000
+    server_host: str = '0.0.0.0'
+    server_workers: int = 1
+    server_loop: str = 'uvloop'
+    server_http: str = 'httptools'
+    server_backlog: int = 2048
+    server_keep_alive_timeout: int = 5
+    server_limit_concurrency: int = 0
+    server_graceful_shutdown_timeout: float = 30
+    server_reuse_port: bool = True
+    header_keys_to_proxy: str = ''
+    http_client_max_connections: int = 100
+    http_client_max_keepalive_connections: int = 20
+    http_client_keepalive_expiry: float = 5
+    upstream_connect_timeout: float = 2
+    upstream_read_timeout: float = 10
+    upstream_retries: int = 2
+    upstream_backoff_factor: float = 0.1
+    upstream_max_backoff: float = 2
+    circuit_breaker_failure_threshold: int = 5
+    circuit_breaker_recovery_timeout: float = 30
+    response_cache_enabled: bool = False
+    response_cache_max_entries: int = 1024
+    response_cache_ttl: float = 30
+    request_coalescing_enabled: bool = True
+    bulk_batch_size: int = 100
+    bulk_concurrency: int = 4
+    iter_page_size: int = 200
+    blocking_pool_size: int = 16
+    checkup_cache_ttl: float = 5
+    checkup_timeout: float = 2
+    metrics_multiproc_dir: str = ''
+    metrics_flush_interval: float = 5
+    admission_enabled: bool = True
+    admission_max_concurrency: int = 200
+    admission_route_limits: str = ''
+    admission_max_queue: int = 100
+    admission_queue_timeout: float = 1
+    admission_retry_after: int = 1
+    admission_adaptive: bool = False
+    admission_min_concurrency: int = 4
+    admission_latency_target: float = 0.5
+    admission_decrease_factor: float = 0.9
+    rate_limit_enabled: bool = False
+    rate_limits: str = 'miauserid=100/second,miaclienttype=1000/second'
+    rate_limit_max_keys: int = 1000000
+    compression_enabled: bool = True
+    compression_minimum_size: int = 500
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    compression_offload_size: int = 65536
+    compression_threads: int = 2
+    tracing_enabled: bool = True
+    tracing_sample_rate: float = 0.01
+    tracing_slow_threshold: float = 0.5
+    tracing_slow_traces: int = 50
+    tracing_export_file: str = ''
+    tracing_debug_route_enabled: bool = False
+
+    @cached_property
+    def proxied_header_keys(self):
+        """
+        The lower-cased names of the headers forwarded to the upstream services
+        """
+
+        return tuple(
+            key.strip().lower()
+            for key in self.header_keys_to_proxy.split(',')
+            if key.strip()
+        )
+
+    @cached_property
+    def proxied_raw_header_keys(self):
+        """
+        The proxied header names as they appear in an ASGI header list
+        """
+
+        return {key.encode('latin-1'): key for key in self.proxied_header_keys}
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    return Settings()
@@ -1,3 +1,5 @@
 # pylint: disable=W0611
 from tests.fixtures.test_client import test_client
 from tests.fixtures.mock_server import mock_server
+from tests.fixtures.anyio_backend import anyio_backend
+from tests.fixtures.circuit_breakers import reset_circuit_breakers
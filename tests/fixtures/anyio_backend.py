@@ -0,0 +1,10 @@
+import pytest
+
+
+@pytest.fixture
+def anyio_backend():
+    """
+    Async tests run on asyncio, the same event loop used by uvicorn
+    """
+
+    return 'asyncio'
@@ -0,0 +1,14 @@
+import pytest
+
+from src.lib.resilience import circuit_breakers
+
+
+@pytest.fixture(autouse=True)
+def reset_circuit_breakers():
+    """
+    Every test starts with closed circuits, whatever the previous tests sent upstream
+    """
+
+    circuit_breakers.reset()
+    yield
+    circuit_breakers.reset()
@@ -1,18 +1,56 @@
+import asyncio
 import pytest
+import httpx
 import httpretty
 
 
+class MockRoute:
+    """
+    A URI registered on the mock server, replayed by the httpx transport.
+    """
+
+    def __init__(self, method, uri, match_querystring, responses):
+        self.method = method
+        self.uri = httpx.URL(uri)
+        self.match_querystring = match_querystring
+        self.responses = responses
+        self.calls = 0
+
+    def matches(self, request):
+        if request.method != self.method:
+            return False
+
+        if self.match_querystring:
+            return request.url == self.uri
+
+        return request.url.copy_with(query=None) == self.uri.copy_with(query=None)
+
+    def respond(self, request):
+        index = min(self.calls, len(self.responses) - 1)
+        self.calls += 1
+        body, status, headers = self.responses[index]
+
+        if callable(body):
+            status, headers, body = body(request, str(request.url), headers)
+
+        return httpx.Response(status, headers=headers, content=body)
+
+
 class MockServer:
     """
     A simple mock server for testing purposes.
     """
 
+    def __init__(self):
+        self.routes = []
+
     def enable(self):
         httpretty.enable(verbose=False, allow_net_connect=False)
 
     def disable(self):
         httpretty.reset()
         httpretty.disable()
+        self.routes = []
 
     # pylint: disable=R0913
     def register_uri(
@@ -41,6 +79,43 @@ class MockServer:
             **headers
         )
 
+        replies = [
+            (
+                response.body,
+                response.status,
+                {**(response.adding_headers or {}), **(response.forcing_headers or {})}
+            )
+            for response in responses or []
+        ] or [(
+            body,
+            status,
+            {
+                **{key.replace('_', '-'): value for key, value in headers.items()},
+                **(adding_headers or {}),
+                **(forcing_headers or {})
+            }
+        )]
+
+        self.routes.insert(0, MockRoute(method, uri, match_querystring, replies))
+
+    def transport(self, latency=0.0):
+        """
+        Returns an httpx transport that serves the registered URIs to async clients,
+        optionally waiting `latency` seconds before every response.
+        """
+
+        async def handler(request):
+            if latency:
+                await asyncio.sleep(latency)
+
+            for route in self.routes:
+                if route.matches(request):
+                    return route.respond(request)
+
+            raise httpx.ConnectError(f'No mock registered for {request.method} {request.url}')
+
+        return httpx.MockTransport(handler)
+
 
 @pytest.fixture
 def mock_server():
@@ -1,16 +1,18 @@
 import pytest
 from fastapi.testclient import TestClient
 
-from src.app import app
 from src.schemas.header_schema import HeaderSchema
 
 
 @pytest.fixture
 def test_client():
     """
-    This client can call the developed application
+    This client can call the developed application, which is imported only by
+    the tests using it
     """
 
+    from src.app import app  # pylint: disable=C0415
+
     with TestClient(app) as client:
         client.headers = HeaderSchema().model_dump(by_alias=True)
         yield client
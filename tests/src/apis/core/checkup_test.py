@@ -1,3 +1,16 @@
+import pytest
+
+from src.lib.checkup import checkup_registry
+
+
+@pytest.fixture(name='registry')
+def fixture_registry():
+    yield checkup_registry
+
+    checkup_registry.checks.clear()
+    checkup_registry.invalidate()
+
+
 def test_checkup(test_client):
     """
     Test the availability of all the service's dependencies
@@ -6,4 +19,31 @@ def test_checkup(test_client):
     response = test_client.get("/-/check-up")
 
     assert response.status_code == 200
-    assert response.json() == {"statusOk": True}
+    assert response.json() == {"statusOk": True, "checks": {}}
+
+
+def test_checkup_with_unavailable_dependency(test_client, registry):
+    """
+    Test the check-up reports each dependency and fails when one of them is down
+    """
+
+    async def available(_app):
+        pass
+
+    async def unavailable(_app):
+        raise ConnectionError('Connection refused')
+
+    registry.register('crud', available)
+    registry.register('mongo', unavailable)
+
+    response = test_client.get("/-/check-up")
+    body = response.json()
+
+    assert response.status_code == 503
+    assert body["statusOk"] is False
+    assert body["checks"]["crud"]["statusOk"] is True
+    assert body["checks"]["mongo"] == {
+        "statusOk": False,
+        "durationMs": body["checks"]["mongo"]["durationMs"],
+        "error": "Connection refused",
+    }
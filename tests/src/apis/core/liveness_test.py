@@ -1,3 +1,6 @@
+from src.utils.health import health
+
+
 def test_liveness(test_client):
     """
     Test if the application is up and runnig
@@ -7,3 +10,19 @@ def test_liveness(test_client):
 
     assert response.status_code == 200
     assert response.json() == {"statusOk": True}
+
+
+def test_not_alive(test_client):
+    """
+    Test that the application reports when it is flagged as not alive
+    """
+
+    health.set_alive(False)
+
+    try:
+        response = test_client.get("/-/healthz")
+    finally:
+        health.set_alive(True)
+
+    assert response.status_code == 503
+    assert response.json() == {"statusOk": False}
@@ -0,0 +1,44 @@
+import os
+from fastapi.testclient import TestClient
+
+from src.apis.core.metrics import metrics_handler
+from src.utils.settings import Settings
+
+
+def test_metrics(test_client):
+    """
+    Test the metrics are exposed in the Prometheus text format
+    """
+
+    test_client.get("/")
+    test_client.get("/not-found")
+
+    response = test_client.get("/-/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    assert 'http_requests_total{method="GET",route="/",status="200"}' in response.text
+    assert 'http_requests_total{method="GET",route="<unmatched>",status="404"}' in response.text
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/",le="+Inf"}' \
+        in response.text
+    assert "http_requests_in_flight 1" in response.text
+
+
+def test_multiprocess_directory_is_created_on_startup(tmp_path, monkeypatch):
+    """
+    The lifespan creates a missing directory, the scrapes and the last snapshot
+    written on shutdown find it
+    """
+
+    from src import app as app_module  # pylint: disable=C0415
+
+    directory = tmp_path / 'metrics'
+    settings = Settings(metrics_multiproc_dir=str(directory))
+    monkeypatch.setattr(app_module, 'get_settings', lambda: settings)
+    monkeypatch.setattr(metrics_handler, 'get_settings', lambda: settings)
+
+    with TestClient(app_module.app) as client:
+        response = client.get('/-/metrics')
+
+    assert response.status_code == 200
+    assert (directory / f'{os.getpid()}.json').exists()
@@ -0,0 +1,55 @@
+from src.apis.core.openapi.openapi_handler import openapi_cache
+
+
+def test_openapi_document_is_generated_once(test_client):
+    """
+    The document is encoded on the first request and then served as it is
+    """
+
+    first = test_client.get('/documentation/json', headers={'accept-encoding': 'identity'})
+    second = test_client.get('/documentation/json', headers={'accept-encoding': 'identity'})
+
+    assert first.status_code == 200
+    assert first.json()['paths']['/']['get']['tags'] == ['python-fastapi-template']
+    assert first.content == second.content
+    assert first.headers['etag'] == second.headers['etag']
+    assert not first.headers['etag'].startswith('W/')
+    assert first.headers['cache-control'] == 'no-cache'
+
+    assert openapi_cache(test_client.app).body is openapi_cache(test_client.app).body
+
+
+def test_openapi_document_is_revalidated(test_client):
+    etag = test_client.get('/documentation/json').headers['etag']
+
+    response = test_client.get('/documentation/json', headers={'if-none-match': etag})
+
+    assert response.status_code == 304
+    assert response.content == b''
+
+
+def test_compressed_document_has_a_strong_etag_of_its_own(test_client):
+    """
+    The 200 and the 304 of the compressed document carry the same strong ETag,
+    distinct from the one of the uncompressed document
+    """
+
+    headers = {'accept-encoding': 'gzip'}
+    identity = test_client.get('/documentation/json', headers={'accept-encoding': 'identity'})
+    compressed = test_client.get('/documentation/json', headers=headers)
+    etag = compressed.headers['etag']
+
+    revalidated = test_client.get(
+        '/documentation/json',
+        headers={**headers, 'if-none-match': etag}
+    )
+    # A client holding the uncompressed document keeps it
+    held = test_client.get(
+        '/documentation/json',
+        headers={**headers, 'if-none-match': identity.headers['etag']}
+    )
+
+    assert compressed.headers['content-encoding'] == 'gzip'
+    assert etag == identity.headers['etag'][:-1] + '-gzip"'
+    assert (revalidated.status_code, revalidated.headers['etag']) == (304, etag)
+    assert (held.status_code, held.headers['etag']) == (304, identity.headers['etag'])
@@ -1,3 +1,6 @@
+from src.utils.health import health
+
+
 def test_readiness(test_client):
     """
     Test if the application is ready to handle a new request
@@ -7,3 +10,19 @@ def test_readiness(test_client):
 
     assert response.status_code == 200
     assert response.json() == {"statusOk": True}
+
+
+def test_not_ready(test_client):
+    """
+    Test that the application stops receiving traffic when flagged as not ready
+    """
+
+    health.set_ready(False)
+
+    try:
+        response = test_client.get("/-/ready")
+    finally:
+        health.set_ready(True)
+
+    assert response.status_code == 503
+    assert response.json() == {"statusOk": False}
@@ -7,3 +7,27 @@ def test_hello_world(test_client):
 
     assert response.status_code == 200
     assert response.json() == {"message": "Hello World!"}
+
+
+def test_hello_world_is_serialized_with_orjson(test_client):
+    """
+    Routes render their body with orjson by default
+    """
+
+    response = test_client.get("/")
+
+    assert response.content == b'{"message":"Hello World!"}'
+
+
+def test_hello_world_is_revalidated(test_client):
+    """
+    A client holding the body gets a 304
+    """
+
+    response = test_client.get("/")
+    assert response.headers["cache-control"] == "public, max-age=60"
+
+    revalidated = test_client.get("/", headers={"if-none-match": response.headers["etag"]})
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b""
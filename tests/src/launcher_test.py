@@ -0,0 +1,109 @@
+import time
+import socket
+import pytest
+import uvicorn
+
+from src import launcher
+from src.launcher import GracefulServer, bind_reuse_port, resolve, server_options
+from src.utils.settings import Settings
+
+
+class StuckConnection:
+    """
+    A connection that never closes
+    """
+
+    def shutdown(self):
+        pass
+
+
+class RecordingLifespan:
+    """
+    Records the lifespan shutdown
+    """
+
+    def __init__(self):
+        self.shut_down = False
+
+    async def shutdown(self):
+        self.shut_down = True
+
+
+def test_server_options():
+    settings = Settings(
+        http_port=8080,
+        server_workers=4,
+        server_loop='asyncio',
+        server_http='h11',
+        server_backlog=128,
+        server_keep_alive_timeout=30,
+        server_limit_concurrency=0
+    )
+
+    assert server_options(settings) == {
+        'host': '0.0.0.0',
+        'port': 8080,
+        'loop': 'asyncio',
+        'http': 'h11',
+        'backlog': 128,
+        'timeout_keep_alive': 30,
+        'limit_concurrency': None,
+        'workers': 4,
+    }
+
+
+def test_missing_implementation_falls_back(monkeypatch):
+    monkeypatch.setitem(launcher.IMPLEMENTATIONS, 'loop', {
+        'uvloop': ('not_installed_event_loop', 'asyncio')
+    })
+
+    assert resolve('loop', 'uvloop') == 'asyncio'
+    assert resolve('http', 'httptools') == 'httptools'
+
+
+def test_workers_share_the_port_with_reuse_port():
+    first = bind_reuse_port('127.0.0.1', 0, 16)
+    port = first.getsockname()[1]
+
+    try:
+        second = bind_reuse_port('127.0.0.1', port, 16)
+        second.close()
+    finally:
+        first.close()
+
+    plain = socket.socket()
+    plain.bind(('127.0.0.1', 0))
+    with pytest.raises(OSError):
+        bind_reuse_port('127.0.0.1', plain.getsockname()[1], 16)
+    plain.close()
+
+
+@pytest.mark.anyio
+async def test_graceful_shutdown_times_out():
+    """
+    Connections still open after the timeout do not stop the application shutdown
+    """
+
+    server = GracefulServer(uvicorn.Config('src.app:app'), shutdown_timeout=0.3)
+    server.servers = []
+    server.lifespan = RecordingLifespan()
+    server.server_state.connections.add(StuckConnection())
+
+    start = time.perf_counter()
+    await server.shutdown()
+
+    assert 0.3 <= time.perf_counter() - start < 1
+    assert server.timed_out
+    assert server.lifespan.shut_down
+
+
+@pytest.mark.anyio
+async def test_graceful_shutdown_without_connections():
+    server = GracefulServer(uvicorn.Config('src.app:app'), shutdown_timeout=0.3)
+    server.servers = []
+    server.lifespan = RecordingLifespan()
+
+    await server.shutdown()
+
+    assert not server.timed_out
+    assert server.lifespan.shut_down
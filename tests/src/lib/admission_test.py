@@ -0,0 +1,140 @@
+import time
+import asyncio
+import pytest
+
+from src.lib.admission import (
+    AIMDLimit,
+    AdmissionController,
+    AdmissionRejected,
+    ConcurrencyLimiter,
+    parse_route_limits
+)
+from src.lib.metrics import ADMISSION_REJECTED
+
+
+def deadline(seconds):
+    return asyncio.get_running_loop().time() + seconds
+
+
+def test_parse_route_limits():
+    assert parse_route_limits(' /items/{item_id}=10, /reports=2,') \
+        == {'/items/{item_id}': 10, '/reports': 2}
+    assert not parse_route_limits('')
+
+
+@pytest.mark.anyio
+async def test_waiters_are_admitted_in_order():
+    limiter = ConcurrencyLimiter('test', 1, max_queue=2)
+    await limiter.acquire(deadline(1))
+
+    first = asyncio.ensure_future(limiter.acquire(deadline(1)))
+    second = asyncio.ensure_future(limiter.acquire(deadline(1)))
+    await asyncio.sleep(0)
+    assert len(limiter.waiters) == 2
+
+    limiter.release()
+    await first
+    assert not second.done()
+    assert limiter.in_flight == 1
+
+    limiter.release()
+    await second
+    limiter.release()
+    assert limiter.in_flight == 0
+    assert not limiter.waiters
+
+
+@pytest.mark.anyio
+async def test_full_queue_and_deadline_reject():
+    limiter = ConcurrencyLimiter('test', 1, max_queue=1)
+    await limiter.acquire(deadline(1))
+    waiting = asyncio.ensure_future(limiter.acquire(deadline(0.05)))
+    await asyncio.sleep(0)
+
+    with pytest.raises(AdmissionRejected) as rejected:
+        await limiter.acquire(deadline(1))
+    assert rejected.value.reason == 'queue_full'
+
+    with pytest.raises(AdmissionRejected) as timed_out:
+        await waiting
+    assert timed_out.value.reason == 'timeout'
+
+    assert not limiter.waiters
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.anyio
+async def test_cancelled_waiters_give_their_slot_back():
+    limiter = ConcurrencyLimiter('test', 1, max_queue=2)
+    await limiter.acquire(deadline(1))
+
+    cancelled = asyncio.ensure_future(limiter.acquire(deadline(1)))
+    await asyncio.sleep(0)
+    cancelled.cancel()
+    await asyncio.sleep(0)
+    assert not limiter.waiters
+
+    # Cancelled right after the slot was handed over
+    handed = asyncio.ensure_future(limiter.acquire(deadline(1)))
+    await asyncio.sleep(0)
+    limiter.release()
+    handed.cancel()
+    await asyncio.sleep(0)
+
+    assert handed.cancelled()
+    assert limiter.in_flight == 0
+
+
+def test_aimd_limit():
+    limit = AIMDLimit(10, min_limit=2, latency_target=0.1, decrease_factor=0.5)
+    started_at = time.monotonic()
+
+    assert limit.update(1.0, started_at, in_flight=10) == 5
+    # Admitted under the old limit, it does not shrink it again
+    assert limit.update(1.0, started_at, in_flight=5) == 5
+    assert limit.update(1.0, time.monotonic(), in_flight=5) == 2
+    assert limit.update(1.0, time.monotonic(), in_flight=2) == 2
+
+    assert limit.update(0.01, time.monotonic(), in_flight=2) == 3
+    assert limit.update(0.01, time.monotonic(), in_flight=1) == 3
+    for _ in range(20):
+        limit.update(0.01, time.monotonic(), in_flight=10)
+    assert limit.value == 10
+
+
+@pytest.mark.anyio
+async def test_adaptive_limiter_shrinks_on_slow_requests():
+    limiter = ConcurrencyLimiter(
+        'adaptive', 2, max_queue=2,
+        adaptive=AIMDLimit(2, min_limit=1, latency_target=0.1)
+    )
+    await limiter.acquire(deadline(1))
+    await limiter.acquire(deadline(1))
+
+    limiter.release(1.0, time.monotonic())
+    assert limiter.capacity == 1
+    assert limiter.in_flight == 1
+
+
+@pytest.mark.anyio
+async def test_controller_releases_the_route_slot_on_rejection():
+    route = ConcurrencyLimiter('/items/{item_id}', 5, max_queue=0)
+    global_limiter = ConcurrencyLimiter('<global>', 1, max_queue=0)
+    controller = AdmissionController(
+        global_limiter,
+        {'/items/{item_id}': route},
+        queue_timeout=1,
+        retry_after=1
+    )
+
+    assert controller.limiters('/items/1') == [route, global_limiter]
+    assert controller.limiters('/other') == [global_limiter]
+
+    await controller.admit(controller.limiters('/other'))
+    before = ADMISSION_REJECTED.samples.get(('<global>', 'queue_full'), 0)
+
+    with pytest.raises(AdmissionRejected):
+        await controller.admit(controller.limiters('/items/1'))
+
+    assert route.in_flight == 0
+    assert ADMISSION_REJECTED.samples[('<global>', 'queue_full')] == before + 1
@@ -0,0 +1,264 @@
+import json
+import pytest
+import httpretty
+from fastapi import status
+
+from src.schemas.header_schema import HeaderSchema
+from src.lib.async_mia_platform_client import AsyncMiaPlatformClient, create_http_client
+from src.utils.logger import get_logger
+
+
+@pytest.fixture(name='headers')
+def fixture_headers():
+    header_schema = HeaderSchema()
+    headers = header_schema.model_dump(by_alias=True)
+    yield headers
+
+
+@pytest.fixture(name='baseurl')
+def fixture_baseurl():
+    baseurl = 'http://www.dummy-url.com'
+    yield baseurl
+
+
+@pytest.fixture(name='async_mia_platform_client')
+async def fixture_async_mia_platform_client(headers, mock_server):
+    logger = get_logger()
+
+    async with create_http_client(transport=mock_server.transport()) as http_client:
+        yield AsyncMiaPlatformClient(http_client, headers, logger)
+
+
+@pytest.mark.anyio
+class TestAsyncMiaPlatformClient:
+    """
+    Test all functionalities of the async Mia Platform Client
+    """
+
+    # Headers
+
+    async def test_200_get_with_extra_headers(
+        self,
+        headers,
+        baseurl,
+        mock_server,
+        async_mia_platform_client
+    ):
+        """
+        Successfully make request with extra headers
+        """
+
+        url = f'{baseurl}/resources'
+        body = [{'message': 'Hi :)'}]
+        extra_headers = {
+            'x-dummy': 'test',
+            'x-custom': '123'
+        }
+        expected_headers = {
+            **headers,
+            **extra_headers
+        }
+
+        mock_server.register_uri(
+            method=httpretty.GET,
+            uri=url,
+            status=status.HTTP_200_OK,
+            body=json.dumps(body)
+        )
+
+        response = await async_mia_platform_client.get(url, headers=extra_headers)
+
+        # Request
+        assert response.request.url == url
+        assert response.request.method == httpretty.GET
+        assert response.request.headers.items() >= expected_headers.items()
+
+        # Response
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == body
+
+    # Cookies
+
+    async def test_upstream_cookies_are_not_shared(self, headers, baseurl, mock_server):
+        """
+        A cookie set by the upstream for a user is not sent on the calls of another
+        """
+
+        url = f'{baseurl}/resources'
+        cookies = []
+
+        def set_cookie(request, _uri, response_headers):
+            cookies.append(request.headers.get('cookie'))
+            return 200, {**response_headers, 'set-cookie': 'session=alice-secret; Path=/'}, '[]'
+
+        mock_server.register_uri(method=httpretty.GET, uri=url, body=set_cookie)
+        logger = get_logger()
+
+        async with create_http_client(transport=mock_server.transport()) as http_client:
+            for user in ('alice', 'bob'):
+                await AsyncMiaPlatformClient(
+                    http_client,
+                    {**headers, 'miauserid': user},
+                    logger
+                ).get(url)
+
+        assert cookies == [None, None]
+
+    # Read
+
+    @pytest.mark.parametrize('verb, path, call', [
+        ('GET', 'resources', lambda client, url: client.get(url)),
+        ('GET BY ID', 'resources/1', lambda client, url: client.get_by_id(url, 1)),
+        ('COUNT', 'resources/count', lambda client, url: client.count(url)),
+    ])
+    # pylint: disable=R0913
+    async def test_200_read(
+        self,
+        headers,
+        baseurl,
+        mock_server,
+        async_mia_platform_client,
+        verb,
+        path,
+        call
+    ):
+        """
+        Sucessfully read from the collection
+        """
+
+        url = f'{baseurl}/{path}'
+        body = {'verb': verb}
+
+        mock_server.register_uri(
+            method=httpretty.GET,
+            uri=url,
+            status=status.HTTP_200_OK,
+            body=json.dumps(body)
+        )
+
+        response = await call(async_mia_platform_client, f'{baseurl}/resources')
+
+        # Request
+        assert response.request.url == url
+        assert response.request.method == httpretty.GET
+        assert response.request.headers.items() >= headers.items()
+
+        # Response
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == body
+
+    # Write
+
+    @pytest.mark.parametrize('method, path, call, status_code', [
+        (
+            httpretty.POST, 'resources',
+            lambda client, url: client.post(url, data={'key': 'value'}),
+            status.HTTP_201_CREATED
+        ),
+        (
+            httpretty.PUT, 'resources',
+            lambda client, url: client.put(url, data={'key': 'value'}),
+            status.HTTP_201_CREATED
+        ),
+        (
+            httpretty.PATCH, 'resources/1',
+            lambda client, url: client.patch(url, 1, data={'key': 'value'}),
+            status.HTTP_200_OK
+        ),
+        (
+            httpretty.DELETE, 'resources',
+            lambda client, url: client.delete(url),
+            status.HTTP_204_NO_CONTENT
+        ),
+        (
+            httpretty.DELETE, 'resources/1',
+            lambda client, url: client.delete_by_id(url, 1),
+            status.HTTP_204_NO_CONTENT
+        ),
+    ])
+    # pylint: disable=R0913
+    async def test_2xx_write(
+        self,
+        headers,
+        baseurl,
+        mock_server,
+        async_mia_platform_client,
+        method,
+        path,
+        call,
+        status_code
+    ):
+        """
+        Sucessfully write to the collection
+        """
+
+        url = f'{baseurl}/{path}'
+
+        mock_server.register_uri(
+            method=method,
+            uri=url,
+            status=status_code,
+            body=''
+        )
+
+        response = await call(async_mia_platform_client, f'{baseurl}/resources')
+
+        # Request
+        assert response.request.url == url
+        assert response.request.method == method
+        assert response.request.headers.items() >= headers.items()
+
+        # Response
+        assert response.status_code == status_code
+
+    # Errors
+
+    async def test_500_get(
+        self,
+        baseurl,
+        mock_server,
+        async_mia_platform_client
+    ):
+        """
+        Error on retriving the resources from the collection
+        """
+
+        url = f'{baseurl}/resources'
+
+        mock_server.register_uri(
+            method=httpretty.GET,
+            uri=url,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+        with pytest.raises(
+            Exception,
+            match=f"Error - AsyncMiaPlatformClient GET {url}"
+                f" respond with status code {status.HTTP_500_INTERNAL_SERVER_ERROR}"
+        ):
+            await async_mia_platform_client.get(url)
+
+    async def test_404_delete_by_id(
+        self,
+        baseurl,
+        mock_server,
+        async_mia_platform_client
+    ):
+        """
+        Resource :id to delete not found in the collection
+        """
+
+        url = f'{baseurl}/resources/1'
+
+        mock_server.register_uri(
+            method=httpretty.DELETE,
+            uri=url,
+            status=status.HTTP_404_NOT_FOUND,
+        )
+
+        with pytest.raises(
+            Exception,
+            match=f"Error - AsyncMiaPlatformClient DELETE BY ID {url}"
+                f" respond with status code {status.HTTP_404_NOT_FOUND}"
+        ):
+            await async_mia_platform_client.delete_by_id(f'{baseurl}/resources', 1)
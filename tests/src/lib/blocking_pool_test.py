@@ -0,0 +1,98 @@
+import time
+import asyncio
+import threading
+import httpretty
+import pytest
+
+from src.lib.blocking_pool import BlockingPool
+from src.lib.metrics import BLOCKING_POOL_BUSY, BLOCKING_POOL_QUEUED
+from src.lib.mia_platform_client import MiaPlatformClient, OffloadedMiaPlatformClient
+from src.utils.logger import get_logger
+from src.utils.request_context import (
+    RequestContext,
+    get_request_id,
+    reset_request_context,
+    set_request_context
+)
+
+
+URL = 'http://www.dummy-url.com/resources'
+
+
+async def heartbeat(stop, gaps, interval=0.01):
+    """
+    Records how late the event loop wakes up the sleeping task
+    """
+
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(interval)
+        gaps.append(time.perf_counter() - started_at - interval)
+
+
+@pytest.mark.anyio
+async def test_event_loop_stays_responsive(mock_server):
+    """
+    A slow upstream call holds a thread of the pool, not the event loop
+    """
+
+    def slow_body(_request, _uri, headers):
+        time.sleep(0.3)
+        return 200, headers, '[{"message": "Hi :)"}]'
+
+    mock_server.register_uri(method=httpretty.GET, uri=URL, body=slow_body)
+    client = OffloadedMiaPlatformClient(
+        MiaPlatformClient({}, get_logger()),
+        BlockingPool('test', 2)
+    )
+
+    stop, gaps = asyncio.Event(), []
+    ticker = asyncio.ensure_future(heartbeat(stop, gaps))
+
+    response = await client.get(URL)
+    stop.set()
+    await ticker
+    client.pool.shutdown()
+
+    assert response.json() == [{'message': 'Hi :)'}]
+    assert len(gaps) > 10
+    assert max(gaps) < 0.1
+
+
+@pytest.mark.anyio
+async def test_queue_depth_and_busy_threads():
+    pool = BlockingPool('test_saturation', 1)
+    release = threading.Event()
+    labels = ('test_saturation',)
+
+    running = asyncio.ensure_future(pool.run(release.wait, 5))
+    queued = asyncio.ensure_future(pool.run(release.wait, 5))
+    await asyncio.sleep(0.05)
+    assert (BLOCKING_POOL_BUSY.samples[labels], BLOCKING_POOL_QUEUED.samples[labels]) == (1, 1)
+
+    # A call cancelled while queued never runs and leaves the queue
+    queued.cancel()
+    await asyncio.sleep(0)
+    assert BLOCKING_POOL_QUEUED.samples[labels] == 0
+
+    release.set()
+    assert await running
+    assert queued.cancelled()
+    assert BLOCKING_POOL_BUSY.samples[labels] == 0
+    pool.shutdown()
+
+
+@pytest.mark.anyio
+async def test_calls_run_with_the_caller_context():
+    pool = BlockingPool('test_context', 1)
+    token = set_request_context(RequestContext('request-1'))
+
+    try:
+        assert await pool.run(get_request_id) == 'request-1'
+    finally:
+        reset_request_context(token)
+        pool.shutdown()
+
+    # The pool starts again after a shutdown
+    assert await pool.run(get_request_id) is None
+    pool.shutdown()
@@ -0,0 +1,186 @@
+import io
+import json
+import threading
+import httpretty
+import pytest
+import requests
+from fastapi import status
+
+from src.lib.async_mia_platform_client import AsyncMiaPlatformClient, create_http_client
+from src.lib.bulk import batches
+from src.lib.exceptions import MiaPlatformHTTPError
+from src.lib.mia_platform_client import MiaPlatformClient
+from src.utils.logger import get_logger
+
+
+URL = 'http://www.dummy-url.com/resources'
+
+
+class Recorder:
+    """
+    Records the bodies received by a mock upstream route, from any thread
+    """
+
+    def __init__(self, status_code=status.HTTP_200_OK, failing=()):
+        self.status_code = status_code
+        self.failing = failing
+        self.bodies = []
+        self._lock = threading.Lock()
+
+    def __call__(self, request, uri, headers):
+        body = json.loads(request.body) if request.body else None
+        with self._lock:
+            self.bodies.append((uri, body))
+
+        if body in self.failing or uri.rsplit('/', 1)[-1] in self.failing:
+            return status.HTTP_400_BAD_REQUEST, headers, '{}'
+
+        return self.status_code, headers, json.dumps(body)
+
+
+class EchoAdapter(requests.adapters.BaseAdapter):
+    """
+    Answers every request with its own body, in-process: unlike httpretty it can
+    serve several threads at once
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.bodies = []
+        self._lock = threading.Lock()
+
+    def send(self, request, *_args, **_kwargs):
+        with self._lock:
+            self.bodies.append(json.loads(request.body))
+
+        response = requests.Response()
+        response.status_code = status.HTTP_200_OK
+        response.raw = io.BytesIO(request.body)
+        response.request = request
+        response.url = request.url
+
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture(name='mia_platform_client')
+def fixture_mia_platform_client():
+    yield MiaPlatformClient({}, get_logger())
+
+
+def test_batches():
+    assert batches(range(5), 2) == [[0, 1], [2, 3], [4]]
+    assert not batches([], 2)
+
+
+class TestBulk:
+    """
+    Test the bulk operations of the Mia Platform Client, httpretty is not thread-safe
+    so the sync tests inspecting the request bodies send one request at a time
+    """
+
+    def test_bulk_post(self, mock_server, mia_platform_client):
+        recorder = Recorder()
+        mock_server.register_uri(method=httpretty.POST, uri=f'{URL}/bulk', body=recorder)
+        records = [{'n': n} for n in range(25)]
+
+        results = mia_platform_client.bulk_post(URL, records, batch_size=10, concurrency=1)
+
+        assert [result.item for result in results] == records
+        assert all(result.succeeded for result in results)
+        assert [len(body) for _, body in recorder.bodies] == [10, 10, 5]
+
+    def test_bulk_post_sends_the_batches_in_parallel_threads(self):
+        adapter = EchoAdapter()
+        session = requests.Session()
+        session.mount('http://', adapter)
+        client = MiaPlatformClient({}, get_logger(), session=session)
+        records = [{'n': n} for n in range(45)]
+
+        results = client.bulk_post(URL, records, batch_size=10, concurrency=3)
+
+        assert [result.item for result in results] == records
+        assert all(result.succeeded for result in results)
+        assert sorted(len(body) for body in adapter.bodies) == [5, 10, 10, 10, 10]
+
+    def test_bulk_post_falls_back_to_single_calls(self, mock_server, mia_platform_client):
+        mock_server.register_uri(
+            method=httpretty.POST,
+            uri=f'{URL}/bulk',
+            status=status.HTTP_404_NOT_FOUND
+        )
+        recorder = Recorder(status.HTTP_201_CREATED, failing=[{'n': 3}])
+        mock_server.register_uri(method=httpretty.POST, uri=URL, body=recorder)
+        records = [{'n': n} for n in range(7)]
+
+        results = mia_platform_client.bulk_post(URL, records, batch_size=3, concurrency=1)
+
+        assert [result.item for result in results] == records
+        assert [result.succeeded for result in results] == [
+            True, True, True, False, True, True, True
+        ]
+        assert isinstance(results[3].error, MiaPlatformHTTPError)
+        assert results[3].error.status_code == status.HTTP_400_BAD_REQUEST
+        assert results[0].response.status_code == status.HTTP_201_CREATED
+        assert len(recorder.bodies) == 7
+
+    def test_failed_batch_does_not_stop_the_others(self, mock_server, mia_platform_client):
+        failing = [(2, {'$set': {'n': 2}}), (3, {'$set': {'n': 3}})]
+        recorder = Recorder(failing=[[
+            {'filter': {'_id': _id}, 'update': update} for _id, update in failing
+        ]])
+        mock_server.register_uri(method=httpretty.PATCH, uri=f'{URL}/bulk', body=recorder)
+        updates = [(n, {'$set': {'n': n}}) for n in range(6)]
+
+        results = mia_platform_client.bulk_patch(URL, updates, batch_size=2, concurrency=1)
+
+        assert [result.succeeded for result in results] == [True, True, False, False, True, True]
+        assert recorder.bodies[0][1] == [
+            {'filter': {'_id': 0}, 'update': {'$set': {'n': 0}}},
+            {'filter': {'_id': 1}, 'update': {'$set': {'n': 1}}},
+        ]
+
+    def test_bulk_delete(self, mock_server, mia_platform_client):
+        recorder = Recorder(failing=['2'])
+        for _id in range(4):
+            mock_server.register_uri(method=httpretty.DELETE, uri=f'{URL}/{_id}', body=recorder)
+
+        results = mia_platform_client.bulk_delete(URL, range(4), concurrency=2)
+
+        assert [result.item for result in results] == [0, 1, 2, 3]
+        assert [result.succeeded for result in results] == [True, True, False, True]
+
+    @pytest.mark.anyio
+    async def test_async_bulk_patch_falls_back_to_single_calls(self, mock_server):
+        mock_server.register_uri(
+            method=httpretty.PATCH,
+            uri=f'{URL}/bulk',
+            status=status.HTTP_405_METHOD_NOT_ALLOWED
+        )
+        for _id in range(5):
+            mock_server.register_uri(method=httpretty.PATCH, uri=f'{URL}/{_id}', body='{}')
+        updates = [(_id, {'$set': {'n': _id}}) for _id in range(5)]
+
+        async with create_http_client(transport=mock_server.transport()) as http_client:
+            client = AsyncMiaPlatformClient(http_client, {}, get_logger())
+            results = await client.bulk_patch(URL, updates, batch_size=2, concurrency=2)
+
+        assert [result.item for result in results] == updates
+        assert all(result.succeeded for result in results)
+        assert all(route.calls == 1 for route in mock_server.routes[:5])
+
+    @pytest.mark.anyio
+    async def test_async_bulk_post(self, mock_server):
+        mock_server.register_uri(method=httpretty.POST, uri=f'{URL}/bulk', body='[]')
+
+        async with create_http_client(
+            transport=mock_server.transport(latency=0.01)
+        ) as http_client:
+            client = AsyncMiaPlatformClient(http_client, {}, get_logger())
+            results = await client.bulk_post(URL, ({'n': n} for n in range(50)), batch_size=10)
+
+        assert len(results) == 50
+        assert all(result.succeeded for result in results)
+        assert mock_server.routes[0].calls == 5
@@ -0,0 +1,129 @@
+import time
+import asyncio
+import httpretty
+import pytest
+from fastapi import status
+
+from src.lib.async_mia_platform_client import create_http_client
+from src.lib.checkup import CheckUpRegistry, http_check, tcp_check
+
+
+class DummyApp:
+    """
+    Stands in for the FastAPI application passed to the checks
+    """
+
+    class State:
+        """
+        The application state
+        """
+
+        http_client = None
+
+    state = State()
+
+
+@pytest.mark.anyio
+class TestCheckUpRegistry:
+    """
+    Test the check-up registry
+    """
+
+    async def test_checks_run_concurrently(self):
+        """
+        Checks run in parallel, the slowest one bounds the check-up duration
+        """
+
+        registry = CheckUpRegistry(ttl=0, timeout=1)
+
+        async def slow(_app):
+            await asyncio.sleep(0.1)
+
+        for name in ('first', 'second', 'third'):
+            registry.register(name, slow)
+
+        start = time.perf_counter()
+        status_ok, checks = await registry.run(DummyApp())
+
+        assert time.perf_counter() - start < 0.25
+        assert status_ok is True
+        assert set(checks) == {'first', 'second', 'third'}
+
+    async def test_check_timeout(self):
+        """
+        A check running longer than its timeout fails
+        """
+
+        registry = CheckUpRegistry(ttl=0, timeout=1)
+
+        async def hanging(_app):
+            await asyncio.sleep(10)
+
+        registry.register('hanging', hanging, timeout=0.05)
+
+        status_ok, checks = await registry.run(DummyApp())
+
+        assert status_ok is False
+        assert checks['hanging']['error'] == 'Timed out after 0.05s'
+
+    async def test_result_is_cached(self):
+        """
+        The aggregated result is reused until the TTL expires
+        """
+
+        registry = CheckUpRegistry(ttl=60, timeout=1)
+        calls = []
+
+        async def counted(_app):
+            calls.append(1)
+
+        registry.register('counted', counted)
+
+        await asyncio.gather(*(registry.run(DummyApp()) for _ in range(10)))
+        await registry.run(DummyApp())
+
+        assert len(calls) == 1
+
+        registry.invalidate()
+        await registry.run(DummyApp())
+
+        assert len(calls) == 2
+
+    async def test_http_check(self, mock_server):
+        """
+        The HTTP check fails on non-2xx responses
+        """
+
+        url = 'http://www.dummy-url.com/-/healthz'
+        mock_server.register_uri(
+            method=httpretty.GET,
+            uri=url,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+        registry = CheckUpRegistry(ttl=0, timeout=1)
+        registry.register('crud', http_check(url))
+
+        app = DummyApp()
+        async with create_http_client(transport=mock_server.transport()) as http_client:
+            app.state.http_client = http_client
+            status_ok, checks = await registry.run(app)
+
+        assert status_ok is False
+        assert '500' in checks['crud']['error']
+
+    async def test_tcp_check(self):
+        """
+        The TCP check succeeds when the connection is accepted
+        """
+
+        server = await asyncio.start_server(lambda reader, writer: writer.close(), '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+
+        registry = CheckUpRegistry(ttl=0, timeout=1)
+        registry.register('tcp', tcp_check('127.0.0.1', port))
+
+        async with server:
+            status_ok, _ = await registry.run(DummyApp())
+
+        assert status_ok is True
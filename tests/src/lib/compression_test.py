@@ -0,0 +1,44 @@
+import gzip
+
+from src.lib.compression import Compressor, is_compressible, negotiate
+
+
+def test_negotiate():
+    encodings = ('br', 'gzip')
+
+    assert negotiate('gzip, deflate, br', encodings) == 'br'
+    assert negotiate('gzip;q=1.0, br;q=0.5', encodings) == 'gzip'
+    assert negotiate('br;q=0, *', encodings) == 'gzip'
+    assert negotiate('identity', encodings) is None
+    assert negotiate('gzip;q=0', ('gzip',)) is None
+
+
+def test_is_compressible():
+    assert is_compressible(b'application/json')
+    assert is_compressible(b'text/html; charset=utf-8')
+    assert is_compressible(b'application/problem+json')
+    assert not is_compressible(b'image/png')
+    assert not is_compressible(b'application/octet-stream')
+
+
+def test_stream_chunks_decode_as_they_arrive():
+    stream = Compressor().stream('gzip')
+    chunks = [b'{"n": %d}\n' % n * 100 for n in range(3)]
+
+    compressed = [stream.compress(chunk) for chunk in chunks]
+    compressed.append(stream.compress(b'', last=True))
+
+    assert gzip.decompress(b''.join(compressed)) == b''.join(chunks)
+
+
+def test_constant_bodies_are_compressed_once():
+    compressor = Compressor(minimum_size=100, gzip_level=9)
+    small, large = b'{"message": "hi"}', b'{"message": "%s"}' % (b'hi' * 100)
+
+    compressor.precompress(small)
+    compressor.precompress(large)
+
+    assert not compressor.variants(small)
+    assert gzip.decompress(compressor.variants(large)['gzip']) == large
+    # Only the registered bodies have variants
+    assert not compressor.variants(large[:-1] + b' ')
@@ -0,0 +1,74 @@
+from email.utils import formatdate
+from fastapi import Depends, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.lib.http_cache import CachePolicy, etag_matches, is_not_modified, strong_etag
+
+
+BODY = b'{"message":"cached"}'
+
+
+def test_etag_matches():
+    etag = strong_etag(BODY)
+
+    assert etag.startswith('"') and etag.endswith('"')
+    assert etag_matches(etag, etag)
+    assert etag_matches(f'"other", W/{etag}', etag)
+    assert etag_matches('*', etag)
+    assert not etag_matches('"other"', etag)
+
+
+def test_if_none_match_takes_precedence():
+    last_modified = 1_700_000_000
+    since = formatdate(last_modified, usegmt=True)
+
+    assert is_not_modified({'if-modified-since': since}, None, last_modified)
+    assert not is_not_modified({'if-modified-since': since}, None, last_modified + 1)
+    assert not is_not_modified({'if-modified-since': 'yesterday'}, None, last_modified)
+    assert not is_not_modified(
+        {'if-none-match': '"other"', 'if-modified-since': since},
+        '"current"',
+        last_modified
+    )
+
+
+def test_policy_answers_304_before_the_handler_runs():
+    policy = CachePolicy('public, max-age=60', body=BODY)
+    dynamic_policy = CachePolicy()
+    calls = []
+
+    app = FastAPI()
+
+    @app.get('/constant', dependencies=[Depends(policy)])
+    async def constant():
+        calls.append('constant')
+        return policy.response(BODY)
+
+    @app.get('/dynamic')
+    async def dynamic(request: Request):
+        return dynamic_policy.response(b'{"n":1}', request)
+
+    with TestClient(app) as client:
+        first = client.get('/constant')
+        revalidated = client.get('/constant', headers={'if-none-match': first.headers['etag']})
+        changed = client.get('/constant', headers={'if-none-match': '"stale"'})
+
+        dynamic_first = client.get('/dynamic')
+        dynamic_revalidated = client.get(
+            '/dynamic',
+            headers={'if-none-match': dynamic_first.headers['etag']}
+        )
+
+    assert first.status_code == 200
+    assert first.content == BODY
+    assert first.headers['etag'] == policy.etag
+    assert first.headers['cache-control'] == 'public, max-age=60'
+
+    assert revalidated.status_code == 304
+    assert revalidated.content == b''
+    assert revalidated.headers['etag'] == policy.etag
+    assert changed.status_code == 200
+    assert calls == ['constant', 'constant']
+
+    assert dynamic_first.headers['cache-control'] == 'no-cache'
+    assert dynamic_revalidated.status_code == 304
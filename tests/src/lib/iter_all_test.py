@@ -0,0 +1,141 @@
+import json
+import asyncio
+import weakref
+import httpretty
+import pytest
+
+from src.lib.async_mia_platform_client import (
+    AsyncMiaPlatformClient,
+    AsyncMiaPlatformResponse,
+    create_http_client
+)
+from src.utils.logger import get_logger
+
+
+URL = 'http://www.dummy-url.com/resources'
+
+
+class Collection:
+    """
+    A mock CRUD collection paginated with the _skip and _limit query parameters
+    """
+
+    def __init__(self, mock_server, size):
+        self.records = [{'_id': str(n)} for n in range(size)]
+        self.pages = []
+        mock_server.register_uri(method=httpretty.GET, uri=URL, body=self.page)
+        mock_server.register_uri(
+            method=httpretty.GET,
+            uri=f'{URL}/count',
+            body=json.dumps(size)
+        )
+
+    def page(self, request, _uri, headers):
+        skip = int(request.url.params['_skip'])
+        limit = int(request.url.params['_limit'])
+        self.pages.append(skip // limit)
+
+        return 200, headers, json.dumps(self.records[skip:skip + limit])
+
+
+@pytest.fixture(name='make_client')
+async def fixture_make_client(mock_server):
+    async with create_http_client(transport=mock_server.transport(latency=0.01)) as http_client:
+        yield lambda: AsyncMiaPlatformClient(http_client, {}, get_logger())
+
+
+@pytest.mark.anyio
+class TestIterAll:
+    """
+    Test the paginated iteration over a collection
+    """
+
+    @pytest.mark.parametrize('size', [0, 9, 10, 25])
+    async def test_yields_every_record(self, mock_server, make_client, size):
+        collection = Collection(mock_server, size)
+
+        records = [record async for record in make_client().iter_all(URL, page_size=10)]
+
+        assert records == collection.records
+
+    async def test_prefetches_the_next_page(self, mock_server, make_client):
+        collection = Collection(mock_server, 50)
+        iterator = make_client().iter_all(URL, page_size=10, prefetch=1)
+
+        await anext(iterator)
+        await anext(iterator)
+        # Time for the prefetched page, and only that one, to be served
+        await asyncio.sleep(0.05)
+
+        assert collection.pages == [0, 1]
+        await iterator.aclose()
+
+    async def test_holds_at_most_prefetch_plus_one_pages(
+        self,
+        mock_server,
+        make_client,
+        monkeypatch
+    ):
+        """
+        A consumed page is released before the next one is decoded
+        """
+
+        class Page(list):
+            """
+            A decoded page, unlike a list it can be weakly referenced
+            """
+
+        pages, live_pages = [], []
+
+        def decode(response):
+            live_pages.append(sum(page() is not None for page in pages))
+            page = Page(json.loads(response.content))
+            pages.append(weakref.ref(page))
+            return page
+
+        monkeypatch.setattr(AsyncMiaPlatformResponse, 'json', decode)
+        collection = Collection(mock_server, 50)
+
+        records = [
+            record async for record in make_client().iter_all(URL, page_size=10, prefetch=1)
+        ]
+
+        assert records == collection.records
+        assert live_pages == [0] * 6
+
+    async def test_fetches_page_by_page_without_prefetch(self, mock_server, make_client):
+        collection = Collection(mock_server, 25)
+
+        records = [
+            record async for record in make_client().iter_all(URL, page_size=10, prefetch=0)
+        ]
+
+        assert records == collection.records
+        assert collection.pages == [0, 1, 2]
+
+    async def test_stops_early(self, mock_server, make_client):
+        collection = Collection(mock_server, 100)
+
+        async for record in make_client().iter_all(URL, page_size=10, prefetch=2):
+            if record['_id'] == '15':
+                break
+
+        assert len(collection.pages) <= 4
+
+    async def test_count_plans_parallel_pages(self, mock_server, make_client):
+        collection = Collection(mock_server, 35)
+
+        records = [
+            record
+            async for record in make_client().iter_all(
+                URL,
+                page_size=10,
+                prefetch=3,
+                use_count=True,
+                params={'_q': '{}'}
+            )
+        ]
+
+        assert records == collection.records
+        assert sorted(collection.pages) == [0, 1, 2, 3]
+        assert mock_server.routes[0].calls == 1
@@ -0,0 +1,133 @@
+import os
+import sys
+import logging
+import threading
+
+from src.lib.metrics import MetricsRegistry, merge_snapshots, render
+
+
+def test_render_counter_and_gauge():
+    """
+    Counters and gauges are rendered in the Prometheus text format
+    """
+
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests', ('route',))
+    in_flight = registry.gauge('in_flight', 'In flight')
+
+    requests.inc(('/',))
+    requests.inc(('/',))
+    requests.inc(('/say "hi"',))
+    in_flight.inc()
+
+    assert render(registry.snapshot()) == (
+        '# HELP requests_total Requests\n'
+        '# TYPE requests_total counter\n'
+        'requests_total{route="/"} 2\n'
+        'requests_total{route="/say \\"hi\\""} 1\n'
+        '# HELP in_flight In flight\n'
+        '# TYPE in_flight gauge\n'
+        'in_flight 1\n'
+    )
+
+
+def test_render_histogram():
+    """
+    Histogram buckets are rendered as cumulative counts
+    """
+
+    registry = MetricsRegistry()
+    latency = registry.histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1))
+
+    for value in (0.05, 0.1, 0.5, 2):
+        latency.observe(('/',), value)
+
+    assert render(registry.snapshot()).splitlines()[2:] == [
+        'latency_seconds_bucket{route="/",le="0.1"} 2',
+        'latency_seconds_bucket{route="/",le="1.0"} 3',
+        'latency_seconds_bucket{route="/",le="+Inf"} 4',
+        'latency_seconds_sum{route="/"} 2.65',
+        'latency_seconds_count{route="/"} 4',
+    ]
+
+
+def test_merge_snapshots():
+    """
+    Samples of several workers are summed, gauges of dead workers are skipped
+    """
+
+    def worker_snapshot(requests, in_flight):
+        registry = MetricsRegistry()
+        registry.counter('requests_total', 'Requests').inc(amount=requests)
+        registry.gauge('in_flight', 'In flight').set(value=in_flight)
+        registry.histogram('latency_seconds', 'Latency', buckets=(1,)).observe(value=0.5)
+        return registry.snapshot()
+
+    merged = merge_snapshots([
+        (worker_snapshot(2, 3), True),
+        (worker_snapshot(5, 7), False),
+    ])
+
+    assert merged['requests_total']['samples'] == [[[], 7]]
+    assert merged['in_flight']['samples'] == [[[], 3]]
+    assert merged['latency_seconds']['samples'] == [[[], [2, 0, 1.0]]]
+
+
+def test_collect_multiprocess(tmp_path):
+    """
+    The scraped worker writes its snapshot and merges the ones of the other workers
+    """
+
+    other_worker = MetricsRegistry()
+    other_worker.counter('requests_total', 'Requests').inc(amount=4)
+    other_worker.write_snapshot(tmp_path)
+    os.replace(tmp_path / f'{os.getpid()}.json', tmp_path / '1.json')
+
+    registry = MetricsRegistry()
+    registry.counter('requests_total', 'Requests').inc()
+
+    snapshot = registry.collect(str(tmp_path))
+
+    assert snapshot['requests_total']['samples'] == [[[], 5]]
+    assert (tmp_path / f'{os.getpid()}.json').exists()
+
+
+def test_failed_snapshot_writes_are_logged(tmp_path, monkeypatch, caplog):
+    monkeypatch.setattr('src.lib.metrics.get_logger', lambda: logging.getLogger('metrics_test'))
+    registry = MetricsRegistry()
+    registry.counter('requests_total', 'Requests').inc()
+
+    with caplog.at_level(logging.ERROR, logger='metrics_test'):
+        snapshot = registry.collect(str(tmp_path / 'missing'))
+
+    assert snapshot['requests_total']['samples'] == [[[], 1]]
+    assert caplog.messages[0].startswith('Could not write the metrics snapshot')
+
+
+def test_concurrent_updates_are_not_lost():
+    """
+    The sync clients record the metrics from several threads at once
+    """
+
+    registry = MetricsRegistry()
+    requests = registry.counter('requests_total', 'Requests')
+    latency = registry.histogram('latency_seconds', 'Latency', buckets=(1,))
+
+    def record():
+        for _ in range(20000):
+            requests.inc()
+            latency.observe(value=0.5)
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=record) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    finally:
+        sys.setswitchinterval(interval)
+
+    assert requests.samples[()] == 160000
+    assert latency.samples[()][:2] == [160000, 0]
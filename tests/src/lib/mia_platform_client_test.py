@@ -1,10 +1,12 @@
 import json
+import logging
 import pytest
 import httpretty
 from fastapi import status
 
 from src.schemas.header_schema import HeaderSchema
-from src.lib.mia_platform_client import MiaPlatformClient
+from src.lib.mia_platform_client import MiaPlatformAuth, MiaPlatformClient, MiaPlatformResponse
+from src.lib.metrics import UPSTREAM_REQUESTS, UPSTREAM_REQUEST_DURATION
 from src.utils.logger import get_logger
 
 
@@ -33,6 +35,163 @@ class TestMiaPlatformClient:
     Test all functionalities of Mia Platform Client
     """
 
+    # Session
+
+    def test_session_is_shared(self, headers):
+        """
+        Every client reuses the process-wide session and its connection pool
+        """
+
+        logger = get_logger()
+
+        first = MiaPlatformClient(headers, logger)
+        second = MiaPlatformClient(headers, logger)
+
+        assert first.session is second.session
+
+    def test_upstream_cookies_are_not_shared(self, headers, baseurl, mock_server):
+        """
+        A cookie set by the upstream for a user is not sent on the calls of another
+        """
+
+        url = f'{baseurl}/resources'
+        cookies = []
+
+        def set_cookie(request, _uri, response_headers):
+            cookies.append(request.headers.get('cookie'))
+            return 200, {**response_headers, 'set-cookie': 'session=alice-secret; Path=/'}, '[]'
+
+        mock_server.register_uri(method=httpretty.GET, uri=url, body=set_cookie)
+        logger = get_logger()
+
+        MiaPlatformClient({**headers, 'miauserid': 'alice'}, logger).get(url)
+        MiaPlatformClient({**headers, 'miauserid': 'bob'}, logger).get(url)
+
+        assert cookies == [None, None]
+
+    def test_json_is_decoded_with_orjson(
+        self,
+        baseurl,
+        mock_server,
+        mia_platform_client
+    ):
+        """
+        Responses decode their JSON body with orjson, falling back to the stdlib
+        for non UTF-8 bodies and decoding options
+        """
+
+        url = f'{baseurl}/resources'
+        mock_server.register_uri(
+            method=httpretty.GET,
+            uri=url,
+            body='[{"value": 1.5, "name": "caf\u00e9"}]'
+        )
+
+        response = mia_platform_client.get(url)
+
+        assert isinstance(response, MiaPlatformResponse)
+        assert response.json() == [{'value': 1.5, 'name': 'café'}]
+        assert response.json(parse_float=str) == [{'value': '1.5', 'name': 'café'}]
+
+    def test_headers_are_extracted_lazily(
+        self,
+        baseurl,
+        mock_server,
+        mia_platform_client
+    ):
+        """
+        Proxied headers are only extracted when the first request is made
+        """
+
+        url = f'{baseurl}/resources'
+
+        mock_server.register_uri(
+            method=httpretty.GET,
+            uri=url,
+            status=status.HTTP_200_OK
+        )
+
+        assert 'auth' not in vars(mia_platform_client)
+
+        mia_platform_client.get(url)
+
+        assert 'auth' in vars(mia_platform_client)
+
+    # Metrics
+
+    def test_upstream_metrics(
+        self,
+        baseurl,
+        mock_server,
+        mia_platform_client
+    ):
+        """
+        Upstream calls are counted by operation and status, and their latency is observed
+        """
+
+        url = f'{baseurl}/resources/1'
+        labels = ('MiaPlatformClient', 'GET BY ID', str(status.HTTP_404_NOT_FOUND))
+        requests_before = UPSTREAM_REQUESTS.samples.get(labels, 0)
+
+        mock_server.register_uri(
+            method=httpretty.GET,
+            uri=url,
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+        with pytest.raises(Exception):
+            mia_platform_client.get_by_id(f'{baseurl}/resources', 1)
+
+        assert UPSTREAM_REQUESTS.samples[labels] == requests_before + 1
+        assert ('MiaPlatformClient', 'GET BY ID') in UPSTREAM_REQUEST_DURATION.samples
+
+    # Proxied headers
+
+    def test_proxied_headers_from_asgi_header_list(self):
+        """
+        Only the allowed headers are extracted from an ASGI header list
+        """
+
+        headers = [
+            (b'miauserid', b'user'),
+            (b'x-not-proxied', b'value'),
+            (b'x-request-id', b'request'),
+        ]
+
+        auth = MiaPlatformAuth(headers, get_logger())
+
+        assert auth.headers_to_proxy == {
+            'miauserid': 'user',
+            'x-request-id': 'request',
+        }
+
+    def test_proxied_headers_are_case_insensitive(self):
+        """
+        Headers are matched ignoring the case of their name
+        """
+
+        auth = MiaPlatformAuth({'MiaUserId': 'user'}, get_logger())
+
+        assert auth.headers_to_proxy == {'miauserid': 'user'}
+
+    def test_missing_headers_are_logged_on_debug_only(self, caplog):
+        """
+        Missing headers are reported only when the debug level is enabled
+        """
+
+        logger = logging.getLogger('mia_platform_auth_test')
+
+        with caplog.at_level(logging.INFO, logger='mia_platform_auth_test'):
+            MiaPlatformAuth({}, logger)
+        assert not caplog.records
+
+        with caplog.at_level(logging.DEBUG, logger='mia_platform_auth_test'):
+            MiaPlatformAuth({'miauserid': 'user'}, logger)
+        assert 'The parameter "miausergroups" is missing from the request headers' \
+            in caplog.messages
+        assert 'The parameter "miauserid" is missing from the request headers' \
+            not in caplog.messages
+
     # Headers
 
     def test_200_get_with_extra_headers(
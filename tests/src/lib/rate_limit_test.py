@@ -0,0 +1,167 @@
+import pytest
+
+from src.lib.rate_limit import (
+    MemoryRateLimitStore,
+    Rate,
+    RateLimitStore,
+    RateLimiter,
+    parse_rate,
+    parse_rate_limits,
+    retry_after_header
+)
+
+
+class FakeClock:
+    """
+    A monotonic clock moved forward by the tests
+    """
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_parse_rates():
+    rate = parse_rate('120/minute')
+    assert (rate.limit, rate.period, rate.burst, rate.emission_interval) == (120, 60, 120, 0.5)
+
+    assert parse_rate_limits(' MiaUserId=10/second, miaclienttype=1000/hour,').keys() \
+        == {'miauserid', 'miaclienttype'}
+
+    for invalid in ('10', '10/week', 'ten/second'):
+        with pytest.raises(ValueError):
+            parse_rate(invalid)
+
+
+def test_stores_implement_allow():
+    class NoStore(RateLimitStore):
+        """
+        A store missing its allow method
+        """
+
+    with pytest.raises(TypeError):
+        NoStore()  # pylint: disable=E0110
+
+
+def test_gcra_bursts_then_paces():
+    """
+    A key spends its burst at once, then gets a request every emission interval
+    """
+
+    clock = FakeClock()
+    store = MemoryRateLimitStore(clock=clock)
+    rate = Rate(3, 1)
+
+    decisions = [store.decide('user', rate) for _ in range(4)]
+
+    assert [decision.allowed for decision in decisions] == [True, True, True, False]
+    assert [decision.remaining for decision in decisions[:3]] == [2, 1, 0]
+    assert decisions[3].retry_after == pytest.approx(1 / 3)
+    assert retry_after_header(decisions[3]) == '1'
+
+    clock.now += 1 / 3
+    assert store.decide('user', rate).allowed
+    assert not store.decide('user', rate).allowed
+    # Other keys have their own bucket
+    assert store.decide('other', rate).allowed
+
+
+def test_idle_keys_are_evicted():
+    """
+    Keys idle for a whole generation, the longest burst window, are dropped
+    """
+
+    clock = FakeClock()
+    store = MemoryRateLimitStore(clock=clock)
+    rate = Rate(10, 1)
+
+    for user in range(5):
+        store.decide(f'user:{user}', rate)
+    clock.now += 0.9
+    for _ in range(5):
+        store.decide('user:0', rate)
+    assert len(store) == 5
+
+    # The state of a key used again moves to the new generation
+    clock.now += 0.1
+    assert store.decide('user:0', rate).remaining == 5
+    assert (list(store.arrivals), len(store.previous)) == (['user:0'], 4)
+
+    clock.now += 1
+    store.decide('user:new', rate)
+    assert (list(store.arrivals), list(store.previous)) == (['user:new'], ['user:0'])
+
+
+def test_keys_are_bounded():
+    store = MemoryRateLimitStore(max_keys=3, clock=FakeClock())
+
+    for user in range(5):
+        store.decide(f'user:{user}', Rate(10, 1))
+
+    assert len(store) <= 3
+    assert 'user:4' in store.arrivals
+
+
+@pytest.mark.anyio
+async def test_rate_limiter_checks_every_header():
+    store = MemoryRateLimitStore(clock=FakeClock())
+    limiter = RateLimiter(store, {'miauserid': Rate(2, 1), 'miaclienttype': Rate(3, 1)})
+
+    def headers(user):
+        return [(b'miauserid', user), (b'miaclienttype', b'backoffice'), (b'other', b'value')]
+
+    assert await limiter.check(headers(b'alice')) is None
+    assert await limiter.check(headers(b'alice')) is None
+
+    header, decision = await limiter.check(headers(b'alice'))
+    assert header == 'miauserid'
+    assert not decision.allowed
+
+    # Another user has a bucket of its own, the client type bucket is shared
+    assert await limiter.check(headers(b'bob')) is None
+    header, _ = await limiter.check(headers(b'bob'))
+    assert header == 'miaclienttype'
+
+    # Requests without the rate-limited headers are not limited
+    assert await limiter.check([(b'other', b'value')]) is None
+
+
+@pytest.mark.anyio
+async def test_rejected_requests_charge_no_bucket():
+    """
+    A request over the client type rate does not spend the rate of its user
+    """
+
+    store = MemoryRateLimitStore(clock=FakeClock())
+    limiter = RateLimiter(store, {'miauserid': Rate(2, 1), 'miaclienttype': Rate(1, 1)})
+
+    def headers(client_type):
+        return [(b'miauserid', b'alice'), (b'miaclienttype', client_type)]
+
+    assert await limiter.check(headers(b'backoffice')) is None
+    for _ in range(5):
+        header, _ = await limiter.check(headers(b'backoffice'))
+        assert header == 'miaclienttype'
+
+    assert await limiter.check(headers(b'mobile')) is None
+    header, _ = await limiter.check(headers(b'frontoffice'))
+    assert header == 'miauserid'
+
+
+def test_recent_keys_keep_their_state_at_the_cap():
+    """
+    A burst of new keys only forgets the keys idle for more than half the cap of
+    new keys, a noisy user sending all along stays limited
+    """
+
+    store = MemoryRateLimitStore(max_keys=6, clock=FakeClock())
+    rate = Rate(1, 60)
+
+    assert store.decide('user:noisy', rate).allowed
+    for burst in range(20):
+        for index in range(2):
+            assert store.decide(f'user:{burst}:{index}', rate).allowed
+        assert not store.decide('user:noisy', rate).allowed
+        assert 3 <= len(store) <= 6
@@ -0,0 +1,332 @@
+import asyncio
+import httpretty
+import httpx
+import pytest
+import requests
+from fastapi import status
+
+from src.lib.async_mia_platform_client import AsyncMiaPlatformClient, create_http_client
+from src.lib.exceptions import (
+    CircuitOpenError,
+    MiaPlatformConnectionError,
+    MiaPlatformHTTPError
+)
+from src.lib.mia_platform_client import MiaPlatformClient
+from src.lib.resilience import CircuitBreaker, ClientPolicy, circuit_breakers
+from src.utils.logger import get_logger
+
+
+BASEURL = 'http://www.dummy-url.com'
+
+
+@pytest.fixture(name='policy')
+def fixture_policy():
+    yield ClientPolicy(retries=2, backoff_factor=0)
+
+
+@pytest.fixture(name='mia_platform_client')
+def fixture_mia_platform_client(policy):
+    yield MiaPlatformClient({}, get_logger(), policy=policy)
+
+
+@pytest.fixture(name='async_mia_platform_client')
+async def fixture_async_mia_platform_client(policy, mock_server):
+    async with create_http_client(transport=mock_server.transport()) as http_client:
+        yield AsyncMiaPlatformClient(http_client, {}, get_logger(), policy=policy)
+
+
+def register_flaky_uri(mock_server, method, url, failures):
+    mock_server.register_uri(
+        method=method,
+        uri=url,
+        responses=[
+            *[httpretty.Response(body='', status=status.HTTP_503_SERVICE_UNAVAILABLE)] * failures,
+            httpretty.Response(body='{}', status=status.HTTP_200_OK),
+        ]
+    )
+
+
+class TestClientPolicy:
+    """
+    Test the retry policy of the Mia Platform clients
+    """
+
+    def test_only_idempotent_verbs_are_retried(self):
+        policy = ClientPolicy(retries=2)
+
+        assert policy.can_retry('GET', 0)
+        assert policy.can_retry('PUT', 1)
+        assert policy.can_retry('DELETE', 1)
+        assert not policy.can_retry('GET', 2)
+        assert not policy.can_retry('POST', 0)
+        assert not policy.can_retry('PATCH', 0)
+
+    def test_backoff_is_bounded(self):
+        policy = ClientPolicy(backoff_factor=1, max_backoff=3)
+
+        for attempt in range(10):
+            assert 0 <= policy.backoff(attempt) <= min(3, 2 ** attempt)
+
+    def test_defaults_come_from_settings(self):
+        policy = ClientPolicy(retries=0)
+
+        assert policy.retries == 0
+        assert policy.connect_timeout > 0
+        assert policy.read_timeout > 0
+
+
+class TestCircuitBreaker:
+    """
+    Test the circuit breaker state machine
+    """
+
+    def test_opens_after_threshold(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+
+        breaker.record_failure()
+        assert breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow_request()
+
+    def test_success_resets_failures(self):
+        breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=60)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_lets_one_trial_through(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+
+        breaker.record_failure()
+
+        assert breaker.allow_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert not breaker.allow_request()
+
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        assert breaker.allow_request()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_aborted_trial_lets_the_next_request_try(self):
+        breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=0)
+        breaker.record_failure()
+        breaker.record_abort()
+        assert breaker.state == CircuitBreaker.OPEN
+
+        assert breaker.allow_request()
+        breaker.record_abort()
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    def test_one_breaker_per_host(self):
+        first = circuit_breakers.get(f'{BASEURL}/resources')
+        second = circuit_breakers.get(f'{BASEURL}/other/1')
+        other = circuit_breakers.get('http://other-host:3000/resources')
+
+        assert first is second
+        assert first is not other
+
+
+class TestMiaPlatformClientResilience:
+    """
+    Test retries, circuit breaking and typed errors of the Mia Platform Client
+    """
+
+    def test_idempotent_read_is_retried(self, mock_server, mia_platform_client):
+        url = f'{BASEURL}/resources'
+        register_flaky_uri(mock_server, httpretty.GET, url, failures=2)
+
+        response = mia_platform_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert len(httpretty.latest_requests()) == 3
+
+    def test_retries_are_bounded(self, mock_server, mia_platform_client):
+        url = f'{BASEURL}/resources'
+        register_flaky_uri(mock_server, httpretty.GET, url, failures=3)
+
+        with pytest.raises(MiaPlatformHTTPError) as error:
+            mia_platform_client.get(url)
+
+        assert error.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert error.value.url == url
+        assert len(httpretty.latest_requests()) == 3
+
+    def test_post_is_not_retried(self, mock_server, mia_platform_client):
+        url = f'{BASEURL}/resources'
+        calls = []
+
+        def reply(_request, uri, headers):
+            calls.append(uri)
+            return status.HTTP_503_SERVICE_UNAVAILABLE, headers, ''
+
+        mock_server.register_uri(method=httpretty.POST, uri=url, body=reply)
+
+        with pytest.raises(MiaPlatformHTTPError):
+            mia_platform_client.post(url, data={'key': 'value'})
+
+        assert calls == [url]
+
+    def test_client_errors_are_not_retried(self, mock_server, mia_platform_client):
+        url = f'{BASEURL}/resources/1'
+        mock_server.register_uri(method=httpretty.GET, uri=url, status=status.HTTP_404_NOT_FOUND)
+
+        with pytest.raises(MiaPlatformHTTPError) as error:
+            mia_platform_client.get_by_id(f'{BASEURL}/resources', 1)
+
+        assert error.value.status_code == status.HTTP_404_NOT_FOUND
+        assert error.value.response.status_code == status.HTTP_404_NOT_FOUND
+        assert len(httpretty.latest_requests()) == 1
+
+    def test_per_call_policy(self, mock_server, mia_platform_client):
+        url = f'{BASEURL}/resources'
+        register_flaky_uri(mock_server, httpretty.GET, url, failures=1)
+
+        with pytest.raises(MiaPlatformHTTPError):
+            mia_platform_client.get(url, policy=ClientPolicy(retries=0))
+
+        assert len(httpretty.latest_requests()) == 1
+
+    def test_circuit_opens_and_fails_fast(self, mock_server, mia_platform_client):
+        url = f'{BASEURL}/resources'
+        threshold = circuit_breakers.get(url).failure_threshold
+        mock_server.register_uri(
+            method=httpretty.POST,
+            uri=url,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+        for _ in range(threshold):
+            with pytest.raises(MiaPlatformHTTPError):
+                mia_platform_client.post(url)
+
+        with pytest.raises(CircuitOpenError) as error:
+            mia_platform_client.post(url)
+
+        assert error.value.url == url
+        assert error.value.status_code is None
+        assert len(httpretty.latest_requests()) == threshold
+
+    def test_connection_error(self, mia_platform_client):
+        url = 'http://localhost:1/resources'
+        session = requests.Session()
+        session.mount('http://', requests.adapters.HTTPAdapter(max_retries=0))
+        client = MiaPlatformClient({}, get_logger(), session=session, policy=ClientPolicy(
+            retries=1,
+            backoff_factor=0,
+            connect_timeout=0.5
+        ))
+
+        assert mia_platform_client.policy.retries == 2
+        with pytest.raises(MiaPlatformConnectionError) as error:
+            client.get(url)
+
+        assert error.value.url == url
+        assert circuit_breakers.get(url).failures == 2
+
+
+@pytest.mark.anyio
+class TestAsyncMiaPlatformClientResilience:
+    """
+    Test retries, circuit breaking and typed errors of the async Mia Platform Client
+    """
+
+    async def test_idempotent_read_is_retried(self, mock_server, async_mia_platform_client):
+        url = f'{BASEURL}/resources'
+        register_flaky_uri(mock_server, httpretty.GET, url, failures=2)
+
+        response = await async_mia_platform_client.get(url)
+
+        assert response.status_code == status.HTTP_200_OK
+        assert mock_server.routes[0].calls == 3
+
+    async def test_post_is_not_retried(self, mock_server, async_mia_platform_client):
+        url = f'{BASEURL}/resources'
+        register_flaky_uri(mock_server, httpretty.POST, url, failures=1)
+
+        with pytest.raises(MiaPlatformHTTPError) as error:
+            await async_mia_platform_client.post(url, data={'key': 'value'})
+
+        assert error.value.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+        assert mock_server.routes[0].calls == 1
+
+    async def test_connection_error_is_retried(self, async_mia_platform_client):
+        url = f'{BASEURL}/unregistered'
+
+        with pytest.raises(MiaPlatformConnectionError) as error:
+            await async_mia_platform_client.get(url)
+
+        assert error.value.url == url
+        assert circuit_breakers.get(url).failures == 3
+
+    async def test_circuit_opens_and_fails_fast(self, mock_server, async_mia_platform_client):
+        url = f'{BASEURL}/resources'
+        threshold = circuit_breakers.get(url).failure_threshold
+        mock_server.register_uri(
+            method=httpretty.POST,
+            uri=url,
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
+        for _ in range(threshold):
+            with pytest.raises(MiaPlatformHTTPError):
+                await async_mia_platform_client.post(url)
+
+        with pytest.raises(CircuitOpenError):
+            await async_mia_platform_client.post(url)
+
+        assert mock_server.routes[0].calls == threshold
+
+    async def test_cancelled_trial_does_not_keep_the_circuit_half_open(self, policy):
+        """
+        A half-open trial cancelled before its response, e.g. by a client disconnect,
+        does not leave the circuit rejecting every later request
+        """
+
+        url = f'{BASEURL}/resources'
+        sent = asyncio.Event()
+
+        async def hang(_request):
+            sent.set()
+            await asyncio.Event().wait()
+
+        breaker = circuit_breakers.get(url)
+        breaker.recovery_timeout = 0
+        for _ in range(breaker.failure_threshold):
+            breaker.record_failure()
+
+        async with create_http_client(transport=httpx.MockTransport(hang)) as http_client:
+            client = AsyncMiaPlatformClient(http_client, {}, get_logger(), policy=policy)
+            trial = asyncio.ensure_future(client.get(url))
+            await sent.wait()
+            trial.cancel()
+
+            with pytest.raises(asyncio.CancelledError):
+                await trial
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.allow_request()
+
+    async def test_unexpected_errors_are_failures(self, policy):
+        url = f'{BASEURL}/resources'
+
+        def undecodable(request):
+            raise httpx.DecodingError('invalid gzip', request=request)
+
+        async with create_http_client(transport=httpx.MockTransport(undecodable)) as http_client:
+            client = AsyncMiaPlatformClient(http_client, {}, get_logger(), policy=policy)
+
+            with pytest.raises(httpx.DecodingError):
+                await client.get(url)
+
+        assert circuit_breakers.get(url).failures == 1
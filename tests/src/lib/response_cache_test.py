@@ -0,0 +1,208 @@
+import json
+import httpretty
+import pytest
+from fastapi import status
+
+from src.lib.async_mia_platform_client import (
+    AsyncMiaPlatformClient,
+    AsyncMiaPlatformResponse,
+    create_http_client
+)
+from src.lib.mia_platform_client import MiaPlatformClient
+from src.lib.response_cache import ResponseCache, parse_cache_control
+from src.utils.logger import get_logger
+
+
+BASEURL = 'http://www.dummy-url.com'
+
+
+class Upstream:
+    """
+    A mock upstream collection counting the requests it serves
+    """
+
+    def __init__(self, mock_server, path='resources', **response_headers):
+        self.url = f'{BASEURL}/{path}'
+        self.calls = []
+        self.response_headers = {
+            key.replace('_', '-'): value for key, value in response_headers.items()
+        }
+        self.etag = None
+
+        methods = (httpretty.GET, httpretty.POST, httpretty.PUT, httpretty.PATCH, httpretty.DELETE)
+        for method in methods:
+            for uri in (self.url, f'{self.url}/count', f'{self.url}/1', f'{self.url}/2',
+                        f'{self.url}/3'):
+                mock_server.register_uri(method=method, uri=uri, body=self.reply)
+
+    def reply(self, request, uri, headers):
+        self.calls.append((request.method, uri))
+        headers = {**headers, **self.response_headers}
+
+        if self.etag:
+            headers['etag'] = self.etag
+            if request.headers.get('if-none-match') == self.etag:
+                return status.HTTP_304_NOT_MODIFIED, headers, ''
+
+        return status.HTTP_200_OK, headers, json.dumps({'calls': len(self.calls)})
+
+
+@pytest.fixture(name='cache')
+def fixture_cache():
+    yield ResponseCache(max_entries=2, ttl=60)
+
+
+def make_client(cache, headers=None):
+    return MiaPlatformClient(headers or {'miauserid': 'alice'}, get_logger(), cache=cache)
+
+
+class TestResponseCache:
+    """
+    Test the response cache of the Mia Platform clients
+    """
+
+    def test_parse_cache_control(self):
+        assert parse_cache_control('Max-Age=10, no-cache, private') == {
+            'max-age': '10',
+            'no-cache': True,
+            'private': True
+        }
+        assert not parse_cache_control(None)
+
+    def test_not_cached_by_default(self, mock_server):
+        upstream = Upstream(mock_server)
+        client = MiaPlatformClient({}, get_logger())
+
+        client.get(upstream.url)
+        client.get(upstream.url)
+
+        assert len(upstream.calls) == 2
+
+    def test_reads_are_cached(self, mock_server, cache):
+        upstream = Upstream(mock_server)
+        client = make_client(cache)
+
+        first = client.get(upstream.url)
+        second = client.get(upstream.url)
+        client.get_by_id(upstream.url, 1)
+        client.get_by_id(upstream.url, 1)
+
+        assert second.json() == first.json()
+        assert upstream.calls == [('GET', upstream.url), ('GET', f'{upstream.url}/1')]
+
+    def test_key_includes_params_and_identity(self, mock_server, cache):
+        upstream = Upstream(mock_server)
+
+        make_client(cache).get(upstream.url, params={'_l': 1})
+        make_client(cache).get(upstream.url, params={'_l': 2})
+        make_client(cache, {'miauserid': 'bob'}).get(upstream.url, params={'_l': 1})
+
+        assert len(upstream.calls) == 3
+
+    def test_lru_eviction(self, mock_server, cache):
+        upstream = Upstream(mock_server)
+        client = make_client(cache)
+
+        client.get_by_id(upstream.url, 1)
+        client.get_by_id(upstream.url, 2)
+        client.get_by_id(upstream.url, 1)
+        client.get_by_id(upstream.url, 3)
+        client.get_by_id(upstream.url, 1)
+        client.get_by_id(upstream.url, 2)
+
+        assert len(cache) == 2
+        assert [uri for _, uri in upstream.calls] == [
+            f'{upstream.url}/1',
+            f'{upstream.url}/2',
+            f'{upstream.url}/3',
+            f'{upstream.url}/2',
+        ]
+
+    @pytest.mark.parametrize('cache_control, calls', [
+        ('no-store', 2),
+        ('max-age=0', 2),
+        ('max-age=60', 1),
+    ])
+    def test_cache_control(self, mock_server, cache, cache_control, calls):
+        upstream = Upstream(mock_server, cache_control=cache_control)
+        client = make_client(cache)
+
+        client.count(upstream.url)
+        client.count(upstream.url)
+
+        assert len(upstream.calls) == calls
+
+    def test_conditional_revalidation(self, mock_server, cache):
+        upstream = Upstream(mock_server, cache_control='no-cache')
+        upstream.etag = '"v1"'
+        client = make_client(cache)
+
+        first = client.get(upstream.url)
+        second = client.get(upstream.url)
+
+        assert len(upstream.calls) == 2
+        assert httpretty.last_request().headers['if-none-match'] == '"v1"'
+        assert second.status_code == status.HTTP_200_OK
+        assert second.json() == first.json()
+
+    @pytest.mark.parametrize('write', [
+        lambda client, url: client.post(url, data={'key': 'value'}),
+        lambda client, url: client.patch(url, 1, data={'key': 'value'}),
+        lambda client, url: client.delete_by_id(url, 1),
+    ])
+    def test_writes_invalidate_the_resource(self, mock_server, cache, write):
+        upstream = Upstream(mock_server)
+        other = Upstream(mock_server, 'others')
+        client = make_client(cache)
+
+        client.get(upstream.url)
+        client.get_by_id(other.url, 1)
+        write(client, upstream.url)
+        client.get(upstream.url)
+        client.get_by_id(other.url, 1)
+
+        assert [method for method, _ in upstream.calls].count('GET') == 2
+        assert len(other.calls) == 1
+
+    @pytest.mark.anyio
+    async def test_async_reads_are_cached(self, mock_server, cache):
+        upstream = Upstream(mock_server)
+
+        async with create_http_client(transport=mock_server.transport()) as http_client:
+            client = AsyncMiaPlatformClient(
+                http_client,
+                {'miauserid': 'alice'},
+                get_logger(),
+                cache=cache
+            )
+
+            await client.get(upstream.url)
+            await client.get(upstream.url)
+            await client.put(upstream.url, data={'key': 'value'})
+
+            assert len(cache) == 0
+
+    @pytest.mark.anyio
+    async def test_sync_and_async_reads_are_cached_apart(self, mock_server, cache):
+        """
+        The clients share the cache, each reads the responses of its own class
+        """
+
+        upstream = Upstream(mock_server)
+
+        async with create_http_client(transport=mock_server.transport()) as http_client:
+            async_client = AsyncMiaPlatformClient(
+                http_client,
+                {'miauserid': 'alice'},
+                get_logger(),
+                cache=cache
+            )
+
+            await async_client.get(upstream.url)
+            response = make_client(cache).get(upstream.url)
+            async_response = await async_client.get(upstream.url)
+
+        assert response.ok
+        assert response.json() == {'calls': 2}
+        assert isinstance(async_response, AsyncMiaPlatformResponse)
+        assert async_response.json() == {'calls': 1}
@@ -0,0 +1,48 @@
+import pytest
+from pydantic import BaseModel, Field, ValidationError
+
+from src.lib.responses import EncodedJSONResponse, encode_constant, encode_model, model_response
+
+
+class AliasedSchema(BaseModel):
+    """
+    A schema with an aliased field
+    """
+
+    status_ok: bool = Field(alias='statusOk')
+
+
+def test_encode_model_uses_aliases():
+    assert encode_model(AliasedSchema(statusOk=True)) == b'{"statusOk":true}'
+
+
+def test_encode_constant_validates_the_body():
+    assert encode_constant(AliasedSchema, {'statusOk': 'true'}) == b'{"statusOk":true}'
+
+    with pytest.raises(ValidationError):
+        encode_constant(AliasedSchema, {'status': True})
+
+
+def test_model_response():
+    response = model_response(AliasedSchema(statusOk=False), status_code=503)
+
+    assert isinstance(response, EncodedJSONResponse)
+    assert response.status_code == 503
+    assert response.body == b'{"statusOk":false}'
+    assert response.headers['content-type'] == 'application/json'
+
+
+@pytest.mark.parametrize('path, schema', [
+    ('/', 'MessageResponseSchema'),
+    ('/-/healthz', 'StatusOkResponseSchema'),
+    ('/-/ready', 'StatusOkResponseSchema'),
+])
+def test_openapi_documents_the_response_model(test_client, path, schema):
+    """
+    Routes returning encoded responses still document their response_model
+    """
+
+    openapi = test_client.get('/documentation/json').json()
+    content = openapi['paths'][path]['get']['responses']['200']['content']
+
+    assert content['application/json']['schema'] == {'$ref': f'#/components/schemas/{schema}'}
@@ -0,0 +1,228 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import httpretty
+import httpx
+import pytest
+from fastapi import Request, status
+
+from src.lib.async_mia_platform_client import AsyncMiaPlatformClient, create_http_client
+from src.lib.metrics import COALESCED_READS
+from src.lib.single_flight import AsyncSingleFlight, SingleFlight
+from src.utils.logger import get_logger
+
+
+BASEURL = 'http://www.dummy-url.com'
+
+
+class TestSingleFlight:
+    """
+    Test the sharing of identical concurrent calls
+    """
+
+    def test_threads_share_one_call(self):
+        group = SingleFlight()
+        calls = []
+        started = threading.Event()
+
+        def function():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return 'result'
+
+        with ThreadPoolExecutor(max_workers=10) as executor:
+            leader = executor.submit(group.run, 'key', function)
+            started.wait()
+            followers = [executor.submit(group.run, 'key', function) for _ in range(9)]
+
+            assert leader.result() == ('result', False)
+            assert [follower.result() for follower in followers] == [('result', True)] * 9
+
+        assert len(calls) == 1
+        assert len(group) == 0
+
+    def test_threads_share_the_error(self):
+        group = SingleFlight()
+        started = threading.Event()
+
+        def function():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError('upstream failed')
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(group.run, 'key', function)
+            started.wait()
+            follower = executor.submit(group.run, 'key', function)
+
+            for future in (leader, follower):
+                with pytest.raises(ValueError, match='upstream failed'):
+                    future.result()
+
+        assert len(group) == 0
+
+    def test_waiters_get_the_interruption_of_the_call(self):
+        """
+        A call interrupted by a BaseException is not a result of None for the waiters
+        """
+
+        class Interrupted(BaseException):
+            """
+            An interruption such as KeyboardInterrupt or SystemExit
+            """
+
+        group = SingleFlight()
+        started = threading.Event()
+
+        def function():
+            started.set()
+            time.sleep(0.1)
+            raise Interrupted()
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            leader = executor.submit(group.run, 'key', function)
+            started.wait()
+            follower = executor.submit(group.run, 'key', function)
+
+            for future in (leader, follower):
+                with pytest.raises(Interrupted):
+                    future.result()
+
+        assert len(group) == 0
+
+    def test_forgotten_calls_are_not_shared(self):
+        """
+        The calls started after a write to the resource do not share the call
+        started before it
+        """
+
+        group = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+
+        def stale():
+            started.set()
+            release.wait()
+            return 'old'
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            leader = executor.submit(group.run, 'key', stale, 'resources')
+            started.wait()
+            group.forget('resources')
+
+            assert group.run('key', lambda: 'new', 'resources') == ('new', False)
+
+            release.set()
+            assert leader.result() == ('old', False)
+
+        assert len(group) == 0
+        assert not group.resources
+
+    @pytest.mark.anyio
+    async def test_tasks_share_one_call(self):
+        group = AsyncSingleFlight()
+        calls = []
+
+        async def coroutine(key):
+            calls.append(key)
+            await asyncio.sleep(0.05)
+            return key
+
+        results = await asyncio.gather(*[
+            group.run(key, lambda key=key: coroutine(key))
+            for key in ['a'] * 50 + ['b'] * 50
+        ])
+
+        assert sorted(calls) == ['a', 'b']
+        assert [result for result, _ in results] == ['a'] * 50 + ['b'] * 50
+        assert sum(shared for _, shared in results) == 98
+        assert len(group) == 0
+
+    @pytest.mark.anyio
+    async def test_cancelled_caller_does_not_cancel_the_call(self):
+        group = AsyncSingleFlight()
+
+        async def coroutine():
+            await asyncio.sleep(0.05)
+            return 'result'
+
+        leader = asyncio.ensure_future(group.run('key', coroutine))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(group.run('key', coroutine))
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        assert await follower == ('result', True)
+
+    @pytest.mark.anyio
+    async def test_reads_after_a_write_are_not_coalesced_with_older_ones(self):
+        """
+        A read issued once a write completed does not join a read started before it
+        """
+
+        state = {'value': 'old'}
+
+        async def upstream(request):
+            if request.method == 'GET':
+                value = state['value']
+                await asyncio.sleep(0.1)
+                return httpx.Response(200, json={'value': value})
+
+            state['value'] = 'new'
+            return httpx.Response(200, json={})
+
+        url = f'{BASEURL}/resources'
+        async with create_http_client(transport=httpx.MockTransport(upstream)) as http_client:
+            client = AsyncMiaPlatformClient(
+                http_client,
+                {},
+                get_logger(),
+                single_flight=AsyncSingleFlight()
+            )
+
+            stale = asyncio.ensure_future(client.get(url))
+            await asyncio.sleep(0.01)
+            await client.post(url, data={})
+            fresh = await client.get(url)
+
+            assert (await stale).json() == {'value': 'old'}
+            assert fresh.json() == {'value': 'new'}
+            assert len(client.single_flight) == 0
+
+
+def test_concurrent_requests_are_coalesced(test_client, mock_server):
+    """
+    Hundreds of identical concurrent reads share a handful of upstream calls
+    """
+
+    url = f'{BASEURL}/resources'
+    mock_server.register_uri(method=httpretty.GET, uri=f'{url}/1', body='{"_id": "1"}')
+
+    app = test_client.app
+    original_http_client = app.state.http_client
+    app.state.http_client = create_http_client(transport=mock_server.transport(latency=0.2))
+
+    async def coalesced(request: Request):
+        response = await request.state.async_mia_platform_client.get_by_id(url, 1)
+        return response.json()
+
+    app.add_api_route('/coalesced', coalesced)
+    labels = ('AsyncMiaPlatformClient', 'GET BY ID', 'shared')
+    shared_before = COALESCED_READS.samples.get(labels, 0)
+
+    try:
+        with ThreadPoolExecutor(max_workers=50) as executor:
+            responses = list(executor.map(
+                lambda _: test_client.get('/coalesced'),
+                range(300)
+            ))
+    finally:
+        app.router.routes.pop()
+        test_client.portal.call(app.state.http_client.aclose)
+        app.state.http_client = original_http_client
+
+    assert all(response.status_code == status.HTTP_200_OK for response in responses)
+    assert all(response.json() == {'_id': '1'} for response in responses)
+    assert mock_server.routes[0].calls < 30
+    assert COALESCED_READS.samples[labels] - shared_before == 300 - mock_server.routes[0].calls
@@ -0,0 +1,147 @@
+import asyncio
+import resource
+import tracemalloc
+import httpretty
+import orjson
+import pytest
+from fastapi import status
+
+from src.lib.async_mia_platform_client import AsyncMiaPlatformClient, create_http_client
+from src.lib.exceptions import MiaPlatformHTTPError
+from src.lib.streaming import stream_proxy, transform_ndjson
+from src.utils.logger import get_logger
+
+
+URL = 'http://www.dummy-url.com/export'
+
+
+@pytest.fixture(name='client')
+async def fixture_client(mock_server):
+    async with create_http_client(transport=mock_server.transport()) as http_client:
+        yield AsyncMiaPlatformClient(http_client, {}, get_logger())
+
+
+def register_stream(mock_server, chunks, content_type='application/x-ndjson'):
+    async def body():
+        for chunk in chunks:
+            yield chunk
+
+    mock_server.register_uri(
+        method=httpretty.GET,
+        uri=URL,
+        body=lambda request, uri, headers: (200, {'content-type': content_type}, body())
+    )
+
+
+async def serve(response):
+    """
+    Runs a response as an ASGI app, returning the start message and the body chunks
+    """
+
+    messages = []
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        messages.append(message)
+
+    await response({'type': 'http'}, receive, send)
+
+    return messages[0], [message.get('body', b'') for message in messages[1:]]
+
+
+async def iterate(chunks):
+    for chunk in chunks:
+        yield chunk
+
+
+@pytest.mark.anyio
+class TestStreaming:
+    """
+    Test the streaming proxy of upstream responses
+    """
+
+    async def test_transform_ndjson_across_chunks(self):
+        chunks = [b'{"n": 1}\n{"n"', b': 2}\n{"n": 3}\n', b'{"n": 4}']
+
+        output = [
+            chunk async for chunk in transform_ndjson(
+                iterate(chunks),
+                lambda record: None if record['n'] == 2 else {'m': record['n'] * 10}
+            )
+        ]
+
+        assert b''.join(output) == b'{"m":10}\n{"m":30}\n{"m":40}\n'
+
+    async def test_proxy_raw_body(self, mock_server, client):
+        register_stream(mock_server, [b'a' * 10, b'b' * 10], content_type='text/csv')
+
+        response = await stream_proxy(client, URL, chunk_size=8)
+        start, body = await serve(response)
+
+        assert start['status'] == status.HTTP_200_OK
+        assert (b'content-type', b'text/csv; charset=utf-8') in start['headers']
+        assert b''.join(body) == b'a' * 10 + b'b' * 10
+
+    async def test_proxy_ndjson_transform(self, mock_server, client):
+        register_stream(mock_server, [b'{"_id": "1"}\n{"_id":', b' "2"}\n'])
+
+        response = await stream_proxy(client, URL, transform=lambda record: record['_id'])
+        start, body = await serve(response)
+
+        assert (b'content-type', b'application/x-ndjson') in start['headers']
+        assert b''.join(body) == b'"1"\n"2"\n'
+
+    async def test_upstream_error_is_raised_before_streaming(self, mock_server, client):
+        mock_server.register_uri(method=httpretty.GET, uri=URL, status=404)
+
+        with pytest.raises(MiaPlatformHTTPError) as error:
+            await stream_proxy(client, URL)
+
+        assert error.value.status_code == status.HTTP_404_NOT_FOUND
+
+    async def test_memory_does_not_grow_with_the_payload(self, mock_server, client):
+        line = orjson.dumps({'_id': 'x' * 100, 'value': 'y' * 900}) + b'\n'
+        chunk = line * 64
+        size = 300 * 1024 * 1024
+        register_stream(mock_server, [chunk] * (size // len(chunk)))
+
+        max_rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        tracemalloc.start()
+        try:
+            response = await stream_proxy(client, URL)
+            _, body = await serve_counting(response)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        max_rss_growth = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - max_rss_before
+
+        assert body == size // len(chunk) * len(chunk)
+        assert peak < 8 * 1024 * 1024
+        assert max_rss_growth < 64 * 1024
+
+
+async def serve_counting(response):
+    """
+    Runs a response as an ASGI app, only counting the body bytes
+    """
+
+    received = [None, 0]
+    disconnected = asyncio.Event()
+
+    async def receive():
+        await disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            received[0] = message
+        else:
+            received[1] += len(message.get('body', b''))
+
+    await response({'type': 'http'}, receive, send)
+
+    return received
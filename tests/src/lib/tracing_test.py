@@ -0,0 +1,247 @@
+import time
+import threading
+import httpretty
+import orjson
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.apis.core.traces import traces_handler
+from src.lib.async_mia_platform_client import AsyncMiaPlatformClient, create_http_client
+from src.lib.mia_platform_client import MiaPlatformClient
+from src.lib.tracing import (
+    FileSpanExporter,
+    SpanExporter,
+    Tracer,
+    format_traceparent,
+    get_current_span,
+    parse_traceparent,
+    tracer
+)
+from src.middlewares.logger_middleware import LoggerMiddleware
+from src.utils.logger import get_logger
+
+
+URL = 'http://www.dummy-url.com/resources'
+TRACE_ID = '4bf92f3577b34da6a3ce929d0e0e4736'
+PARENT_ID = '00f067aa0ba902b7'
+
+
+def echo_traceparent(request, _uri, headers):
+    return 200, headers, orjson.dumps({'traceparent': request.headers.get('traceparent')})
+
+
+@pytest.fixture(name='sampled_tracer')
+def fixture_sampled_tracer(monkeypatch):
+    """
+    The process-wide tracer sampling every trace and keeping all of them as slow
+    """
+
+    monkeypatch.setattr(tracer, 'sample_rate', 1.0)
+    monkeypatch.setattr(tracer, 'slow_threshold', 0.0)
+    tracer.slow_traces.clear()
+    yield tracer
+    tracer.slow_traces.clear()
+
+
+def test_parse_traceparent():
+    assert parse_traceparent(f'00-{TRACE_ID}-{PARENT_ID}-01') == (TRACE_ID, PARENT_ID, True)
+    assert parse_traceparent(f'00-{TRACE_ID}-{PARENT_ID}-00') == (TRACE_ID, PARENT_ID, False)
+    # Future versions may add fields
+    assert parse_traceparent(f'01-{TRACE_ID}-{PARENT_ID}-01-extra') == (TRACE_ID, PARENT_ID, True)
+
+    for invalid in (
+        None,
+        '',
+        f'00-{TRACE_ID}-{PARENT_ID}',
+        f'00-{TRACE_ID}-{PARENT_ID}-01-extra',
+        f'ff-{TRACE_ID}-{PARENT_ID}-01',
+        f'00-{"0" * 32}-{PARENT_ID}-01',
+        f'00-{TRACE_ID}-{"0" * 16}-01',
+        f'00-{TRACE_ID.upper()}-{PARENT_ID}-01',
+        f'00-{TRACE_ID}-{PARENT_ID}-x1',
+    ):
+        assert parse_traceparent(invalid) is None
+
+    assert format_traceparent(TRACE_ID, PARENT_ID, True) == f'00-{TRACE_ID}-{PARENT_ID}-01'
+
+
+def test_head_sampling():
+    """
+    New traces are sampled at the sample rate, incoming ones follow their flag
+    """
+
+    assert not Tracer(sample_rate=0).start_trace('request').sampled
+    assert Tracer(sample_rate=1).start_trace('request').sampled
+    assert Tracer(sample_rate=0).start_trace('request', f'00-{TRACE_ID}-{PARENT_ID}-01').sampled
+    assert not Tracer(sample_rate=1).start_trace('request', f'00-{TRACE_ID}-{PARENT_ID}-00').sampled
+
+    with Tracer(enabled=False).start_trace('request') as span:
+        assert span.traceparent is None
+        assert get_current_span() is None
+
+
+def test_spans_are_exported_to_a_file(tmp_path):
+    """
+    The spans of a sampled trace are written once the root span ends, unsampled
+    traces are not
+    """
+
+    path = tmp_path / 'spans.ndjson'
+    exporter = FileSpanExporter(path)
+    local_tracer = Tracer(sample_rate=1, exporter=exporter)
+
+    with local_tracer.start_trace('GET /', f'00-{TRACE_ID}-{PARENT_ID}-01') as root:
+        with local_tracer.span('load', items=3) as load:
+            assert get_current_span() is load
+        with pytest.raises(ValueError):
+            with local_tracer.span('price'):
+                raise ValueError('no price')
+
+        assert not path.exists()
+
+    with Tracer(sample_rate=0, exporter=exporter).start_trace('GET /unsampled'):
+        pass
+
+    exporter.shutdown()
+    spans = [orjson.loads(line) for line in path.read_bytes().splitlines()]
+
+    assert [span['name'] for span in spans] == ['load', 'price', 'GET /']
+    assert {span['traceId'] for span in spans} == {TRACE_ID}
+    assert spans[2]['parentSpanId'] == PARENT_ID
+    assert spans[0]['parentSpanId'] == spans[1]['parentSpanId'] == root.span_id
+    assert spans[0]['attributes'] == {'items': 3}
+    assert spans[1]['status'] == 'error'
+    assert spans[1]['error'] == 'ValueError: no price'
+    assert all(span['endTimeUnixNano'] >= span['startTimeUnixNano'] for span in spans)
+
+
+def test_exporters_implement_export():
+    class NoExporter(SpanExporter):
+        """
+        An exporter missing its export method
+        """
+
+    with pytest.raises(TypeError):
+        NoExporter()  # pylint: disable=E0110
+
+
+def test_spans_are_written_off_the_exporting_thread(tmp_path, monkeypatch):
+    """
+    Exporting only queues the trace, a slow file is opened and written by the
+    exporter thread
+    """
+
+    writers = []
+
+    def slow_open(*args):
+        writers.append(threading.current_thread())
+        time.sleep(0.2)
+        return open(*args)  # pylint: disable=R1732,W1514
+
+    monkeypatch.setattr('src.lib.tracing.open', slow_open, raising=False)
+    path = tmp_path / 'spans.ndjson'
+    exporter = FileSpanExporter(path, queue_size=1)
+    local_tracer = Tracer(sample_rate=1, exporter=exporter)
+
+    started_at = time.perf_counter()
+    for name in ('first', 'second', 'third'):
+        with local_tracer.span(name):
+            pass
+    elapsed = time.perf_counter() - started_at
+
+    exporter.shutdown()
+    names = [orjson.loads(line)['name'] for line in path.read_bytes().splitlines()]
+
+    assert elapsed < 0.1
+    assert writers and threading.current_thread() not in writers
+    # The queue holds a single trace while the file is being opened
+    assert names == ['first']
+    assert exporter.dropped == 2
+
+
+def test_slow_traces_ring_buffer():
+    local_tracer = Tracer(sample_rate=1, slow_threshold=0, slow_traces=2)
+
+    for name in ('first', 'second', 'third'):
+        with local_tracer.span(name):
+            pass
+
+    assert [trace[0]['name'] for trace in local_tracer.recent_slow_traces()] \
+        == ['third', 'second']
+
+
+def test_traces_endpoint(sampled_tracer):
+    """
+    The request spans opened by the LoggerMiddleware are served by the debug route
+    """
+
+    app = FastAPI()
+    app.add_middleware(LoggerMiddleware, logger=get_logger())
+    app.include_router(traces_handler.router)
+    app.add_api_route('/', lambda: {})
+
+    with TestClient(app) as client:
+        client.get('/', headers={'traceparent': f'00-{TRACE_ID}-{PARENT_ID}-01'})
+        response = client.get('/-/traces')
+
+    [trace] = response.json()['traces']
+
+    assert response.status_code == 200
+    assert sampled_tracer.slow_traces
+    assert trace[0]['name'] == 'GET /'
+    assert trace[0]['traceId'] == TRACE_ID
+    assert trace[0]['parentSpanId'] == PARENT_ID
+    assert trace[0]['attributes']['http.status_code'] == 200
+
+
+def test_traces_endpoint_is_off_by_default(test_client, sampled_tracer):
+    test_client.get('/')
+
+    assert sampled_tracer.slow_traces
+    assert test_client.get('/-/traces').status_code == 404
+
+
+@pytest.mark.anyio
+async def test_async_calls_propagate_the_trace(mock_server, sampled_tracer):
+    mock_server.register_uri(method=httpretty.GET, uri=URL, body=echo_traceparent)
+
+    async with create_http_client(transport=mock_server.transport()) as http_client:
+        client = AsyncMiaPlatformClient(http_client, {}, get_logger())
+
+        with sampled_tracer.start_trace('GET /', f'00-{TRACE_ID}-{PARENT_ID}-01'):
+            response = await client.get(URL)
+
+    [trace] = sampled_tracer.recent_slow_traces()
+    client_span = trace[1]
+
+    assert client_span['name'] == 'AsyncMiaPlatformClient GET'
+    assert client_span['attributes'] == {
+        'http.method': 'GET',
+        'http.url': URL,
+        'http.status_code': 200,
+    }
+    assert response.json() == {'traceparent': f'00-{TRACE_ID}-{client_span["spanId"]}-01'}
+
+
+def test_sync_bulk_calls_propagate_the_trace(mock_server, sampled_tracer):
+    """
+    The calls sent by the bulk threads are children of the span of the caller
+    """
+
+    for _id in ('a', 'b'):
+        mock_server.register_uri(method=httpretty.DELETE, uri=f'{URL}/{_id}', body=echo_traceparent)
+
+    client = MiaPlatformClient({}, get_logger())
+
+    with sampled_tracer.span('cleanup') as root:
+        results = client.bulk_delete(URL, ['a', 'b'], concurrency=1)
+
+    [trace] = sampled_tracer.recent_slow_traces()
+    spans = {span['spanId']: span for span in trace}
+
+    for result in results:
+        _, trace_id, span_id, _ = result.response.json()['traceparent'].split('-')
+        assert trace_id == root.trace_id
+        assert spans[span_id]['name'] == 'MiaPlatformClient DELETE BY ID'
+        assert spans[span_id]['parentSpanId'] == root.span_id
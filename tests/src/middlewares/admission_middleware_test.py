@@ -0,0 +1,65 @@
+import asyncio
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from src.lib.admission import AdmissionController, ConcurrencyLimiter
+from src.middlewares.admission_middleware import AdmissionMiddleware
+from src.middlewares.request_context_middleware import RequestContextMiddleware
+
+
+def create_app(release):
+    controller = AdmissionController(
+        ConcurrencyLimiter('<global>', 1, max_queue=1),
+        {},
+        queue_timeout=5,
+        retry_after=3
+    )
+
+    app = FastAPI()
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get('/slow')
+    async def slow():
+        await release.wait()
+        return {'message': 'done'}
+
+    @app.get('/-/check-up')
+    async def checkup():
+        return {'statusOk': True}
+
+    return app
+
+
+@pytest.mark.anyio
+async def test_requests_over_the_limits_are_shed():
+    """
+    With one slot and one queued request, the next requests are answered at once
+    with a 503 and a Retry-After, the probe routes are never limited
+    """
+
+    release = asyncio.Event()
+    transport = httpx.ASGITransport(app=create_app(release))
+
+    async with httpx.AsyncClient(transport=transport, base_url='http://test') as client:
+        admitted = asyncio.ensure_future(client.get('/slow'))
+        queued = asyncio.ensure_future(client.get('/slow'))
+        await asyncio.sleep(0.05)
+
+        rejections = [await client.get('/slow') for _ in range(3)]
+        rejected = rejections[-1]
+        probe = await client.get('/-/check-up')
+
+        release.set()
+        responses = await asyncio.gather(admitted, queued)
+
+    assert rejected.status_code == 503
+    assert rejected.headers['retry-after'] == '3'
+    assert rejected.json() == {'message': 'The service is overloaded, retry later'}
+    # Every rejection carries its own request id, once
+    assert [len(response.headers.get_list('x-request-id')) for response in rejections] \
+        == [1, 1, 1]
+    assert len({response.headers['x-request-id'] for response in rejections}) == 3
+    assert probe.status_code == 200
+    assert [response.status_code for response in responses] == [200, 200]
@@ -0,0 +1,98 @@
+import orjson
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from src.lib.blocking_pool import BlockingPool
+from src.lib.compression import Compressor
+from src.lib.metrics import BLOCKING_POOL_QUEUE_WAIT
+from src.lib.responses import EncodedJSONResponse
+from src.middlewares.compression_middleware import (
+    CompressionMiddleware,
+    decoded_if_none_match,
+    encoded_etag
+)
+
+
+RECORDS = [{'_id': str(n), 'name': f'record {n}', 'tags': ['a', 'b']} for n in range(200)]
+BODY = orjson.dumps(RECORDS)
+CONSTANT_BODY = orjson.dumps({'message': 'constant ' * 100})
+
+
+def create_app(compressor):
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, compressor=compressor)
+
+    @app.get('/records')
+    async def records():
+        return EncodedJSONResponse(BODY)
+
+    @app.get('/small')
+    async def small():
+        return {'message': 'small'}
+
+    @app.get('/constant')
+    async def constant():
+        return EncodedJSONResponse(CONSTANT_BODY)
+
+    @app.get('/stream')
+    async def stream():
+        async def lines():
+            for record in RECORDS:
+                yield orjson.dumps(record) + b'\n'
+
+        return StreamingResponse(lines(), media_type='application/x-ndjson')
+
+    @app.get('/binary')
+    async def binary():
+        return EncodedJSONResponse(BODY, media_type='application/octet-stream')
+
+    return app
+
+
+def test_responses_are_compressed_when_accepted():
+    pool = BlockingPool('test_compression', 1)
+    compressor = Compressor(minimum_size=500, offload_size=len(BODY), pool=pool)
+
+    with TestClient(create_app(compressor)) as client:
+        compressed = client.get('/records', headers={'accept-encoding': 'gzip'})
+        identity = client.get('/records', headers={'accept-encoding': 'identity'})
+        small = client.get('/small', headers={'accept-encoding': 'gzip'})
+        binary = client.get('/binary', headers={'accept-encoding': 'gzip'})
+        streamed = client.get('/stream', headers={'accept-encoding': 'gzip'})
+    pool.shutdown()
+
+    assert compressed.headers['content-encoding'] == 'gzip'
+    assert compressed.headers['vary'] == 'Accept-Encoding'
+    assert int(compressed.headers['content-length']) < len(BODY) / 4
+    assert compressed.json() == RECORDS
+    # The body of the offload size was compressed on a thread of the pool
+    assert BLOCKING_POOL_QUEUE_WAIT.samples[('test_compression',)][-1] > 0
+
+    for response in (identity, small, binary):
+        assert 'content-encoding' not in response.headers
+
+    assert streamed.headers['content-encoding'] == 'gzip'
+    assert 'content-length' not in streamed.headers
+    assert [orjson.loads(line) for line in streamed.text.splitlines()] == RECORDS
+
+
+def test_constant_bodies_are_not_compressed_per_request():
+    compressor = Compressor(minimum_size=500)
+    compressor.precompress(CONSTANT_BODY)
+    compressor.codecs['gzip'] = None
+
+    with TestClient(create_app(compressor)) as client:
+        response = client.get('/constant', headers={'accept-encoding': 'gzip'})
+
+    assert response.headers['content-encoding'] == 'gzip'
+    assert response.content == CONSTANT_BODY
+
+
+def test_compressed_bodies_have_an_etag_per_encoding():
+    assert encoded_etag(b'"abc"', 'br') == b'"abc-br"'
+    assert encoded_etag(b'W/"abc"', 'br') == b'W/"abc"'
+
+    assert decoded_if_none_match(b'"abc-br", "def-gzip",W/"ghi-br"', 'br') \
+        == (b'"abc", "def-gzip", W/"ghi-br"', True)
+    assert decoded_if_none_match(b'"abc"', 'br') == (b'"abc"', False)
@@ -0,0 +1,45 @@
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.lib.mia_platform_client import MiaPlatformClient
+from src.lib.async_mia_platform_client import AsyncMiaPlatformClient
+from src.middlewares.logger_middleware import LoggerMiddleware
+from src.middlewares.mia_platform_client_middleware import MiaPlatformClientMiddleware
+from src.utils.logger import get_logger
+
+
+def test_request_state():
+    """
+    The middlewares attach the logger and the Mia Platform clients to the request state
+    """
+
+    logger = get_logger()
+
+    app = FastAPI()
+    app.state.http_client = object()
+    app.add_middleware(LoggerMiddleware, logger=logger)
+    app.add_middleware(MiaPlatformClientMiddleware, logger=logger)
+
+    @app.get('/state')
+    async def state(request: Request):
+        return {
+            'logger': request.state.logger is logger,
+            'client': isinstance(request.state.mia_platform_client, MiaPlatformClient),
+            'async_client': isinstance(
+                request.state.async_mia_platform_client,
+                AsyncMiaPlatformClient
+            ),
+            'http_client': request.state.async_mia_platform_client.http_client
+                is app.state.http_client,
+        }
+
+    with TestClient(app) as client:
+        response = client.get('/state', headers={'miauserid': 'user'})
+
+    assert response.status_code == 200
+    assert response.json() == {
+        'logger': True,
+        'client': True,
+        'async_client': True,
+        'http_client': True,
+    }
@@ -0,0 +1,37 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.middlewares.probe_middleware import ProbeMiddleware
+from src.utils.health import HealthState
+
+
+def test_probes_bypass_the_application():
+    """
+    Probe routes are answered by the middleware, other routes reach the application
+    """
+
+    health = HealthState()
+    app = FastAPI()
+    app.add_middleware(ProbeMiddleware, health=health)
+
+    @app.get('/')
+    async def root():
+        return {'message': 'app'}
+
+    with TestClient(app) as client:
+        assert client.get('/').json() == {'message': 'app'}
+        assert client.get('/-/check-up').status_code == 404
+
+        for path in ('/-/healthz', '/-/ready'):
+            response = client.get(path)
+            assert response.status_code == 200
+            assert response.json() == {'statusOk': True}
+            assert response.headers['content-type'] == 'application/json'
+
+        head = client.head('/-/ready')
+        assert head.status_code == 200
+        assert head.content == b''
+
+        health.set_ready(False)
+        assert client.get('/-/ready').status_code == 503
+        assert client.get('/-/healthz').status_code == 200
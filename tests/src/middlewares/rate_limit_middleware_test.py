@@ -0,0 +1,38 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.lib.rate_limit import MemoryRateLimitStore, Rate, RateLimiter
+from src.middlewares.rate_limit_middleware import RateLimitMiddleware
+
+
+def test_requests_over_the_rate_are_rejected():
+    """
+    A user over its rate gets a 429 with a Retry-After, the other users and the
+    probe routes are not affected
+    """
+
+    limiter = RateLimiter(MemoryRateLimitStore(), {'miauserid': Rate(2, 60)})
+
+    app = FastAPI()
+    app.add_middleware(RateLimitMiddleware, rate_limiter=limiter)
+
+    @app.get('/')
+    async def root():
+        return {'message': 'ok'}
+
+    @app.get('/-/check-up')
+    async def checkup():
+        return {'statusOk': True}
+
+    with TestClient(app) as client:
+        allowed = [client.get('/', headers={'miauserid': 'noisy'}) for _ in range(2)]
+        rejected = client.get('/', headers={'miauserid': 'noisy'})
+        probe = client.get('/-/check-up', headers={'miauserid': 'noisy'})
+        other = client.get('/', headers={'miauserid': 'quiet'})
+
+    assert [response.status_code for response in allowed] == [200, 200]
+    assert rejected.status_code == 429
+    assert rejected.headers['retry-after'] == '30'
+    assert rejected.json() == {'message': 'Too many requests, retry later'}
+    assert probe.status_code == 200
+    assert other.status_code == 200
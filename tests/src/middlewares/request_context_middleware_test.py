@@ -0,0 +1,124 @@
+import httpretty
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from src.lib.async_mia_platform_client import create_http_client
+from src.middlewares.logger_middleware import LoggerMiddleware
+from src.middlewares.mia_platform_client_middleware import MiaPlatformClientMiddleware
+from src.middlewares.request_context_middleware import RequestContextMiddleware
+from src.utils.logger import get_logger
+from src.utils.request_context import get_request_id
+
+
+URL = 'http://www.dummy-url.com/resources'
+
+
+def echo_request_id(request, _uri, headers):
+    return 200, headers, f'{{"requestId": "{request.headers.get("x-request-id")}"}}'
+
+
+def create_app(mock_server):
+    logger = get_logger()
+
+    app = FastAPI()
+    app.add_middleware(LoggerMiddleware, logger=logger)
+    app.add_middleware(MiaPlatformClientMiddleware, logger=logger)
+    app.add_middleware(RequestContextMiddleware)
+
+    @app.get('/context')
+    async def context():
+        return {'requestId': get_request_id()}
+
+    @app.get('/async')
+    async def async_call(request: Request):
+        response = await request.state.async_mia_platform_client.get(URL)
+        return response.json()
+
+    @app.get('/sync')
+    def sync_call(request: Request):
+        return request.state.mia_platform_client.get(URL).json()
+
+    @app.get('/bulk')
+    def bulk_call(request: Request):
+        results = request.state.mia_platform_client.bulk_delete(
+            URL, ['a', 'b'], concurrency=1
+        )
+        return [result.response.json() for result in results]
+
+    app.state.http_client = create_http_client(transport=mock_server.transport())
+
+    return app
+
+
+def test_request_id_is_generated(mock_server):
+    """
+    Requests without an id get a new one, returned in the response headers
+    """
+
+    with TestClient(create_app(mock_server)) as client:
+        first = client.get('/context')
+        second = client.get('/context')
+
+    assert first.json()['requestId'] == first.headers['x-request-id']
+    assert len(first.headers['x-request-id']) == 32
+    assert first.headers['x-request-id'] != second.headers['x-request-id']
+    assert get_request_id() is None
+
+
+def test_request_id_is_propagated(mock_server):
+    """
+    The incoming id is the id of the request, invalid ones are replaced
+    """
+
+    with TestClient(create_app(mock_server)) as client:
+        response = client.get('/context', headers={'x-request-id': 'incoming'})
+        too_long = client.get('/context', headers={'x-request-id': 'x' * 129})
+
+    assert response.json() == {'requestId': 'incoming'}
+    assert response.headers['x-request-id'] == 'incoming'
+    assert too_long.json()['requestId'] not in (None, 'x' * 129)
+
+
+def test_upstream_calls_carry_the_request_id(mock_server):
+    """
+    The async, sync and bulk calls send the id of the request being served,
+    also the generated ones and from the bulk worker threads
+    """
+
+    mock_server.register_uri(method=httpretty.GET, uri=URL, body=echo_request_id)
+    mock_server.register_uri(method=httpretty.DELETE, uri=f'{URL}/a', body=echo_request_id)
+    mock_server.register_uri(method=httpretty.DELETE, uri=f'{URL}/b', body=echo_request_id)
+
+    with TestClient(create_app(mock_server)) as client:
+        async_call = client.get('/async', headers={'x-request-id': 'async'})
+        sync_call = client.get('/sync')
+        bulk_call = client.get('/bulk', headers={'x-request-id': 'bulk'})
+
+    assert async_call.json() == {'requestId': 'async'}
+    assert sync_call.json() == {'requestId': sync_call.headers['x-request-id']}
+    assert bulk_call.json() == [{'requestId': 'bulk'}, {'requestId': 'bulk'}]
+
+
+@pytest.mark.anyio
+async def test_response_start_message_is_not_modified():
+    """
+    The id is added to a copy of the start message, which inner middlewares may
+    send for every response
+    """
+
+    start = {'type': 'http.response.start', 'status': 503, 'headers': [(b'retry-after', b'1')]}
+    sent = []
+
+    async def app(_scope, _receive, send):
+        await send(start)
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = RequestContextMiddleware(app)
+    for _ in range(2):
+        await middleware({'type': 'http', 'headers': []}, None, send)
+
+    assert start['headers'] == [(b'retry-after', b'1')]
+    assert [len(message['headers']) for message in sent] == [2, 2]
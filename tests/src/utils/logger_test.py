@@ -0,0 +1,124 @@
+import sys
+import queue
+import logging
+import orjson
+import pytest
+
+from src.utils.logger import (
+    JsonFormatter,
+    OverflowQueueHandler,
+    RequestContextFilter,
+    get_logger
+)
+from src.utils.request_context import RequestContext, reset_request_context, set_request_context
+
+
+def make_record(message, *args, **fields):
+    record = logging.LogRecord('mialogger', logging.DEBUG, __file__, 1, message, args, None)
+    record.__dict__.update(fields)
+    return record
+
+
+def test_json_formatter():
+    """
+    Records are serialized as JSON, including the structured fields
+    """
+
+    record = make_record(
+        'GET %s', '/',
+        request_id='abc', method='GET', path='/', status=200, duration=0.5
+    )
+
+    entry = orjson.loads(JsonFormatter().format(record))
+
+    assert entry['level'] == 'DEBUG'
+    assert entry['logger'] == 'mialogger'
+    assert entry['message'] == 'GET /'
+    assert {key: entry[key] for key in ('request_id', 'method', 'path', 'status', 'duration')} \
+        == {'request_id': 'abc', 'method': 'GET', 'path': '/', 'status': 200, 'duration': 0.5}
+
+
+def test_prepare_merges_arguments():
+    """
+    Records are enqueued with the final message and without live exception objects
+    """
+
+    handler = OverflowQueueHandler(queue.Queue())
+
+    try:
+        raise ValueError('boom')
+    except ValueError:
+        record = logging.LogRecord(
+            'mialogger', logging.ERROR, __file__, 1, 'failed %s', ('call',), True
+        )
+        record.exc_info = sys.exc_info()
+
+    handler.handle(record)
+    enqueued = handler.queue.get_nowait()
+
+    assert enqueued.msg == 'failed call'
+    assert enqueued.args is None
+    assert enqueued.exc_info is None
+    assert 'ValueError: boom' in enqueued.exc_text
+
+
+@pytest.mark.parametrize('policy, sample_rate, expected', [
+    ('drop', 0, ['first', 'second']),
+    ('sample', 1, ['second', 'third']),
+])
+def test_overflow_policy(policy, sample_rate, expected):
+    """
+    Records overflowing the queue are dropped or sampled
+    """
+
+    handler = OverflowQueueHandler(queue.Queue(maxsize=2), policy, sample_rate)
+
+    for message in ('first', 'second', 'third'):
+        handler.handle(make_record(message))
+
+    assert [handler.queue.get_nowait().msg for _ in range(2)] == expected
+    assert handler.dropped == 1
+
+
+def test_unknown_overflow_policy():
+    """
+    Unknown overflow policies are rejected
+    """
+
+    with pytest.raises(ValueError, match='Unknown log overflow policy "spill"'):
+        OverflowQueueHandler(queue.Queue(), 'spill')
+
+
+def test_get_logger_is_idempotent():
+    """
+    The queue handler is attached only once
+    """
+
+    logger = get_logger()
+
+    assert get_logger() is logger
+    assert len(logger.handlers) == 1
+    assert isinstance(logger.handlers[0], OverflowQueueHandler)
+
+
+def test_request_context_filter():
+    """
+    Records get the id of the request being served, unless they set their own
+    """
+
+    request_filter = RequestContextFilter()
+    outside = make_record('outside')
+    explicit = make_record('explicit', request_id='explicit')
+    inside = make_record('inside')
+
+    request_filter.filter(outside)
+    token = set_request_context(RequestContext('abc'))
+    try:
+        request_filter.filter(explicit)
+        request_filter.filter(inside)
+    finally:
+        reset_request_context(token)
+
+    assert 'request_id' not in outside.__dict__
+    assert explicit.__dict__['request_id'] == 'explicit'
+    assert inside.__dict__['request_id'] == 'abc'
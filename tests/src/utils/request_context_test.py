@@ -0,0 +1,36 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.request_context import (
+    RequestContext,
+    bind_request_context,
+    get_request_id,
+    request_id_from_headers,
+    reset_request_context,
+    set_request_context
+)
+
+
+def test_request_id_from_headers():
+    assert request_id_from_headers([(b'x-request-id', b'abc')]) == 'abc'
+    assert request_id_from_headers([(b'miauserid', b'user')]) is None
+    assert request_id_from_headers([(b'x-request-id', b'')]) is None
+    assert request_id_from_headers([(b'x-request-id', b'a' * 129)]) is None
+    assert request_id_from_headers([(b'x-request-id', b'a\nb')]) is None
+
+
+def test_bind_request_context():
+    """
+    Bound functions see the request context of the caller from any thread
+    """
+
+    token = set_request_context(RequestContext('bound'))
+    try:
+        bound = bind_request_context(get_request_id)
+    finally:
+        reset_request_context(token)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        assert executor.submit(get_request_id).result() is None
+        assert executor.submit(bound).result() == 'bound'
+
+    assert get_request_id() is None
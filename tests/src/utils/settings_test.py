@@ -0,0 +1,31 @@
+import pytest
+from pydantic import ValidationError
+
+from src.utils.settings import Settings, get_settings
+
+
+def test_proxied_header_keys():
+    """
+    The header allow-list is lower-cased and stripped of blank entries
+    """
+
+    settings = Settings(header_keys_to_proxy=' MiaUserId, x-request-id ,')
+
+    assert settings.proxied_header_keys == ('miauserid', 'x-request-id')
+    assert settings.proxied_raw_header_keys == {
+        b'miauserid': 'miauserid',
+        b'x-request-id': 'x-request-id',
+    }
+
+
+def test_settings_are_built_once():
+    """
+    The same frozen settings object is shared by every caller
+    """
+
+    settings = get_settings()
+
+    assert get_settings() is settings
+
+    with pytest.raises(ValidationError):
+        settings.header_keys_to_proxy = 'miauserid'